@@ -0,0 +1,289 @@
+"""
+Golden fixtures e microbenchmark dos parsers, sem rede.
+
+    python -m bench.parsers --check              # corpus vs golden + streaming == bufferizado
+    python -m bench.parsers --against 77cc722    # parse atual == parse de outro commit
+    python -m bench.parsers --update             # regrava os golden (só depois do --against)
+    python -m bench.parsers --events 2000        # benchmark com payload sintético
+    python -m bench.parsers --fixtures           # benchmark sobre os payloads do corpus
+
+O parse roda pelos mesmos classmethods do scrape (`parse_timed` no
+caminho bufferizado, `parse_stream_chunk` no streaming), só que sobre
+bytes do corpus em vez da resposta HTTP. Payloads reais entram no
+corpus com FIXTURE_RECORD_DIR=fixtures no processo de scraping.
+
+Golden NÃO é prova de que o parse está certo, só de que não mudou: antes
+de regravar (`--update`), rode `--against <commit anterior ao parser>`
+sobre o mesmo corpus e confira que a saída é idêntica por casa — ou que
+cada diferença é intencional e está descrita no commit. Regravar golden
+a partir de um parser com regressão só congela a regressão.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+from typing import Dict, List, Optional
+
+from bench.synthetic import PAYLOADS, payload
+from scrapers import REGISTRY, load_scraper
+from scrapers.base import parse_stream_chunk
+from scrapers.fixtures import canonical, iter_fixtures, load_golden, write_golden
+from utils.jsonstream import EventArraySplitter
+
+# pedaço pequeno de propósito: exercita eventos cortados entre chunks
+CHECK_CHUNK_BYTES = 1024
+
+
+def parse_streamed(cls, body: bytes, chunk_bytes: int = CHECK_CHUNK_BYTES) -> List:
+    splitter = EventArraySplitter(cls.stream_path())
+    odds: List = []
+    for start in range(0, len(body), chunk_bytes):
+        final = start + chunk_bytes >= len(body)
+        splitter, batch, _ = parse_stream_chunk(cls, splitter, body[start:start + chunk_bytes], final)
+        odds.extend(batch)
+    return odds
+
+
+def _first_diff(got: List[Dict], want: List[Dict]) -> str:
+    for i, (a, b) in enumerate(zip(got, want)):
+        if a != b:
+            fields = sorted(k for k in set(a) | set(b) if a.get(k) != b.get(k))
+            return f"linha {i}: {fields} → {[a.get(k) for k in fields]} != {[b.get(k) for k in fields]}"
+    return f"{len(got)} linhas, esperado {len(want)}"
+
+
+# ==============================
+# GOLDEN
+# ==============================
+def check(bookmaker: Optional[str], update: bool) -> int:
+    failures = 0
+    seen = 0
+    for name, path in iter_fixtures(bookmaker):
+        if name not in REGISTRY:
+            continue
+        cls = type(load_scraper(name))
+        with open(path, "rb") as f:
+            body = f.read()
+        seen += 1
+
+        rows = canonical(cls.parse_payload(body))
+        if update:
+            write_golden(path, rows)
+            print(f"golden  {path}  ({len(rows)} cotações)")
+            continue
+
+        problems = []
+        golden = load_golden(path)
+        if golden is None:
+            problems.append("sem golden (rode --update)")
+        elif rows != golden:
+            problems.append("golden: " + _first_diff(rows, golden))
+
+        if cls.stream_path() is not None:
+            streamed = canonical(parse_streamed(cls, body))
+            if streamed != rows:
+                problems.append("streaming: " + _first_diff(streamed, rows))
+
+        status = "FAIL" if problems else "ok"
+        print(f"{status:5} {path}  ({len(rows)} cotações)")
+        for p in problems:
+            print(f"      {p}")
+        failures += bool(problems)
+
+    if not seen:
+        print("nenhuma fixture encontrada")
+        return 1
+    return 1 if failures else 0
+
+
+# ==============================
+# BASELINE (outro commit)
+# ==============================
+# módulos compartilhados pelos parsers: também vêm do `ref` quando existem lá
+# (senão um scraper antigo de tabela FEED rodaria com o feed.py atual)
+BASELINE_SHARED = ("scrapers.feed",)
+
+
+def _git_source(ref: str, module_name: str) -> Optional[str]:
+    path = module_name.replace(".", "/") + ".py"
+    proc = subprocess.run(["git", "show", f"{ref}:{path}"], capture_output=True, text=True)
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def _exec_module(ref: str, module_name: str, source: str) -> types.ModuleType:
+    module = types.ModuleType(module_name)
+    module.__file__ = f"{ref}:{module_name.replace('.', '/')}.py"
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def load_baseline(ref: str, name: str):
+    """Classe do scraper `name` como estava no commit `ref` (lida via git show)."""
+    module_name, class_name = REGISTRY[name]
+    source = _git_source(ref, module_name)
+    if source is None:
+        raise LookupError(f"{module_name} não existe em {ref}")
+
+    saved = {m: sys.modules.get(m) for m in BASELINE_SHARED}
+    try:
+        for shared in BASELINE_SHARED:
+            shared_source = _git_source(ref, shared)
+            if shared_source is not None:
+                sys.modules[shared] = _exec_module(ref, shared, shared_source)
+        module = _exec_module(ref, module_name, source)
+    finally:
+        for shared, previous in saved.items():
+            if previous is None:
+                sys.modules.pop(shared, None)
+            else:
+                sys.modules[shared] = previous
+    cls = getattr(module, class_name)
+    if "parse" not in cls.__dict__ and not hasattr(cls, "FEED"):
+        raise LookupError(f"{class_name} em {ref} não tem parse() separado do fetch")
+    return cls
+
+
+def against(ref: str, bookmaker: Optional[str]) -> int:
+    """Parse atual vs parse de `ref` sobre o corpus, casa a casa."""
+    failures = 0
+    seen = 0
+    for name, path in iter_fixtures(bookmaker):
+        if name not in REGISTRY:
+            continue
+        cls = type(load_scraper(name))
+        try:
+            old = load_baseline(ref, name)
+        except LookupError as e:
+            print(f"FAIL  {path}  ({e})")
+            failures += 1
+            continue
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+        seen += 1
+
+        rows = canonical(cls.parse(data))
+        # parsers antigos ainda usavam print nos erros por evento
+        with contextlib.redirect_stdout(io.StringIO()):
+            want = canonical(old.parse(data))
+        status = "ok" if rows == want else "FAIL"
+        print(f"{status:5} {path}  ({len(rows)} cotações, {ref}: {len(want)})")
+        if rows != want:
+            print(f"      {ref}: " + _first_diff(rows, want))
+            failures += 1
+
+    if not seen:
+        print("nenhuma fixture encontrada")
+        return 1
+    return 1 if failures else 0
+
+
+# ==============================
+# BENCHMARK
+# ==============================
+def bench_one(name: str, body: bytes, repeat: int) -> Dict:
+    cls = type(load_scraper(name))
+
+    decode, parse = [], []
+    odds: List = []
+    for _ in range(repeat):
+        odds, took = cls.parse_timed(body)
+        decode.append(took["decode"])
+        parse.append(took["parse"])
+    events = len({o.event_id for o in odds})
+
+    streamed = None
+    if cls.stream_path() is not None:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_streamed(cls, body, 256 * 1024)
+            runs.append(time.perf_counter() - start)
+        streamed = statistics.median(runs)
+
+    # memória de um parse: pico acima da linha de base e o que sobra vivo
+    # (os Odds devolvidos); tracemalloc não conta alocações acumuladas
+    data = json.loads(body)
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    blocks = sys.getallocatedblocks()
+    result = cls.parse(data)
+    current, peak = tracemalloc.get_traced_memory()
+    retained_blocks = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+
+    parse_s = statistics.median(parse)
+    return {
+        "bookmaker": name,
+        "bytes": len(body),
+        "events": events,
+        "quotes": len(result),
+        "decode_ms": round(statistics.median(decode) * 1000, 2),
+        "parse_ms": round(parse_s * 1000, 2),
+        "stream_ms": round(streamed * 1000, 2) if streamed is not None else None,
+        "events_per_s": round(events / parse_s) if parse_s else None,
+        "quotes_per_s": round(len(result) / parse_s) if parse_s else None,
+        "peak_kb": round((peak - base) / 1024, 1),
+        "retained_kb": round((current - base) / 1024, 1),
+        "blocks_per_quote": round(retained_blocks / len(result), 1) if result else None,
+    }
+
+
+def print_table(rows: List[Dict]):
+    cols = ["bookmaker", "bytes", "events", "quotes", "decode_ms", "parse_ms", "stream_ms",
+            "events_per_s", "quotes_per_s", "peak_kb", "retained_kb", "blocks_per_quote"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.rjust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).rjust(widths[c]) for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden fixtures e benchmark dos parsers")
+    parser.add_argument("--check", action="store_true", help="compara o corpus com os golden")
+    parser.add_argument("--update", action="store_true",
+                        help="regrava os golden a partir do parse atual (confira antes com --against)")
+    parser.add_argument("--against", metavar="REF", default=None,
+                        help="compara o parse atual com o de outro commit sobre o corpus")
+    parser.add_argument("--bookmaker", default=None)
+    parser.add_argument("--events", type=int, default=1000, help="eventos do payload sintético")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", action="store_true", help="benchmark sobre o corpus em vez do sintético")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    # eventos inválidos do corpus geram um warning por evento
+    logging.disable(logging.WARNING)
+
+    if args.against:
+        sys.exit(against(args.against, args.bookmaker))
+    if args.check or args.update:
+        sys.exit(check(args.bookmaker, args.update))
+
+    if args.fixtures:
+        targets = []
+        for name, path in iter_fixtures(args.bookmaker):
+            if name in REGISTRY:
+                with open(path, "rb") as f:
+                    targets.append((name, f.read()))
+    else:
+        names = [args.bookmaker] if args.bookmaker else [n for n in REGISTRY if n in PAYLOADS]
+        targets = [(name, payload(name, args.events)) for name in names]
+
+    rows = [bench_one(name, body, args.repeat) for name, body in targets]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    elif rows:
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
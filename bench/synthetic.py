@@ -0,0 +1,246 @@
+"""
+Payloads sintéticos por casa, no formato de cada feed.
+
+Determinísticos (seed fixa): `payload(bookmaker, n)` monta n eventos com
+os casos que o parse precisa aguentar — nomes com acento e sufixo de
+clube, linhas múltiplas de total/handicap, mercados desconhecidos,
+evento sem participantes, sem liga, preço nulo ou em string, mercado
+"main" sem seleções. São a base do corpus em fixtures/ e do benchmark
+com `--events N`.
+
+    python -m bench.synthetic            # regrava fixtures/<casa>/synthetic.json
+"""
+import argparse
+import json
+import os
+import random
+from typing import Callable, Dict, List
+
+from scrapers.fixtures import FIXTURES_DIR
+
+TEAMS = [
+    "Flamengo", "Palmeiras FC", "São Paulo", "Grêmio", "Atlético-MG", "Internacional",
+    "Corinthians", "Fluminense", "Botafogo", "Vasco da Gama", "Athletico-PR", "Bahia",
+    "Manchester City", "Arsenal FC", "Liverpool", "Real Madrid CF", "Bayern München", "Inter",
+]
+LEAGUES = ["Brasileirão Série A", "Premier League", "La Liga", "Bundesliga", "Serie A"]
+LINES = (1.5, 2.5, 3.5)
+
+
+def _base_events(n: int, seed: int = 7) -> List[Dict]:
+    """Modelo comum: times, liga, kickoff e preços por mercado."""
+    rnd = random.Random(seed)
+    events = []
+    for i in range(n):
+        home, away = rnd.sample(TEAMS, 2)
+        ev = {
+            "i": i,
+            "home": home,
+            "away": away,
+            "league": rnd.choice(LEAGUES),
+            "start": f"2026-10-{20 + i % 9:02d}T{12 + i % 10:02d}:00:00Z",
+            "1x2": [round(rnd.uniform(1.4, 6.0), 2) for _ in range(3)],
+            "totals": [(line, round(rnd.uniform(1.5, 2.6), 2), round(rnd.uniform(1.5, 2.6), 2)) for line in LINES],
+            "btts": [round(rnd.uniform(1.6, 2.3), 2) for _ in range(2)],
+            "ah": [(h, round(rnd.uniform(1.7, 2.2), 2)) for h in (-0.5, 0.5)],
+            # casos de borda espalhados pelo lote
+            "edge": (
+                "no_teams" if i % 17 == 5 else
+                "no_league" if i % 13 == 4 else
+                "null_price" if i % 19 == 7 else
+                "str_price" if i % 11 == 3 else
+                "empty_main" if i % 23 == 9 else
+                "unknown_market" if i % 7 == 2 else
+                None
+            ),
+        }
+        events.append(ev)
+    return events
+
+
+def _price(ev: Dict, value: float):
+    if ev["edge"] == "null_price":
+        return None
+    if ev["edge"] == "str_price":
+        return f"{value:.2f}"
+    return value
+
+
+# ==============================
+# FEEDS JSON (FeedSpec)
+# ==============================
+def _feed_markets(ev: Dict, keys: Dict[str, str], sel: str = "selections", price: str = "price",
+                  with_lines: bool = True) -> List[Dict]:
+    h, d, a = ev["1x2"]
+
+    def p(v):
+        return _price(ev, v)
+
+    totals = []
+    for line, over, under in ev["totals"]:
+        totals.append({"name": f"Over {line}", price: p(over), **({"line": line} if with_lines else {})})
+        totals.append({"name": f"Under {line}", price: p(under), **({"line": line} if with_lines else {})})
+    markets = [
+        {"key": keys["1x2"], sel: [{"name": "home", price: p(h)}, {"name": "draw", price: p(d)},
+                                   {"name": "away", price: p(a)}]},
+        {"key": keys["dc"], sel: [{"name": "1x", price: p(round(1 / (1 / h + 1 / d), 2))},
+                                  {"name": "x2", price: p(round(1 / (1 / a + 1 / d), 2))},
+                                  {"name": "12", price: p(round(1 / (1 / h + 1 / a), 2))}]},
+        {"key": keys["totals"], sel: [] if ev["edge"] == "empty_main" else totals},
+        {"key": keys["btts"], sel: [{"name": "sim", price: p(ev["btts"][0])},
+                                    {"name": "não", price: p(ev["btts"][1])}]},
+        {"key": keys["ah"], sel: [{"name": f"home {hc:+}", price: p(v), **({"handicap": hc} if with_lines else {})}
+                                  for hc, v in ev["ah"]]},
+    ]
+    if ev["edge"] == "unknown_market":
+        markets.insert(1, {"key": "correct_score", sel: [{"name": "1-0", price: 7.5}]})
+    return markets
+
+
+def _participants(ev: Dict, positional: bool = True) -> List[Dict]:
+    if ev["edge"] == "no_teams":
+        return []
+    if positional:
+        # ordem trocada de propósito: o parse usa `position`, não o índice
+        return [{"name": ev["away"], "position": "away"}, {"name": ev["home"], "position": "home"}]
+    return [{"name": ev["home"]}, {"name": ev["away"]}]
+
+
+def _competition(ev: Dict) -> Dict:
+    return {} if ev["edge"] == "no_league" else {"competition": {"name": ev["league"]}}
+
+
+BETANO_KEYS = {"1x2": "match_result", "dc": "double_chance", "totals": "totals",
+               "btts": "both_teams_to_score", "ah": "asian_handicap"}
+
+
+def betano(n: int) -> Dict:
+    return {"data": {"events": [
+        {"id": 1000 + ev["i"], "name": f"{ev['home']} - {ev['away']}", "startTime": ev["start"],
+         **_competition(ev), "participants": _participants(ev), "markets": _feed_markets(ev, BETANO_KEYS)}
+        for ev in _base_events(n)
+    ]}}
+
+
+def kto(n: int) -> Dict:
+    # mesmas chaves da Betano, com variação de caixa (KTO compara em minúsculas)
+    keys = {k: v.upper() if i % 2 else v for i, (k, v) in enumerate(BETANO_KEYS.items())}
+    return {"events": [
+        {"id": 2000 + ev["i"], "startTime": ev["start"], **_competition(ev),
+         "participants": _participants(ev), "markets": _feed_markets(ev, keys)}
+        for ev in _base_events(n, seed=11)
+    ]}
+
+
+def sportingbet(n: int) -> Dict:
+    return {"events": [
+        {"id": 3000 + ev["i"], "startTime": ev["start"], **_competition(ev),
+         "participants": _participants(ev), "markets": _feed_markets(ev, BETANO_KEYS, with_lines=False)}
+        for ev in _base_events(n, seed=13)
+    ]}
+
+
+def bwin(n: int) -> Dict:
+    keys = {"1x2": "3Way", "dc": "DC", "totals": "Totals", "btts": "BTTS", "ah": "Handicap"}
+    return {"events": [
+        {"id": 4000 + ev["i"], "startDate": ev["start"], **_competition(ev),
+         "participants": _participants(ev, positional=False),
+         "markets": _feed_markets(ev, keys, sel="outcomes", price="odds")}
+        for ev in _base_events(n, seed=17)
+    ]}
+
+
+def stake(n: int) -> Dict:
+    keys = {"1x2": "match_odds", "dc": "double_chance", "totals": "totals",
+            "btts": "both_teams_to_score", "ah": "asian_handicap"}
+    events = []
+    for ev in _base_events(n, seed=19):
+        teams = {} if ev["edge"] == "no_teams" else {
+            "homeTeam": {"name": ev["home"]}, "awayTeam": {"name": ev["away"]}}
+        events.append({"id": 5000 + ev["i"], "startTime": ev["start"], **_competition(ev), **teams,
+                       "markets": _feed_markets(ev, keys, sel="outcomes")})
+    return {"events": events}
+
+
+# ==============================
+# LINEFEED (1xBet / 22Bet)
+# ==============================
+def linefeed(seed: int) -> Callable[[int], Dict]:
+    def build(n: int) -> Dict:
+        value = []
+        for ev in _base_events(n, seed=seed):
+            item = {"I": 6000 + ev["i"], "O1": ev["home"], "O2": ev["away"], "L": ev["league"],
+                    # o feed real manda epoch inteiro em `S`; metade do lote usa ISO
+                    "S": ev["start"] if ev["i"] % 2 else 1_792_000_000 + ev["i"] * 3600,
+                    "E": [{"T": t, "C": _price(ev, c)} for t, c in zip((1, 2, 3), ev["1x2"])]}
+            if ev["edge"] == "no_teams":
+                del item["O2"]
+            if ev["edge"] == "empty_main":
+                item["E"] = item["E"][:1]
+            value.append(item)
+        return {"Success": True, "Value": value}
+    return build
+
+
+# ==============================
+# PINNACLE (eventos + participantes + preços + períodos)
+# ==============================
+def pinnacle(n: int) -> Dict:
+    events, participants, prices, periods = [], [], [], []
+    for ev in _base_events(n, seed=23):
+        eid = 7000 + ev["i"]
+        home_id, away_id = 2 * eid, 2 * eid + 1
+        events.append({"id": eid, "homeId": home_id, "awayId": away_id,
+                       **({} if ev["edge"] == "no_league" else {"league": ev["league"]})})
+        participants.append({"id": home_id, "name": ev["home"]})
+        if ev["edge"] != "no_teams":
+            participants.append({"id": away_id, "name": ev["away"]})
+
+        for side, price in zip(("home", "draw", "away"), ev["1x2"]):
+            prices.append({"eventId": eid, "period": 0, "type": "moneyline", "side": side, "price": price})
+            # período 1 (1º tempo) não entra no parse
+            prices.append({"eventId": eid, "period": 1, "type": "moneyline", "side": side, "price": price + 0.4})
+        for line, over, under in ev["totals"]:
+            periods.append({"eventId": eid, "type": "total", "points": line})
+            prices.append({"eventId": eid, "period": 0, "type": "total", "side": f"over_{line}", "price": over})
+            prices.append({"eventId": eid, "period": 0, "type": "total", "side": f"under_{line}", "price": under})
+        for hc, price in ev["ah"]:
+            periods.append({"eventId": eid, "type": "spread", "points": hc})
+            prices.append({"eventId": eid, "period": 0, "type": "spread", "side": f"home_{hc}", "price": price})
+            prices.append({"eventId": eid, "period": 0, "type": "spread", "side": f"away_{-hc}",
+                           "price": round(3.9 - price, 2)})
+    return {"events": events, "participants": participants, "prices": prices, "periods": periods}
+
+
+PAYLOADS: Dict[str, Callable[[int], Dict]] = {
+    "betano": betano,
+    "bwin": bwin,
+    "kto": kto,
+    "sportingbet": sportingbet,
+    "stake": stake,
+    "1xbet": linefeed(29),
+    "22bet": linefeed(31),
+    "pinnacle": pinnacle,
+}
+
+
+def payload(bookmaker: str, n: int) -> bytes:
+    return json.dumps(PAYLOADS[bookmaker](n), ensure_ascii=False).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera os payloads sintéticos do corpus de fixtures")
+    parser.add_argument("--events", type=int, default=30)
+    parser.add_argument("--dir", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    for name in PAYLOADS:
+        path = os.path.join(args.dir, name, "synthetic.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(payload(name, args.events))
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
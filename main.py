@@ -1,24 +1,47 @@
 import os
-import asyncio
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
-from datetime import datetime
-
-from models.odds import Odds
-from utils.dedupe import dedupe_add
+import time
 
-# SCRAPERS
-from scrapers.betano import BetanoScraper
-from scrapers.bwin import BwinScraper
-from scrapers.kto import KTOScraper
-from scrapers.pinnacle import PinnacleScraper
-from scrapers.stake import StakeScraper
-from scrapers.xb1 import OneXBetScraper
-from scrapers.xb22 import TwentyTwoBetScraper
-from scrapers.sportingbet import SportingbetScraper
+_IMPORT_START = time.perf_counter()
 
-from services.surebet import detect_surebets
+import asyncio
+import json
+import logging
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, WebSocket
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+from utils.executor import COMPUTE
+from utils import metrics
+from utils.normalize import cache_stats
+from utils.profiler import PROFILER, finish_trace, recent_traces, start_trace
+from utils.log import log_stats, setup_logging, shutdown_logging
+
+# SCRAPERS (registro lazy: só as casas habilitadas são importadas)
+from scrapers import import_stats, load_scrapers
+from scrapers.browser import close_browser
+from scrapers.proxies import PROXIES
+
+from services.broadcast import UpdateHub
+from services.changelog import ChangeLog
+from services.cluster import CLUSTER_MODE, ClusterCoordinator
+from services.confirm import CONFIRM_ENABLED, SurebetConfirmer
+from services.cycles import CycleCoordinator
+from services.export import gzip_chunks, iter_csv, iter_json_dump, iter_ndjson
+from services.filters import as_set
+from services.filters import ResultFilter, decode_bound, decode_cursor
+from services.history import LineHistory
+from services.ingest import Ingestor
+from services.loadshed import LoadMonitor, ResponseCache
+from services.pipeline import DetectorPipeline
+from services.replay import REPLAY_LOG_PATH, ReplayLog
+from services.scheduler import ResourceScheduler
+from services.sizing import SIZER
+from services.shared import LEADER_RETRY_SECONDS, SHARED_DIR, WORKER_MODE, LeaderLock, SharedView, publish_state
+from services.snapshot import SnapshotReader, encode_snapshot, write_snapshot
+from services.storage import WriteBehind, make_backend
+from services.store import OddsStore
+from services.surebet import SurebetDetector
+from services.valuebet import ValuebetDetector
 
 
 # ==============================
@@ -27,6 +50,14 @@ from services.surebet import detect_surebets
 API_KEY = os.getenv("BETSCANNER_API_KEY", None)
 SCRAPE_INTERVAL = int(os.getenv("SCRAPE_INTERVAL_SECONDS", "120"))
 DEFAULT_DAYS_AHEAD = int(os.getenv("DEFAULT_DAYS_AHEAD", "3"))
+# odds não revistas há mais que isso saem do store (0 = nunca expira)
+ODDS_TTL_SECONDS = float(os.getenv("ODDS_TTL_SECONDS", "900"))
+# checkpoint binário do store para warm restart ("" desliga)
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/odds.snap")
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "300"))
+
+setup_logging()
+log = logging.getLogger(__name__)
 
 app = FastAPI(title="BetScanner API")
 
@@ -39,114 +70,508 @@ app.add_middleware(
 )
 
 # Storage global
-ODDS_STORE: List[Dict] = []
+ODDS_STORE = OddsStore()
 STORE_LOCK = asyncio.Lock()
 
-# Lista oficial de scrapers
-SCRAPERS = [
-    BetanoScraper(),
-    BwinScraper(),
-    KTOScraper(),
-    PinnacleScraper(),
-    StakeScraper(),
-    OneXBetScraper(),
-    TwentyTwoBetScraper(),
-    SportingbetScraper(),
-]
+# Detectores registrados no ingest (endpoints só leem PIPELINE.results)
+PIPELINE = DetectorPipeline()
+PIPELINE.register(SurebetDetector(min_profit_pct=0.1))
+PIPELINE.register(ValuebetDetector(threshold_pct=5))
+
+# Push de deltas para /ws/updates
+HUB = UpdateHub(PIPELINE.results)
+
+# Ingest: store + detectores + change log (sync incremental de /odds)
+CHANGELOG = ChangeLog()
+INGEST = Ingestor(ODDS_STORE, PIPELINE, ttl=ODDS_TTL_SECONDS)
+INGEST.add_sink(CHANGELOG.record)
+
+# Persistência (STORE_BACKEND=memory|sqlite), gravada em write-behind
+STORAGE = WriteBehind(make_backend())
+INGEST.add_sink(STORAGE.record)
+
+# Movimento de linha por cotação (ring buffers compactos)
+HISTORY = LineHistory()
+INGEST.add_observer(HISTORY.observe)
+INGEST.add_sink(HISTORY.forget)
+
+# Lotes de ingest gravados para replay/backtest (python -m services.replay)
+REPLAY_LOG = ReplayLog(REPLAY_LOG_PATH) if REPLAY_LOG_PATH else None
+if REPLAY_LOG is not None:
+    INGEST.add_observer(REPLAY_LOG.record)
+
+
+# Multi-worker (WORKER_MODE=shared): o dono do lock scrapeia e publica o
+# store em SHARED_DIR; os outros workers servem leitura do snapshot (mmap)
+SHARED = WORKER_MODE == "shared"
+SHARED_PATH = os.path.join(SHARED_DIR, "state.snap")
+LEADER = LeaderLock(os.path.join(SHARED_DIR, "leader.lock"))
+SHARED_VIEW = SharedView(SHARED_PATH)
+
+
+def require_api_key(x_api_key: str = Header(None)):
+    if API_KEY and x_api_key != API_KEY:
+        raise HTTPException(401, "invalid api key")
+
+
+def is_reader() -> bool:
+    return SHARED and not LEADER.held
+
+
+def require_leader():
+    if is_reader():
+        raise HTTPException(503, "disponível só no worker líder (WORKER_MODE=shared)")
+
+
+def current_store():
+    """OddsStore local, ou o snapshot publicado pelo líder num worker leitor."""
+    if is_reader():
+        SHARED_VIEW.refresh()
+        return SHARED_VIEW
+    return ODDS_STORE
+
+
+def current_results():
+    if is_reader():
+        SHARED_VIEW.refresh()
+        return SHARED_VIEW.results
+    return PIPELINE.results
+
+
+def store_version():
+    """Muda sempre que o store visível muda (chave do cache de respostas)."""
+    store = current_store()
+    if store is SHARED_VIEW:
+        # num leitor o changelog local não anda: conta as trocas de snapshot
+        return ("shared", SHARED_VIEW.reloads)
+    # warm start carrega o store sem passar pelo changelog
+    return (CHANGELOG.seq, len(ODDS_STORE))
+
+# Métricas calculadas na hora do scrape
+metrics.STORE_SIZE.set_function(lambda: len(ODDS_STORE))
+metrics.SUREBET_COUNT.set_function(lambda: len(PIPELINE.results.get("surebets")))
+metrics.VALUEBET_COUNT.set_function(lambda: len(PIPELINE.results.get("valuebets")))
+metrics.COMPUTE_QUEUE_DEPTH.set_function(lambda: COMPUTE.queue_depth)
+metrics.COMPUTE_RUNNING.set_function(lambda: COMPUTE.stats()["running"])
+metrics.NORMALIZE_CACHE_HITS.set_function(lambda: cache_stats()["hits"])
+metrics.NORMALIZE_CACHE_MISSES.set_function(lambda: cache_stats()["misses"])
+metrics.LOG_SUPPRESSED.set_function(lambda: log_stats()["suppressed"])
+metrics.LOG_DROPPED.set_function(lambda: log_stats()["dropped"])
+metrics.NORMALIZE_CACHE_HIT_RATIO.set_function(
+    lambda: cache_stats()["hits"] / max(1, sum(cache_stats().values()))
+)
+
+# Lag do event loop, latência por endpoint e shedding (última resposta pronta)
+LOAD = LoadMonitor()
+RESPONSES = ResponseCache(LOAD)
+
+
+def cached_json(key, version, build) -> Response:
+    """
+    Resposta JSON pelo cache de respostas: mesma versão dos dados → bytes
+    prontos; em shedding serve a última versão em vez de recalcular.
+    """
+    body, state = RESPONSES.get(key, version)
+    if body is None:
+        body = json.dumps(build(), default=str).encode()
+        RESPONSES.put(key, version, body)
+    return Response(body, media_type="application/json", headers={"X-Cache": state})
+
+
+@app.middleware("http")
+async def track_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # usa o template da rota (ex: /surebets) para não explodir cardinalidade
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        elapsed = time.perf_counter() - start
+        metrics.HTTP_REQUEST_SECONDS.labels(request.method, path, status).observe(elapsed)
+        LOAD.observe_request(path, elapsed)
+
+
+# Lista oficial de scrapers (ENABLED_SCRAPERS)
+SCRAPERS = load_scrapers()
+
+# Concorrência dos scrapers por classe de recurso e orçamento de memória
+SCHEDULER = ResourceScheduler()
+metrics.SCHEDULER_RESERVED_MB.set_function(lambda: SCHEDULER.reserved_mb)
 
 
 # ==============================
 # EXECUTAR SCRAPERS
 # ==============================
-async def run_scrapers(days_ahead: int = DEFAULT_DAYS_AHEAD) -> int:
+async def run_scrapers(days_ahead: int = DEFAULT_DAYS_AHEAD, bookmakers=None) -> int:
+    """Um ciclo completo (ou só das casas em `bookmakers`). Use CYCLES.trigger."""
+    trace = start_trace()
+    PROFILER.cycle_started(trace)
+    try:
+        with metrics.CYCLE_SECONDS.time():
+            added = await _run_cycle(days_ahead, bookmakers)
+        trace.meta["added"] = added
+        if bookmakers:
+            trace.meta["bookmakers"] = sorted(bookmakers)
+        return added
+    finally:
+        PROFILER.cycle_finished()
+        finish_trace(trace)
+
+
+async def _run_cycle(days_ahead: int, bookmakers=None) -> int:
     tasks = []
 
     async def run_one(scr):
         try:
-            print(f"[SCRAPER] Iniciando {scr.name}")
-            return await asyncio.wait_for(scr.fetch_upcoming(days_ahead), timeout=60)
+            # admissão por classe/memória; o timeout só conta depois de admitido
+            async with SCHEDULER.slot(scr):
+                log.info("scraper start", extra={"bookmaker": scr.name})
+                return await asyncio.wait_for(scr.fetch_upcoming(days_ahead), timeout=60)
         except asyncio.TimeoutError:
-            print(f"[TIMEOUT] {scr.name}")
+            log.warning("scraper timeout", extra={"bookmaker": scr.name})
+            metrics.SCRAPER_ERRORS.labels(scr.name, "timeout").inc()
             return []
         except Exception as e:
-            print(f"[ERRO] {scr.name}: {e}")
+            log.error("scraper error: %s", e, extra={"bookmaker": scr.name})
+            metrics.SCRAPER_ERRORS.labels(scr.name, "error").inc()
             return []
 
     for s in SCRAPERS:
-        tasks.append(run_one(s))
+        if not bookmakers or s.name in bookmakers:
+            tasks.append(run_one(s))
 
     results = await asyncio.gather(*tasks)
+    return await ingest_results(results)
 
-    # Normalização e dedupe
-    new_items = []
 
-    for res in results:
-        if isinstance(res, list):
-            for o in res:
-                if isinstance(o, Odds):
-                    new_items.append(o.dict())
-                elif isinstance(o, dict):
-                    new_items.append(o)
+async def ingest_results(results: list) -> int:
+    """Lotes de scrapers (locais ou de workers do cluster) → store, detectores, push."""
+    # ingest disputa CPU/GIL com a API: com o loop atrasado, espera acalmar
+    # (até INGEST_DEFER_MAX_SECONDS) — o scrape fica mais velho, a API responde
+    await LOAD.wait_calm("ingest")
 
+    # Normalização, dedupe e detecção: uma passada só, fora do event loop
     async with STORE_LOCK:
-        added = dedupe_add(ODDS_STORE, new_items)
+        added = await COMPUTE.run_serial(INGEST.ingest, results)
+        delta = PIPELINE.results.last_delta
+        HUB.publish(delta)
+
+    log.info("odds adicionadas", extra={"added": added, "store": len(ODDS_STORE)})
+    await publish_shared()
 
-    print(f"[SCRAPERS] {added} odds adicionadas.")
+    # confirmação das surebets novas corre em paralelo ao próximo sleep
+    if CONFIRM_ENABLED:
+        schedule_confirmation(delta)
     return added
 
 
+async def _cycle(scope) -> dict:
+    added = await run_scrapers(bookmakers=scope)
+    return {"added": added, "total_odds": len(ODDS_STORE)}
+
+
+# Single-flight: periodic_scrape e /_force_scrape nunca rodam ciclos em paralelo
+CYCLES = CycleCoordinator(_cycle)
+
+
+async def _cluster_batch(bookmaker: str, odds: list):
+    await ingest_results([odds])
+
+
+# Scraping distribuído (CLUSTER_MODE=coordinator): workers recebem casas e
+# mandam os lotes; casas sem worker continuam no ciclo local
+CLUSTER = (
+    ClusterCoordinator([s.name for s in SCRAPERS], on_batch=_cluster_batch)
+    if CLUSTER_MODE == "coordinator" else None
+)
+
+
+def local_scope():
+    """Casas que este processo scrapeia: todas, ou as sem worker no cluster."""
+    if CLUSTER is None:
+        return None
+    return CLUSTER.unassigned()
+
+
+# ==============================
+# CONFIRMAÇÃO DE SUREBETS
+# ==============================
+CONFIRMER = SurebetConfirmer({s.name: s for s in SCRAPERS}, min_profit_pct=0.1,
+                             slot=SCHEDULER.slot, local=local_scope)
+_confirm_task = None
+
+
+async def _apply_confirmations(outcomes):
+    async with STORE_LOCK:
+        delta = await COMPUTE.run_serial(CONFIRMER.apply, PIPELINE.results, outcomes)
+        HUB.publish(delta)
+    if delta:
+        await publish_shared()
+
+
+async def _confirm(delta):
+    try:
+        await LOAD.wait_calm("confirm")
+        summary = await CONFIRMER.run(delta, _apply_confirmations)
+        if summary["candidates"]:
+            log.info("surebets confirmadas", extra=summary)
+    except Exception as e:
+        log.error("confirm error: %s", e)
+
+
+def schedule_confirmation(delta):
+    global _confirm_task
+    if _confirm_task is not None and not _confirm_task.done():
+        log.info("confirmação anterior ainda em andamento, pulando")
+        return
+    _confirm_task = asyncio.create_task(_confirm(delta))
+
+
+# ==============================
+# PUBLICAÇÃO PARA WORKERS LEITORES
+# ==============================
+# intervalo mínimo entre duas regravações do snapshot compartilhado
+SHARED_PUBLISH_SECONDS = float(os.getenv("SHARED_PUBLISH_SECONDS", "2"))
+_shared_task = None
+_shared_published = None  # versão do último snapshot gravado
+
+
+def _publish_shared() -> int:
+    results = PIPELINE.results
+    # com os instantes de visita: um novo líder retoma o TTL de onde parou
+    odds, seen = ODDS_STORE.snapshot_seen()
+    return publish_state(
+        SHARED_PATH,
+        odds,
+        {name: results.get(name) for name in results.names},
+        results.version,
+        ids={name: [item_id for item_id, _ in results.entries(name)] for name in results.names},
+        seen=seen,
+    )
+
+
+def _shared_version():
+    return (CHANGELOG.seq, len(ODDS_STORE), PIPELINE.results.version)
+
+
+async def _publish_shared_now():
+    global _shared_published
+    version = _shared_version()
+    if version == _shared_published:
+        return
+    try:
+        # lane serial: store e resultados consistentes entre si
+        size = await COMPUTE.run_serial(_publish_shared)
+        _shared_published = version
+        log.debug("snapshot compartilhado publicado", extra={"bytes": size})
+    except Exception as e:
+        log.error("shared publish error: %s", e, extra={"path": SHARED_PATH})
+
+
+async def _publish_shared_later():
+    # um publish por janela: os lotes que chegam enquanto espera (ou
+    # enquanto grava) entram no mesmo snapshot ou no próximo
+    while True:
+        await asyncio.sleep(SHARED_PUBLISH_SECONDS)
+        await _publish_shared_now()
+        if _shared_version() == _shared_published:
+            return
+
+
+async def publish_shared(force: bool = False):
+    """
+    Marca o estado como alterado; o snapshot (store inteiro + resultados)
+    é regravado no máximo uma vez a cada SHARED_PUBLISH_SECONDS, não a
+    cada lote. `force` grava já (shutdown).
+    """
+    global _shared_task
+    if not (SHARED and LEADER.held):
+        return
+    if force:
+        await _publish_shared_now()
+        return
+    if _shared_task is None or _shared_task.done():
+        _shared_task = asyncio.create_task(_publish_shared_later())
+
+
+# ==============================
+# CHECKPOINT (WARM RESTART)
+# ==============================
+_last_checkpoint = 0.0
+
+
+def _read_checkpoint(path: str, max_age: float):
+    reader = SnapshotReader.open(path)
+    try:
+        age = time.time() - reader.created_at
+        if max_age > 0 and age > max_age:
+            return None, None, age
+        rows = list(reader.rows())
+        # checkpoints antigos não têm a coluna: vale o instante do arquivo
+        seen = list(reader.seen) if reader.seen is not None else [reader.created_at] * len(rows)
+        return rows, seen, age
+    finally:
+        reader.close()
+
+
+async def _warm_ingest(rows: list, seen: list):
+    async with STORE_LOCK:
+        await COMPUTE.run_serial(INGEST.restore, rows, seen)
+        HUB.publish(PIPELINE.results.last_delta)
+
+
+async def load_checkpoint(path: str = SNAPSHOT_PATH):
+    """Recarrega o último checkpoint no store (e nos detectores)."""
+    if not path or not os.path.exists(path):
+        return
+
+    try:
+        start = time.perf_counter()
+        rows, seen, age = await COMPUTE.run_serial(_read_checkpoint, path, ODDS_TTL_SECONDS)
+        if rows is None:
+            log.info("checkpoint expirado, ignorado", extra={"path": path, "age": round(age)})
+            return
+
+        await _warm_ingest(rows, seen)
+        log.info("checkpoint carregado", extra={
+            "path": path,
+            "odds": len(rows),
+            "age": round(age),
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+    except Exception as e:
+        log.error("checkpoint load error: %s", e, extra={"path": path})
+
+
+async def warm_start():
+    """Backend persistente primeiro; sem dados nele, cai no checkpoint binário."""
+    backend = STORAGE.backend
+    if backend.persistent:
+        try:
+            start = time.perf_counter()
+            rows, seen_at = await COMPUTE.run_serial(backend.load, ODDS_TTL_SECONDS)
+            if rows:
+                await _warm_ingest(rows, [seen_at] * len(rows))
+                STORAGE.discard()  # já estão no backend
+                log.info("store carregado", extra={
+                    "backend": backend.name,
+                    "odds": len(rows),
+                    "ms": round((time.perf_counter() - start) * 1000, 1),
+                })
+                return
+        except Exception as e:
+            log.error("store load error: %s", e, extra={"backend": backend.name})
+
+    # assumindo a liderança: o último snapshot publicado é o estado mais novo
+    if SHARED and os.path.exists(SHARED_PATH):
+        await load_checkpoint(SHARED_PATH)
+    else:
+        await load_checkpoint()
+
+
+def _write_checkpoint() -> int:
+    odds, seen = ODDS_STORE.snapshot_seen()
+    return write_snapshot(odds, SNAPSHOT_PATH, seen=seen)
+
+
+async def save_checkpoint(force: bool = False):
+    global _last_checkpoint
+
+    # com backend persistente o checkpoint é redundante
+    if not SNAPSHOT_PATH or STORAGE.backend.persistent:
+        return
+    if not force and time.time() - _last_checkpoint < SNAPSHOT_INTERVAL:
+        return
+    if not force:
+        await LOAD.wait_calm("checkpoint")
+
+    try:
+        # no lane serial: o snapshot do store é consistente com o ingest
+        size = await COMPUTE.run_serial(_write_checkpoint)
+        _last_checkpoint = time.time()
+        log.info("checkpoint salvo", extra={"path": SNAPSHOT_PATH, "bytes": size})
+    except Exception as e:
+        log.error("checkpoint save error: %s", e, extra={"path": SNAPSHOT_PATH})
+
+
 # ==============================
 # LOOP AUTOMÁTICO
 # ==============================
 @app.on_event("startup")
 async def startup_event():
+    LOAD.start()
+    log.info("boot", extra={
+        "import_seconds": round(IMPORT_SECONDS, 3),
+        "scrapers": [s.name for s in SCRAPERS],
+        "scraper_import_ms": import_stats(),
+    })
+
+    if SHARED and not LEADER.try_acquire():
+        log.info("worker leitor", extra={"pid": os.getpid(), "shared": SHARED_PATH})
+        SHARED_VIEW.refresh(force=True)
+        app.state.scrape_task = asyncio.create_task(follow_leader())
+        return
+
+    await start_leader()
+
+
+async def start_leader():
+    if SHARED:
+        log.info("worker líder", extra={"pid": os.getpid(), "shared": SHARED_PATH})
+    await warm_start()
+    STORAGE.start()
+    if CLUSTER is not None:
+        await CLUSTER.start()
     app.state.scrape_task = asyncio.create_task(periodic_scrape())
 
 
+async def follow_leader():
+    """Worker leitor: tenta o lock de tempos em tempos; se o líder morrer, assume."""
+    while True:
+        await asyncio.sleep(LEADER_RETRY_SECONDS)
+        if LEADER.try_acquire():
+            await start_leader()
+            return
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     task = getattr(app.state, "scrape_task", None)
     if task:
         task.cancel()
+    LOAD.stop()
+
+    if not is_reader():
+        await publish_shared(force=True)
+        await save_checkpoint(force=True)
+    if CLUSTER is not None:
+        await CLUSTER.stop()
+    STORAGE.close()
+    if REPLAY_LOG is not None:
+        REPLAY_LOG.close()
+    await close_browser()
+    LEADER.release()
+    COMPUTE.shutdown()
+    shutdown_logging()
 
 
 async def periodic_scrape():
     while True:
         try:
-            await run_scrapers()
+            scope = local_scope()
+            if scope is None or scope:
+                await CYCLES.trigger(scope, source="periodic", respect_cooldown=False)
+            await save_checkpoint()
         except Exception as e:
-            print("[SCRAPER LOOP ERROR]", e)
+            log.exception("scraper loop error: %s", e)
 
         await asyncio.sleep(SCRAPE_INTERVAL)
 
 
-# ==============================
-# VALUE BETS
-# ==============================
-def detect_valuebets(odds_list, threshold_pct=5):
-    results = []
-
-    for o in odds_list:
-        try:
-            prob = 1 / float(o["odds"])
-            fair = 1 / prob
-            diff_pct = ((o["odds"] - fair) / fair) * 100
-
-            if diff_pct >= threshold_pct:
-                results.append({
-                    "event": f"{o['home_team']} vs {o['away_team']}",
-                    "market": o["market"],
-                    "selection": o["selection"],
-                    "bookmaker": o["bookmaker"],
-                    "odds": o["odds"],
-                    "value_pct": round(diff_pct, 2),
-                })
-        except:
-            continue
-
-    return results
-
-
 # ==============================
 # ENDPOINTS OFICIAIS
 # ==============================
@@ -156,28 +581,340 @@ async def root():
     return {"status": "ok", "message": "BetScanner API is running."}
 
 
-@app.get("/surebets")
-async def api_surebets():
+@app.get("/odds", dependencies=[Depends(require_api_key)])
+async def api_odds(since: int = None, limit: int = 1000):
+    """
+    Sem `since`: dump completo (em streaming) + `seq` atual (cursor inicial).
+    Com `since`: só as mudanças (upsert/remove) depois do cursor; `next`
+    é o cursor da próxima chamada. Cursor fora da retenção → 410 + resync.
+    """
+    if since is None:
+        # lê o seq ANTES do snapshot: no pior caso o cliente reaplica
+        # upserts já contidos no dump (idempotente)
+        seq = CHANGELOG.seq
+        # gerador síncrono: o Starlette serializa numa threadpool, fora do
+        # loop, e o store inteiro não vira bytes no cache de respostas
+        return StreamingResponse(
+            iter_json_dump({"seq": seq}, current_store().query()),
+            media_type="application/json",
+        )
+
+    require_leader()
+
+    limit = max(1, min(limit, 50000))
+    changes = CHANGELOG.since(since, limit)
+    if changes is None:
+        return JSONResponse(status_code=410, content={
+            "resync": True,
+            "seq": CHANGELOG.seq,
+            "oldest_seq": CHANGELOG.oldest_seq,
+        })
+
+    next_seq = changes[-1]["seq"] if changes else since
+    return {
+        "since": since,
+        "next": next_seq,
+        "has_more": next_seq < CHANGELOG.seq,
+        "count": len(changes),
+        "changes": changes,
+    }
+
+
+@app.get("/export/odds.{fmt}", dependencies=[Depends(require_api_key)])
+async def export_odds(fmt: str, bookmaker: str = None, league: str = None, market: str = None,
+                      start_from: str = None, start_to: str = None, gzip: bool = False):
+    """
+    Export em streaming (ndjson | csv) do store, com filtros aplicados no
+    próprio store. bookmaker/league/market aceitam listas separadas por
+    vírgula; start_from/start_to aceitam ISO 8601 ou epoch.
+    `snap` devolve o snapshot binário colunar (ver services/snapshot.py).
+    """
+    if fmt not in ("ndjson", "csv", "snap"):
+        raise HTTPException(404, "formato deve ser ndjson, csv ou snap")
+
     try:
-        sb = detect_surebets(ODDS_STORE, min_profit_pct=0.1)
-        return {"count": len(sb), "surebets": sb}
-    except Exception as e:
-        raise HTTPException(500, str(e))
+        window = decode_bound("start_from", start_from), decode_bound("start_to", start_to)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    rows = current_store().query(
+        bookmakers=as_set(bookmaker),
+        leagues=as_set(league),
+        markets=as_set(market),
+        start_from=window[0],
+        start_to=window[1],
+    )
+
+    if fmt == "snap":
+        data = await COMPUTE.run_serial(encode_snapshot, rows)
+        if gzip:
+            data = b"".join(gzip_chunks(iter([data])))
+        return Response(
+            data,
+            media_type="application/gzip" if gzip else "application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="odds.snap{".gz" if gzip else ""}"'},
+        )
+
+    # gerador síncrono → o Starlette itera numa threadpool, fora do loop
+    chunks = iter_ndjson(rows) if fmt == "ndjson" else iter_csv(rows)
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    filename = f"odds.{fmt}"
+
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# stakes/Kelly anexados por detector (vetorizado sobre a página inteira)
+SIZING = {"surebets": SIZER.surebets, "valuebets": SIZER.valuebets}
+
+
+def query_results(name: str, league: str = None, bookmaker: str = None, market: str = None,
+                  min_profit: float = None, start_from: str = None, start_to: str = None,
+                  sort: str = "profit", limit: int = None, cursor: str = None, sizing: dict = None):
+    """
+    Consulta um detector pelos índices secundários da versão publicada.
+    Sem `limit` devolve tudo (comportamento original); `next_cursor`
+    continua a paginação na mesma ordenação. `sizing` são os parâmetros
+    do dimensionamento (banca, payout, fração de Kelly).
+    """
+    sizing = sizing or {}
+    if any(v is not None and v <= 0 for v in sizing.values()):
+        raise HTTPException(400, "bankroll, payout e kelly devem ser positivos")
+
+    results = current_results()
+    key = (name, league, bookmaker, market, min_profit, start_from, start_to, sort, limit, cursor,
+           tuple(sorted(sizing.items())))
+    return cached_json(key, results.version, lambda: _query_results(
+        results, name, league, bookmaker, market, min_profit, start_from, start_to, sort, limit, cursor,
+        sizing))
+
+
+def _query_results(results, name, league, bookmaker, market, min_profit, start_from, start_to,
+                   sort, limit, cursor, sizing) -> dict:
+    index = results.index(name)
+    try:
+        items, next_cursor = index.query(
+            leagues=league,
+            bookmakers=bookmaker,
+            markets=market,
+            min_profit=min_profit,
+            start_from=decode_bound("start_from", start_from),
+            start_to=decode_bound("start_to", start_to),
+            sort=sort,
+            limit=max(1, min(limit, 5000)) if limit else max(len(index), 1),
+            cursor=decode_cursor(cursor),
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    if name in SIZING:
+        items = SIZING[name](items, **sizing)
+
+    return {
+        "count": len(items),
+        "total": len(index),
+        "version": results.version,
+        "next_cursor": next_cursor,
+        name: items,
+    }
+
+
+@app.get("/surebets")
+async def api_surebets(league: str = None, bookmaker: str = None, market: str = None,
+                       min_profit: float = None, start_from: str = None, start_to: str = None,
+                       sort: str = "profit", limit: int = None, cursor: str = None,
+                       bankroll: float = None, payout: float = None):
+    """
+    league/bookmaker/market aceitam listas separadas por vírgula (casa e
+    mercado batem com qualquer perna); start_from/start_to = janela de
+    kickoff (ISO 8601 ou epoch); sort = profit (desc) | kickoff (asc).
+    `sizing` de cada item: stakes por perna para `bankroll` (total) ou
+    `payout` (retorno alvo), arredondadas no passo de cada casa.
+    """
+    if bankroll is not None and payout is not None:
+        raise HTTPException(400, "use bankroll ou payout, não os dois")
+    return query_results("surebets", league, bookmaker, market, min_profit,
+                         start_from, start_to, sort, limit, cursor,
+                         sizing={"bankroll": bankroll, "payout": payout})
 
 
 @app.get("/valuebets")
-async def api_valuebets():
+async def api_valuebets(league: str = None, bookmaker: str = None, market: str = None,
+                        min_ev: float = None, start_from: str = None, start_to: str = None,
+                        sort: str = "profit", limit: int = None, cursor: str = None,
+                        bankroll: float = None, kelly: float = None):
+    """
+    Mesmos filtros de /surebets; `min_ev` é o value_pct mínimo. `sizing`
+    de cada item: Kelly fracionário (`kelly`, padrão KELLY_FRACTION) sobre
+    `bankroll`.
+    """
+    return query_results("valuebets", league, bookmaker, market, min_ev,
+                         start_from, start_to, sort, limit, cursor,
+                         sizing={"bankroll": bankroll, "fraction": kelly})
+
+
+@app.get("/history", dependencies=[Depends(require_api_key), Depends(require_leader)])
+async def api_history(home: str = None, away: str = None, league: str = None, market: str = None,
+                      bookmaker: str = None, selection: str = None, limit: int = 500):
+    """
+    Movimento de linha por cotação: últimos pontos (epoch, odds), variação
+    desde o primeiro ponto retido, velocidade por minuto e segundos desde a
+    última mudança. home+away usam o índice por evento.
+    """
+    if not any((home, away, league, market, bookmaker, selection)):
+        raise HTTPException(400, "informe ao menos um filtro (home/away, league, market, bookmaker, selection)")
+
+    limit = max(1, min(limit, 5000))
+    lines = HISTORY.query(home, away, league, market, bookmaker, selection, limit=limit)
+    return {"count": len(lines), "history": lines, "stats": HISTORY.stats()}
+
+
+@app.websocket("/ws/updates")
+async def ws_updates(ws: WebSocket):
+    """
+    Snapshot inicial + deltas (appeared/changed/vanished) a cada ingest.
+    Filtros via query string ou {"type": "subscribe", ...}:
+    league, bookmaker, market (listas separadas por vírgula), min_profit.
+    Filtro inválido na query string fecha com 1008 (policy violation).
+    """
+    if is_reader():
+        await ws.close(code=1013)  # try again later: só o líder tem o feed
+        return
     try:
-        vb = detect_valuebets(ODDS_STORE)
-        return {"count": len(vb), "valuebets": vb}
-    except Exception as e:
-        raise HTTPException(500, str(e))
+        flt = ResultFilter.from_params(ws.query_params)
+    except ValueError as e:
+        await ws.close(code=1008, reason=f"filtro inválido: {e}")
+        return
+    await HUB.serve(ws, flt)
 
 
 # ==============================
 # ENDPOINT PARA TESTAR SCRAPERS
 # ==============================
-@app.get("/_force_scrape")
-async def force_scrape():
-    added = await run_scrapers()
-    return {"added": added, "total_odds": len(ODDS_STORE)}
+@app.get("/_force_scrape", dependencies=[Depends(require_leader)])
+async def force_scrape(bookmaker: str = None, wait: bool = True):
+    """
+    Dispara (ou entra em) um ciclo. `bookmaker` limita o escopo (lista
+    separada por vírgula). `status`: started | joined | queued | rejected
+    (cooldown, 429 com `retry_after`). `wait=false` responde sem esperar.
+    """
+    scope = as_set(bookmaker)
+    if scope:
+        unknown = scope - {s.name for s in SCRAPERS}
+        if unknown:
+            raise HTTPException(404, f"bookmaker desconhecido: {', '.join(sorted(unknown))}")
+
+    delegated = []
+    if CLUSTER is not None:
+        # casas com worker: pede um ciclo a eles; o resto roda aqui
+        wanted = scope or {s.name for s in SCRAPERS}
+        delegated = sorted(wanted & CLUSTER.assigned())
+        if delegated:
+            await CLUSTER.request_scrape(set(delegated))
+        scope = wanted & CLUSTER.unassigned()
+        if not scope:
+            return {"status": "delegated", "delegated": delegated}
+
+    result = await CYCLES.trigger(scope, wait=wait)
+    if delegated:
+        result["delegated"] = delegated
+    if result["status"] == "rejected":
+        return JSONResponse(status_code=429, content=result,
+                            headers={"Retry-After": str(int(result["retry_after"]) + 1)})
+    return result
+
+
+@app.get("/_cycles", dependencies=[Depends(require_leader)])
+async def cycle_stats():
+    return CYCLES.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(
+        metrics.render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/_executor")
+async def executor_stats():
+    return COMPUTE.stats()
+
+
+@app.get("/_proxies")
+async def proxy_stats():
+    return PROXIES.stats()
+
+
+@app.get("/_load")
+async def load_stats():
+    return LOAD.stats()
+
+
+@app.get("/_scheduler")
+async def scheduler_stats():
+    return SCHEDULER.stats()
+
+
+@app.get("/_storage")
+async def storage_stats():
+    return STORAGE.stats()
+
+
+@app.get("/_cluster", dependencies=[Depends(require_leader)])
+async def cluster_stats():
+    if CLUSTER is None:
+        return {"mode": CLUSTER_MODE}
+    return {"mode": CLUSTER_MODE, **CLUSTER.stats()}
+
+
+@app.get("/_worker")
+async def worker_stats():
+    out = {"pid": os.getpid(), "mode": WORKER_MODE, "role": "reader" if is_reader() else "leader"}
+    if SHARED:
+        SHARED_VIEW.refresh()
+        out["shared"] = SHARED_VIEW.stats()
+    return out
+
+
+# ==============================
+# ADMIN / DIAGNÓSTICO
+# ==============================
+@app.get("/admin/traces", dependencies=[Depends(require_api_key), Depends(require_leader)])
+async def admin_traces(limit: int = 10, spans: bool = True):
+    """Últimos ciclos (mais recente primeiro) com spans por estágio/casa."""
+    return {"traces": recent_traces(limit, spans=spans)}
+
+
+@app.post("/admin/profile", dependencies=[Depends(require_api_key), Depends(require_leader)])
+async def admin_profile(seconds: float = 30, mode: str = "sample", top: int = 30):
+    """
+    Arma um profile (sampling de todas as threads ou cProfile do loop)
+    sobre o próximo ciclo, limitado a `seconds`, e devolve as top funções.
+    """
+    if PROFILER.busy:
+        raise HTTPException(409, "profile already armed")
+
+    seconds = max(1.0, min(seconds, 300.0))
+    try:
+        return await PROFILER.profile_next_cycle(
+            seconds, mode=mode, top=top, wait_timeout=SCRAPE_INTERVAL * 2
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "no scrape cycle started in time")
+
+
+# tempo de import do módulo inteiro, reportado no startup e em /metrics
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+metrics.STARTUP_IMPORT_SECONDS.set(IMPORT_SECONDS)
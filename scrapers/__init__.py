@@ -1,20 +1,59 @@
-from .betano import BetanoScraper
-from .bwin import BwinScraper
-from .kto import KTOScraper
-from .pinnacle import PinnacleScraper
-from .stake import StakeScraper
-from .xb1 import OneXBetScraper
-from .xb22 import TwentyTwoBetScraper
-from .sportingbet import SportingbetScraper
-
-
-SCRAPERS = [
-    BetanoScraper(),
-    BwinScraper(),
-    KTOScraper(),
-    PinnacleScraper(),
-    StakeScraper(),
-    OneXBetScraper(),
-    TwentyTwoBetScraper(),
-    SportingbetScraper(),
-]
+import importlib
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# REGISTRO DE SCRAPERS
+# ==============================
+# nome → (módulo, classe). Nada é importado aqui: o módulo só carrega
+# quando a casa está habilitada, e o Playwright só quando um token é pedido.
+REGISTRY: Dict[str, tuple] = {
+    "betano": ("scrapers.betano", "BetanoScraper"),
+    "bwin": ("scrapers.bwin", "BwinScraper"),
+    "kto": ("scrapers.kto", "KTOScraper"),
+    "pinnacle": ("scrapers.pinnacle", "PinnacleScraper"),
+    "stake": ("scrapers.stake", "StakeScraper"),
+    "1xbet": ("scrapers.xb1", "OneXBetScraper"),
+    "22bet": ("scrapers.xb22", "TwentyTwoBetScraper"),
+    "sportingbet": ("scrapers.sportingbet", "SportingbetScraper"),
+}
+
+# lista separada por vírgula; vazio = todas as casas do registro
+ENABLED_SCRAPERS = os.getenv("ENABLED_SCRAPERS", "")
+
+_import_ms: Dict[str, float] = {}
+
+
+def enabled_names(value: Optional[str] = None) -> List[str]:
+    value = ENABLED_SCRAPERS if value is None else value
+    wanted = [n.strip() for n in value.split(",") if n.strip()]
+    if not wanted:
+        return list(REGISTRY)
+
+    unknown = [n for n in wanted if n not in REGISTRY]
+    if unknown:
+        log.warning("scrapers desconhecidos ignorados: %s", ", ".join(unknown))
+    return [n for n in wanted if n in REGISTRY]
+
+
+def load_scraper(name: str):
+    module_name, class_name = REGISTRY[name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_ms.setdefault(name, round((time.perf_counter() - start) * 1000, 1))
+    return getattr(module, class_name)()
+
+
+def load_scrapers(names: Optional[Iterable[str]] = None) -> List:
+    """Importa e instancia só as casas habilitadas (ENABLED_SCRAPERS)."""
+    return [load_scraper(n) for n in (enabled_names() if names is None else names)]
+
+
+def import_stats() -> Dict[str, float]:
+    """ms gastos importando o módulo de cada casa carregada."""
+    return dict(_import_ms)
@@ -1,9 +1,293 @@
-from typing import List
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
 from models.odds import Odds
+from scrapers import fixtures
+from scrapers.browser import local_storage_token
+from scrapers.proxies import PROXIES, THROTTLE_STATUS, Proxy
+from utils.executor import run_compute
+from utils.jsonstream import EventArraySplitter
+from utils.metrics import (
+    SCRAPER_DECODE_SECONDS,
+    SCRAPER_EVENTS,
+    SCRAPER_FETCH_SECONDS,
+    SCRAPER_PARSE_SECONDS,
+    SCRAPER_PAYLOAD_BYTES,
+    SCRAPER_QUOTES,
+)
+from utils.profiler import add_span, span
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+# decodifica o array de eventos enquanto o corpo chega (casas com STREAM_PATH)
+JSON_STREAMING = os.getenv("JSON_STREAMING", "1") == "1"
+# bytes acumulados antes de mandar um pedaço para o pool de CPU
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", str(256 * 1024)))
+STREAM_READ_BYTES = 64 * 1024
+
+
+def parse_stream_chunk(cls, splitter: EventArraySplitter, chunk: bytes, final: bool):
+    """Um passo do parse em streaming (CPU puro, picklable): chunk → eventos completos → Odds."""
+    t0 = time.perf_counter()
+    events = splitter.feed(chunk, final)
+    t1 = time.perf_counter()
+    odds = cls.parse_events(events) if events else []
+    return splitter, odds, {"decode": t1 - t0, "parse": time.perf_counter() - t1}
+
 
 class BaseScraper:
     name = "base"
+    # classe de recurso para o scheduler: browser | heavy_json | light_json
+    resource_class = "light_json"
+    # caminho até o array de eventos no JSON; com ele o corpo é decodificado em streaming
+    STREAM_PATH: Optional[Tuple[str, ...]] = None
+    # casas com token de browser: token e API precisam sair do mesmo proxy
+    sticky_proxy = False
 
     async def fetch_upcoming(self, days_ahead: int = 7) -> List[Odds]:
         """Return list[Odds] for next days_ahead days."""
+        if self.streams():
+            return await self.fetch_streaming(days_ahead)
+
+        with SCRAPER_FETCH_SECONDS.labels(self.name).time(), span("fetch", self.name):
+            body = await self.fetch_raw(days_ahead)
+        if not body:
+            return []
+
+        SCRAPER_PAYLOAD_BYTES.labels(self.name).observe(len(body))
+        fixtures.record(self.name, body)
+
+        # decode + parse rodam no pool de CPU, fora do event loop.
+        # Os tempos voltam junto com o resultado porque, no modo process,
+        # métricas registradas no worker não chegariam aqui.
+        odds, stats = await run_compute(self.parse_timed, body)
+        add_span("parse", stats["parse"], self.name)
+        add_span("decode", stats["decode"], self.name, end=time.perf_counter() - stats["parse"])
+
+        SCRAPER_DECODE_SECONDS.labels(self.name).observe(stats["decode"])
+        SCRAPER_PARSE_SECONDS.labels(self.name).observe(stats["parse"])
+        SCRAPER_EVENTS.labels(self.name).observe(stats["events"])
+        SCRAPER_QUOTES.labels(self.name).observe(len(odds))
+        return odds
+
+    def streams(self) -> bool:
+        # casas com fetch_raw próprio (várias chamadas, ex: Pinnacle) ficam no caminho bufferizado;
+        # gravando fixtures também (o corpo inteiro vai para o corpus)
+        return (
+            JSON_STREAMING
+            and not fixtures.FIXTURE_RECORD_DIR
+            and self.stream_path() is not None
+            and type(self).fetch_raw is BaseScraper.fetch_raw
+        )
+
+    async def fetch_streaming(self, days_ahead: int = 7) -> List[Odds]:
+        """
+        Lê o corpo em pedaços e decodifica o array de eventos enquanto o
+        download continua: cada pedaço de STREAM_CHUNK_BYTES vai para o
+        pool de CPU e o próximo já vai sendo lido. O splitter (estado do
+        decode) passa de um pedaço para o outro, então o pico de memória
+        é um pedaço + um evento, não o feed inteiro.
+        """
+        cls = type(self)
+        splitter = EventArraySplitter(self.stream_path())
+        odds: List[Odds] = []
+        stats = {"decode": 0.0, "parse": 0.0}
+        size = 0
+        pending: Optional[asyncio.Future] = None
+
+        async def collect():
+            nonlocal splitter
+            splitter, batch, took = await pending
+            odds.extend(batch)
+            stats["decode"] += took["decode"]
+            stats["parse"] += took["parse"]
+
+        def submit(data: bytes, final: bool) -> asyncio.Future:
+            return asyncio.ensure_future(run_compute(parse_stream_chunk, cls, splitter, data, final))
+
+        with SCRAPER_FETCH_SECONDS.labels(self.name).time(), span("fetch", self.name):
+            spec = await self.request(days_ahead)
+            if not spec:
+                return []
+            proxy, spec = self._with_proxy(spec)
+
+            try:
+                async with aiohttp.ClientSession() as session:
+                    start = time.perf_counter()
+                    async with session.request(**spec) as resp:
+                        self._record_response(proxy, resp.status, time.perf_counter() - start)
+                        buf = bytearray()
+                        async for chunk in resp.content.iter_chunked(STREAM_READ_BYTES):
+                            buf += chunk
+                            size += len(chunk)
+                            if len(buf) >= STREAM_CHUNK_BYTES:
+                                if pending is not None:
+                                    await collect()
+                                pending, buf = submit(bytes(buf), False), bytearray()
+
+                if pending is not None:
+                    await collect()
+                if not size:
+                    return []
+                pending = submit(bytes(buf), True)
+                await collect()
+                if splitter.missing:
+                    # o envelope veio sem o caminho do array: mesmo sintoma de
+                    # um corpo inválido no caminho bufferizado, não um feed vazio
+                    log.error(
+                        "json sem o caminho %s", "/".join(splitter.path),
+                        extra={"bookmaker": self.name},
+                    )
+            except ValueError as e:
+                log.error("json inválido: %s", e, extra={"bookmaker": self.name})
+                return []
+            except Exception as e:
+                PROXIES.record(self.name, proxy, None, False, type(e).__name__)
+                log.error("api error: %s", e, extra={"bookmaker": self.name})
+                return []
+
+        end = time.perf_counter()
+        add_span("parse", stats["parse"], self.name, end=end)
+        add_span("decode", stats["decode"], self.name, end=end - stats["parse"])
+
+        SCRAPER_PAYLOAD_BYTES.labels(self.name).observe(size)
+        SCRAPER_DECODE_SECONDS.labels(self.name).observe(stats["decode"])
+        SCRAPER_PARSE_SECONDS.labels(self.name).observe(stats["parse"])
+        SCRAPER_EVENTS.labels(self.name).observe(len({o.event_id for o in odds}))
+        SCRAPER_QUOTES.labels(self.name).observe(len(odds))
+        return odds
+
+    async def request(self, days_ahead: int = 7) -> Optional[Dict]:
+        """
+        Request HTTP do feed: kwargs de aiohttp `ClientSession.request`
+        (method, url, headers, json, timeout...). None = abortar (ex: sem token).
+        """
+        raise NotImplementedError
+
+    async def fetch_raw(self, days_ahead: int = 7) -> Optional[bytes]:
+        """I/O apenas: token + request. Retorna o corpo bruto da resposta."""
+        spec = await self.request(days_ahead)
+        if not spec:
+            return None
+        proxy, spec = self._with_proxy(spec)
+        try:
+            async with aiohttp.ClientSession() as session:
+                start = time.perf_counter()
+                async with session.request(**spec) as resp:
+                    self._record_response(proxy, resp.status, time.perf_counter() - start)
+                    return await resp.read()
+        except Exception as e:
+            PROXIES.record(self.name, proxy, None, False, type(e).__name__)
+            log.error("api error: %s", e, extra={"bookmaker": self.name})
+            return None
+
+    # ==============================
+    # PROXY
+    # ==============================
+    def proxy(self) -> Optional[Proxy]:
+        """Proxy da casa para este request (o mesmo da sessão, se sticky)."""
+        return PROXIES.pick(self.name, sticky=self.sticky_proxy)
+
+    def _with_proxy(self, spec: Dict) -> Tuple[Optional[Proxy], Dict]:
+        proxy = self.proxy()
+        if proxy is None or "proxy" in spec:
+            return None, spec
+        return proxy, dict(spec, proxy=proxy.url)
+
+    def _record_response(self, proxy: Optional[Proxy], status: int, latency: float):
+        # latência até os headers: independe do tamanho do feed
+        if status in THROTTLE_STATUS:
+            PROXIES.record(self.name, proxy, latency, False, f"http_{status}")
+        else:
+            PROXIES.record(self.name, proxy, latency, True)
+
+    async def browser_token(self, page_url: str, storage_key: str) -> Optional[str]:
+        """Token do localStorage via Playwright, saindo pelo proxy (sticky) da casa."""
+        proxy = self.proxy()
+        try:
+            token = await local_storage_token(
+                page_url, storage_key, proxy=proxy.playwright() if proxy is not None else None)
+        except Exception as e:
+            PROXIES.record(self.name, proxy, None, False, "token_" + type(e).__name__)
+            raise
+        if not token:
+            PROXIES.record(self.name, proxy, None, False, "no_token")
+        return token
+
+    async def fetch_events(self, keys: Iterable[Tuple], days_ahead: int = 7) -> List[Odds]:
+        """
+        Re-busca só os eventos pedidos (chaves de pipeline.event_key).
+        Usado na confirmação de surebets, sob deadline curto.
+        """
+        wanted = set(keys)
+        with span("refetch", self.name):
+            body = await self.fetch_event_raw(wanted, days_ahead)
+        if not body:
+            return []
+
+        odds, _ = await run_compute(self.parse_timed, body)
+        return [
+            o for o in odds
+            if (o.home_team, o.away_team, o.start_time, o.league) in wanted
+        ]
+
+    async def fetch_event_raw(self, keys: Iterable[Tuple], days_ahead: int = 7) -> Optional[bytes]:
+        """
+        Corpo bruto com os eventos pedidos. Casas com endpoint por evento
+        sobrescrevem; o padrão é o feed da própria casa (filtrado depois).
+        """
+        return await self.fetch_raw(days_ahead)
+
+    @classmethod
+    def fetches_per_event(cls) -> bool:
+        """A casa tem endpoint por evento (sobrescreve fetch_event_raw)?"""
+        return cls.fetch_event_raw is not BaseScraper.fetch_event_raw
+
+    @classmethod
+    def parse_payload(cls, body: bytes) -> List[Odds]:
+        """Decodifica o JSON e converte em Odds (CPU puro, picklable)."""
+        return cls.parse_timed(body)[0]
+
+    @classmethod
+    def parse_timed(cls, body: bytes) -> Tuple[List[Odds], Dict]:
+        """parse_payload + tempos de decode/parse e nº de eventos com odds."""
+        t0 = time.perf_counter()
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            log.error("json inválido: %s", e, extra={"bookmaker": cls.name})
+            return [], {"decode": time.perf_counter() - t0, "parse": 0.0, "events": 0}
+
+        t1 = time.perf_counter()
+        odds = cls.parse(data)
+        t2 = time.perf_counter()
+
+        events = len({o.event_id for o in odds})
+        return odds, {"decode": t1 - t0, "parse": t2 - t1, "events": events}
+
+    @classmethod
+    def stream_path(cls) -> Optional[Tuple[str, ...]]:
+        return cls.STREAM_PATH
+
+    @classmethod
+    def parse_events(cls, events: List[Any]) -> List[Odds]:
+        """Parse de um lote de eventos já decodificados (streaming): remonta o envelope mínimo."""
+        data: Any = events
+        for key in reversed(cls.stream_path()):
+            data = {key: data}
+        return cls.parse(data)
+
+    @classmethod
+    def parse(cls, data: Any) -> List[Odds]:
+        """Converte o payload já decodificado em list[Odds]."""
         raise NotImplementedError
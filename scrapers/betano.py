@@ -1,50 +1,44 @@
-import aiohttp
-import uuid
-from datetime import datetime
-from typing import List
+import logging
+from typing import Dict, Optional
 
-from playwright.async_api import async_playwright
-from scrapers.base import BaseScraper
-from models.odds import Odds
-from utils.normalize import (
-    clean_team_name,
-    clean_league_name,
-    clean_market_name,
-    clean_selection_name,
-)
+from scrapers.feed import FeedSpec, JsonFeedScraper
+from utils.metrics import SCRAPER_TOKEN_SECONDS
+from utils.profiler import span
 
+log = logging.getLogger(__name__)
 
-class BetanoScraper(BaseScraper):
+
+class BetanoScraper(JsonFeedScraper):
     name = "betano"
+    resource_class = "browser"
+    sticky_proxy = True
 
     PAGE_URL = "https://br.betano.com/sport/futebol/"
     API_URL = "https://br.betano.com/api/sportsbook/"
 
-    async def fetch_upcoming(self, days_ahead: int = 7) -> List[Odds]:
-        results: List[Odds] = []
-
+    FEED = FeedSpec(
+        events=("data", "events"),
+        teams="position",
+        markets={
+            "match_result": ("1x2", "clean", "all"),
+            "double_chance": ("double_chance", "upper", "all"),  # 1X / X2 / 12
+            # Betano sempre lista a linha principal primeiro
+            "totals": ("over_under", "clean", "main"),
+            "both_teams_to_score": ("btts", "clean", "all"),
+            "asian_handicap": ("asian_handicap", "clean", "main"),
+        },
+    )
+
+    async def request(self, days_ahead: int = 7) -> Optional[Dict]:
         # ======================================================
         # 1) COLETAR TOKEN VIA PLAYWRIGHT
         # ======================================================
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-setuid-sandbox"]
-            )
-            page = await browser.new_page()
-
-            await page.goto(self.PAGE_URL, timeout=60000)
-            await page.wait_for_timeout(3000)
-
-            token = await page.evaluate(
-                "() => window.localStorage.getItem('apiSportsbookAccessToken')"
-            )
-
-            await browser.close()
+        with SCRAPER_TOKEN_SECONDS.labels(self.name).time(), span("token", self.name):
+            token = await self.browser_token(self.PAGE_URL, "apiSportsbookAccessToken")
 
         if not token:
-            print("[Betano] Token não encontrado")
-            return results
+            log.warning("token não encontrado", extra={"bookmaker": self.name})
+            return None
 
         headers = {
             "Authorization": f"Bearer {token}",
@@ -77,156 +71,4 @@ class BetanoScraper(BaseScraper):
         # ======================================================
         # 3) BUSCAR EVENTOS
         # ======================================================
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.API_URL, headers=headers, json=payload, timeout=20) as resp:
-                    data = await resp.json()
-        except Exception as e:
-            print("[Betano API Error]", e)
-            return results
-
-        events = data.get("data", {}).get("events", [])
-
-        # ======================================================
-        # 4) PROCESSAR EVENTOS
-        # ======================================================
-        for ev in events:
-            try:
-                league = clean_league_name(ev["competition"]["name"])
-                start_time = ev.get("startTime")
-
-                home = clean_team_name(
-                    next(p["name"] for p in ev["participants"] if p["position"] == "home")
-                )
-                away = clean_team_name(
-                    next(p["name"] for p in ev["participants"] if p["position"] == "away")
-                )
-
-                timestamp = datetime.utcnow().isoformat() + "Z"
-                event_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{home}-{away}-{start_time}"))
-
-                markets = ev.get("markets", [])
-
-                # PARA IDENTIFICAR MERCADOS PRINCIPAIS
-                found_over_under = False
-                found_asian = False
-
-                for m in markets:
-                    key = m["key"]
-                    selections = m.get("selections", [])
-
-                    # ================================
-                    # 1) MERCADO 1X2
-                    # ================================
-                    if key == "match_result":
-                        for sel in selections:
-                            selection = clean_selection_name(sel["name"])
-                            results.append(
-                                Odds(
-                                    event_id=event_id,
-                                    home_team=home,
-                                    away_team=away,
-                                    league=league,
-                                    sport="soccer",
-                                    market="1x2",
-                                    selection=selection,
-                                    odds=float(sel["price"]),
-                                    bookmaker=self.name,
-                                    timestamp=timestamp,
-                                    start_time=start_time,
-                                )
-                            )
-
-                    # ================================
-                    # 2) DUPLA CHANCE
-                    # ================================
-                    if key == "double_chance":
-                        for sel in selections:
-                            selection = sel["name"].upper()  # 1X / X2 / 12
-                            results.append(
-                                Odds(
-                                    event_id=event_id,
-                                    home_team=home,
-                                    away_team=away,
-                                    league=league,
-                                    sport="soccer",
-                                    market="double_chance",
-                                    selection=selection,
-                                    odds=float(sel["price"]),
-                                    bookmaker=self.name,
-                                    timestamp=timestamp,
-                                    start_time=start_time,
-                                )
-                            )
-
-                    # ================================
-                    # 3) OVER/UNDER PRINCIPAL
-                    # ================================
-                    if key == "totals" and not found_over_under:
-                        # Betano sempre lista a linha principal primeiro → usamos só a primeira
-                        sel = selections[0]
-                        results.append(
-                            Odds(
-                                event_id=event_id,
-                                home_team=home,
-                                away_team=away,
-                                league=league,
-                                sport="soccer",
-                                market="over_under",
-                                selection=clean_selection_name(sel["name"]),
-                                odds=float(sel["price"]),
-                                bookmaker=self.name,
-                                timestamp=timestamp,
-                                start_time=start_time,
-                            )
-                        )
-                        found_over_under = True
-
-                    # ================================
-                    # 4) BTTS
-                    # ================================
-                    if key == "both_teams_to_score":
-                        for sel in selections:
-                            results.append(
-                                Odds(
-                                    event_id=event_id,
-                                    home_team=home,
-                                    away_team=away,
-                                    league=league,
-                                    sport="soccer",
-                                    market="btts",
-                                    selection=clean_selection_name(sel["name"]),
-                                    odds=float(sel["price"]),
-                                    bookmaker=self.name,
-                                    timestamp=timestamp,
-                                    start_time=start_time,
-                                )
-                            )
-
-                    # ================================
-                    # 5) AH PRINCIPAL
-                    # ================================
-                    if key == "asian_handicap" and not found_asian:
-                        sel = selections[0]
-                        results.append(
-                            Odds(
-                                event_id=event_id,
-                                home_team=home,
-                                away_team=away,
-                                league=league,
-                                sport="soccer",
-                                market="asian_handicap",
-                                selection=clean_selection_name(sel["name"]),
-                                odds=float(sel["price"]),
-                                bookmaker=self.name,
-                                timestamp=timestamp,
-                                start_time=start_time,
-                            )
-                        )
-                        found_asian = True
-
-            except Exception as e:
-                print("[Betano Parse Error]", e)
-                continue
-
-        return results
+        return {"method": "POST", "url": self.API_URL, "headers": headers, "json": payload, "timeout": 20}
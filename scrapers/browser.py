@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Playwright + Chromium sobem no primeiro token pedido e ficam abertos
+# para os próximos; quem não usa casas com token nunca paga o import.
+_pw = None
+_browser = None
+_lock: Optional[asyncio.Lock] = None
+
+
+async def get_browser():
+    global _pw, _browser, _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+
+    async with _lock:
+        if _browser is not None and _browser.is_connected():
+            return _browser
+
+        if _pw is None:
+            start = time.perf_counter()
+            from playwright.async_api import async_playwright
+
+            _pw = await async_playwright().start()
+            log.info("playwright iniciado", extra={"ms": round((time.perf_counter() - start) * 1000, 1)})
+
+        _browser = await _pw.chromium.launch(
+            headless=True,
+            args=["--no-sandbox", "--disable-setuid-sandbox"],
+        )
+        return _browser
+
+
+async def close_browser():
+    global _pw, _browser
+    if _browser is not None:
+        try:
+            await _browser.close()
+        except Exception as e:
+            log.warning("erro fechando browser: %s", e)
+        _browser = None
+    if _pw is not None:
+        await _pw.stop()
+        _pw = None
+
+
+async def local_storage_token(page_url: str, storage_key: str, proxy: Optional[Dict] = None) -> Optional[str]:
+    """
+    Abre a página num Chromium headless e lê um token do localStorage.
+    Usado pelas casas que exigem Bearer token (Betano, KTO, Sportingbet).
+    Cada chamada usa um contexto isolado no browser compartilhado, com o
+    proxy da casa (formato Playwright: server/username/password).
+    """
+    browser = await get_browser()
+    context = await browser.new_context(proxy=proxy) if proxy else await browser.new_context()
+    try:
+        page = await context.new_page()
+
+        await page.goto(page_url, timeout=60000)
+        await page.wait_for_timeout(3000)
+
+        token = await page.evaluate(
+            f"() => window.localStorage.getItem('{storage_key}')"
+        )
+    finally:
+        await context.close()
+
+    return token
@@ -0,0 +1,219 @@
+import logging
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from models.odds import Odds
+from scrapers.base import BaseScraper
+from utils.normalize import clean_league_name, clean_selection_name, clean_team_name
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+# 1 = ignora os escopos "first"/"main" das tabelas e emite todas as linhas
+MARKETS_FULL_LIST = os.getenv("MARKETS_FULL_LIST", "0") == "1"
+
+
+# ==============================
+# TABELAS DE MERCADO
+# ==============================
+# Cada casa declara {código bruto do mercado: (mercado canônico, seleção, escopo)}.
+#
+# seleção:
+#   "clean" → clean_selection_name (home → 1, "Over 2.5" → over_2.5, ...)
+#   "upper" → nome em maiúsculas (1X / X2 / 12)
+#   "raw"   → nome como veio
+#
+# escopo:
+#   "all"   → todas as seleções de todos os mercados com esse código
+#   "first" → todas as seleções só do primeiro mercado com esse código
+#   "main"  → só a primeira seleção do primeiro mercado (linha principal)
+#
+# Linha: desligada por padrão — a seleção é o nome limpo, igual em todas
+# as casas (é ela que casa as odds entre bookmakers na odds_key). Um feed
+# cujo nome NÃO traz o número da linha pode ligar `line_fields` no seu
+# FeedSpec: o valor do campo é anexado como "<seleção>_<linha>", com a
+# linha sempre no formato "%+g" (-0.5, +1, +2.5); se o último número do
+# nome já é a linha, nada muda.
+MarketRule = Tuple[str, str, str]
+
+_SELECTION_FN: Dict[str, Callable[[str], str]] = {
+    "clean": clean_selection_name,
+    "upper": str.upper,
+    "raw": str,
+}
+_SCOPES = ("all", "first", "main")
+
+
+class FeedSpec:
+    """
+    Formato de um feed JSON de eventos + tabela de mercados, compilada
+    uma vez em dict de despacho {código: (mercado, fn_seleção, escopo)}.
+
+    teams:
+      "position"               → participants[*] com position home/away
+      "index"                  → participants[0] / participants[1]
+      ("homeTeam", "awayTeam") → dois objetos com "name"
+    league_default: None = liga obrigatória (evento sem liga é descartado)
+    event_suffix: sufixo do event_id (casas que isolam o id por bookmaker)
+    line_fields: campos de linha da seleção a anexar ao nome (opt-in, ver acima)
+    """
+
+    def __init__(self, markets: Dict[str, MarketRule], events: Sequence[str] = ("events",),
+                 teams: Union[str, Tuple[str, str]] = "position",
+                 league_default: Optional[str] = None, start_time: str = "startTime",
+                 market_key: str = "key", lower_keys: bool = False,
+                 selections: str = "selections", price: str = "price",
+                 line_fields: Sequence[str] = (),
+                 event_suffix: str = ""):
+        self.events = tuple(events)
+        self.teams = teams
+        self.league_default = league_default
+        self.start_time = start_time
+        self.market_key = market_key
+        self.lower_keys = lower_keys
+        self.selections = selections
+        self.price = price
+        self.line_fields = tuple(line_fields)
+        self.event_suffix = event_suffix
+        self.dispatch = self.compile(markets, lower_keys)
+
+    @staticmethod
+    def compile(markets: Dict[str, MarketRule], lower_keys: bool = False) -> Dict[str, Tuple]:
+        dispatch = {}
+        for code, (market, selection, scope) in markets.items():
+            if selection not in _SELECTION_FN:
+                raise ValueError(f"seleção desconhecida em {code}: {selection}")
+            if scope not in _SCOPES:
+                raise ValueError(f"escopo desconhecido em {code}: {scope}")
+            if MARKETS_FULL_LIST:
+                scope = "all"
+            dispatch[code.lower() if lower_keys else code] = (market, _SELECTION_FN[selection], scope)
+        return dispatch
+
+
+def _teams(spec: FeedSpec, ev: Dict) -> Tuple[Optional[str], Optional[str]]:
+    if spec.teams == "position":
+        home = away = None
+        for p in ev.get("participants", ()):
+            pos = p.get("position")
+            if pos == "home" and home is None:
+                home = p.get("name")
+            elif pos == "away" and away is None:
+                away = p.get("name")
+        return home, away
+    if spec.teams == "index":
+        parts = ev.get("participants") or ()
+        if len(parts) < 2:
+            return None, None
+        return parts[0].get("name"), parts[1].get("name")
+
+    home_field, away_field = spec.teams
+    return (ev.get(home_field) or {}).get("name"), (ev.get(away_field) or {}).get("name")
+
+
+def _format_line(value) -> Optional[str]:
+    try:
+        return f"{float(value):+g}"
+    except (TypeError, ValueError):
+        return None
+
+
+def _with_line(selection: str, sel: Dict, line_fields: Tuple[str, ...]) -> str:
+    for field in line_fields:
+        line = _format_line(sel.get(field))
+        if line is None:
+            continue
+        tail = re.split(r"[\s_]", selection)[-1]
+        return selection if _format_line(tail) == line else f"{selection}_{line}"
+    return selection
+
+
+def extract(spec: FeedSpec, data: Dict, bookmaker: str) -> List[Odds]:
+    """Loop único de extração para qualquer feed descrito por um FeedSpec."""
+    events = data
+    for field in spec.events:
+        events = (events or {}).get(field) or {}
+    if not isinstance(events, list):
+        return []
+
+    dispatch = spec.dispatch
+    market_key, sel_field, price_field = spec.market_key, spec.selections, spec.price
+    lower, line_fields, suffix = spec.lower_keys, spec.line_fields, spec.event_suffix
+    results: List[Odds] = []
+
+    for ev in events:
+        try:
+            home_raw, away_raw = _teams(spec, ev)
+            home = clean_team_name(home_raw) if home_raw else ""
+            away = clean_team_name(away_raw) if away_raw else ""
+            if not home or not away:
+                continue
+
+            league_raw = (ev.get("competition") or {}).get("name", spec.league_default)
+            if league_raw is None:
+                continue
+            league = clean_league_name(league_raw)
+
+            start_time = ev.get(spec.start_time)
+            timestamp = datetime.utcnow().isoformat() + "Z"
+            event_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{home}-{away}-{start_time}{suffix}"))
+
+            seen = set()  # mercados canônicos já consumidos (escopos first/main)
+            for m in ev.get("markets") or ():
+                code = m.get(market_key, "")
+                rule = dispatch.get(code.lower() if lower else code)
+                if rule is None:
+                    continue
+                market, sel_fn, scope = rule
+                if scope != "all":
+                    if market in seen:
+                        continue
+                    seen.add(market)
+
+                selections = m.get(sel_field) or ()
+                if scope == "main":
+                    selections = (selections[0],)
+
+                for sel in selections:
+                    selection = sel_fn(sel["name"])
+                    if line_fields:
+                        selection = _with_line(selection, sel, line_fields)
+                    results.append(Odds(
+                        event_id=event_id,
+                        home_team=home,
+                        away_team=away,
+                        league=league,
+                        sport="soccer",
+                        market=market,
+                        selection=selection,
+                        odds=float(sel[price_field]),
+                        bookmaker=bookmaker,
+                        timestamp=timestamp,
+                        start_time=start_time,
+                    ))
+
+        except Exception as e:
+            log.warning("parse error: %s", e, extra={"bookmaker": bookmaker})
+            continue
+
+    return results
+
+
+class JsonFeedScraper(BaseScraper):
+    """Scraper cujo parse é só a tabela FEED + o loop compartilhado."""
+
+    FEED: FeedSpec
+
+    @classmethod
+    def stream_path(cls):
+        return cls.FEED.events
+
+    @classmethod
+    def parse(cls, data: Dict) -> List[Odds]:
+        return extract(cls.FEED, data, cls.name)
@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.odds import Odds
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+# corpus: fixtures/<casa>/<nome>.json (payload bruto) + <nome>.golden.json (saída esperada do parse)
+FIXTURES_DIR = os.getenv("FIXTURES_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "fixtures"))
+# com valor, cada payload baixado é gravado no corpus (fixtures/<casa>/recorded-<utc>.json)
+FIXTURE_RECORD_DIR = os.getenv("FIXTURE_RECORD_DIR", "")
+
+GOLDEN_SUFFIX = ".golden.json"
+# varia a cada execução (datetime.utcnow no parse): fora da comparação
+VOLATILE_FIELDS = ("timestamp",)
+
+
+def record(bookmaker: str, body: bytes, root: str = FIXTURE_RECORD_DIR) -> Optional[str]:
+    """Grava um payload real no corpus. Falha de disco não derruba o scrape."""
+    if not root or not body:
+        return None
+    path = os.path.join(root, bookmaker, time.strftime("recorded-%Y%m%dT%H%M%SZ.json", time.gmtime()))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+    except OSError as e:
+        log.warning("fixture não gravada: %s", e, extra={"bookmaker": bookmaker})
+        return None
+    return path
+
+
+def iter_fixtures(bookmaker: Optional[str] = None, root: str = FIXTURES_DIR) -> Iterator[Tuple[str, str]]:
+    """(casa, caminho do payload) do corpus, em ordem estável."""
+    if not os.path.isdir(root):
+        return
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if not os.path.isdir(folder) or (bookmaker and name != bookmaker):
+            continue
+        for fname in sorted(os.listdir(folder)):
+            if fname.endswith(".json") and not fname.endswith(GOLDEN_SUFFIX):
+                yield name, os.path.join(folder, fname)
+
+
+def golden_path(path: str) -> str:
+    return path[: -len(".json")] + GOLDEN_SUFFIX
+
+
+def canonical(odds: List[Odds]) -> List[Dict]:
+    """Saída do parse sem os campos voláteis, na ordem em que foi gerada."""
+    out = []
+    for o in odds:
+        row = o.dict()
+        for field in VOLATILE_FIELDS:
+            row.pop(field, None)
+        out.append(row)
+    return out
+
+
+def load_golden(path: str) -> Optional[List[Dict]]:
+    try:
+        with open(golden_path(path), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_golden(path: str, rows: List[Dict]):
+    # uma cotação por linha: diff legível sem inflar o arquivo
+    with open(golden_path(path), "w", encoding="utf-8") as f:
+        f.write("[\n")
+        f.write(",\n".join(json.dumps(r, ensure_ascii=False, sort_keys=True) for r in rows))
+        f.write("\n]\n")
@@ -1,7 +1,7 @@
-import aiohttp
+import logging
 import uuid
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 
 from scrapers.base import BaseScraper
 from models.odds import Odds
@@ -15,23 +15,23 @@ from utils.normalize import (
 
 API_URL = "https://guest.api.arcadia.pinnacle.com/0.1/sports/29/markets/straight"
 
+log = logging.getLogger(__name__)
+
 
 class PinnacleScraper(BaseScraper):
     name = "pinnacle"
+    resource_class = "heavy_json"
 
-    async def fetch_upcoming(self, days_ahead: int = 7) -> List[Odds]:
-        out: List[Odds] = []
-
+    async def request(self, days_ahead: int = 7) -> Optional[Dict]:
         # ================================
         # 1) CHAMADA REAL À API DA PINNACLE
         # ================================
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_URL, timeout=20) as resp:
-                    data = await resp.json()
-        except Exception as e:
-            print("[PINNACLE] API error:", e)
-            return out
+        # fetch_raw da base: pool de proxies, score/quarentena e métricas
+        return {"method": "GET", "url": API_URL, "timeout": 20}
+
+    @classmethod
+    def parse(cls, data: Dict) -> List[Odds]:
+        out: List[Odds] = []
 
         events = data.get("events", [])
         participants = data.get("participants", [])
@@ -93,7 +93,7 @@ class PinnacleScraper(BaseScraper):
                                 market="1x2",
                                 selection=side,
                                 odds=odds,
-                                bookmaker=self.name,
+                                bookmaker=cls.name,
                                 timestamp=timestamp
                             )
                         )
@@ -121,7 +121,7 @@ class PinnacleScraper(BaseScraper):
                             market="double_chance",
                             selection="1X",
                             odds=dc,
-                            bookmaker=self.name,
+                            bookmaker=cls.name,
                             timestamp=timestamp
                         )
                     )
@@ -139,7 +139,7 @@ class PinnacleScraper(BaseScraper):
                             market="double_chance",
                             selection="X2",
                             odds=dc,
-                            bookmaker=self.name,
+                            bookmaker=cls.name,
                             timestamp=timestamp
                         )
                     )
@@ -157,7 +157,7 @@ class PinnacleScraper(BaseScraper):
                             market="double_chance",
                             selection="12",
                             odds=dc,
-                            bookmaker=self.name,
+                            bookmaker=cls.name,
                             timestamp=timestamp
                         )
                     )
@@ -187,7 +187,7 @@ class PinnacleScraper(BaseScraper):
                                 market="over_under",
                                 selection=f"over {points}",
                                 odds=float(price_index[key_over]["price"]),
-                                bookmaker=self.name,
+                                bookmaker=cls.name,
                                 timestamp=timestamp
                             )
                         )
@@ -203,7 +203,7 @@ class PinnacleScraper(BaseScraper):
                                 market="over_under",
                                 selection=f"under {points}",
                                 odds=float(price_index[key_under]["price"]),
-                                bookmaker=self.name,
+                                bookmaker=cls.name,
                                 timestamp=timestamp
                             )
                         )
@@ -233,13 +233,13 @@ class PinnacleScraper(BaseScraper):
                                     market="asian_handicap",
                                     selection=f"{side} {handicap}",
                                     odds=float(price_index[key_sp]["price"]),
-                                    bookmaker=self.name,
+                                    bookmaker=cls.name,
                                     timestamp=timestamp
                                 )
                             )
 
             except Exception as e:
-                print("[PINNACLE PARSE ERROR]", e)
+                log.warning("parse error: %s", e, extra={"bookmaker": cls.name})
                 continue
 
         return out
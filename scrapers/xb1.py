@@ -1,7 +1,7 @@
-import aiohttp
+import logging
 import uuid
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 
 from scrapers.base import BaseScraper
 from models.odds import Odds
@@ -13,6 +13,8 @@ from utils.normalize import (
     clean_selection_name,
 )
 
+log = logging.getLogger(__name__)
+
 
 API_URL = (
     "https://1xbet.com/LineFeed/Get1x2?"
@@ -22,20 +24,18 @@ API_URL = (
 
 class OneXBetScraper(BaseScraper):
     name = "1xbet"
+    resource_class = "heavy_json"
+    STREAM_PATH = ("Value",)
 
-    async def fetch_upcoming(self, days_ahead: int = 7) -> List[Odds]:
-        results: List[Odds] = []
-
+    async def request(self, days_ahead: int = 7) -> Optional[Dict]:
         # =============================
         # 1) Chamada da API real
         # =============================
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(API_URL, timeout=15) as resp:
-                    raw = await resp.json()
-        except Exception as e:
-            print("[1XBET] API error:", e)
-            return results
+        return {"method": "GET", "url": API_URL, "timeout": 15}
+
+    @classmethod
+    def parse(cls, raw: Dict) -> List[Odds]:
+        results: List[Odds] = []
 
         events = raw.get("Value", [])
         timestamp = datetime.utcnow().isoformat() + "Z"
@@ -80,7 +80,7 @@ class OneXBetScraper(BaseScraper):
                             market="1x2",
                             selection="home",
                             odds=float(odds[0]["C"]),
-                            bookmaker=self.name,
+                            bookmaker=cls.name,
                             timestamp=timestamp,
                             start_time=start_time,
                         )
@@ -97,7 +97,7 @@ class OneXBetScraper(BaseScraper):
                             market="1x2",
                             selection="away",
                             odds=float(odds[1]["C"]),
-                            bookmaker=self.name,
+                            bookmaker=cls.name,
                             timestamp=timestamp,
                             start_time=start_time,
                         )
@@ -107,7 +107,7 @@ class OneXBetScraper(BaseScraper):
                 # retorna geralmente apenas home/away neste endpoint simplificado.
 
             except Exception as e:
-                print("[1XBET PARSE ERROR]", e)
+                log.warning("parse error: %s", e, extra={"bookmaker": cls.name})
                 continue
 
         return results
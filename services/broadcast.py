@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from services.filters import ResultFilter
+from services.pipeline import ResultSet
+from utils.metrics import WS_CLIENTS, WS_COALESCED, WS_MESSAGES
+
+log = logging.getLogger(__name__)
+
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "32"))
+
+_KINDS = ("appeared", "changed", "vanished")
+
+
+def _encode_entry(kind: str, item_id: str, item: Dict) -> str:
+    # vanished só precisa do id; o item antigo fica para o filtro
+    if kind == "vanished":
+        return json.dumps({"id": item_id})
+    return json.dumps({"id": item_id, "item": item}, default=str)
+
+
+class _EncodedDelta:
+    """
+    Delta de uma versão com cada entrada serializada UMA vez.
+    As mensagens por cliente são montadas concatenando os fragmentos.
+
+    Com filtro, um `changed` é testado na versão anterior e na nova:
+    saiu do filtro → vai como `vanished`; entrou → como `appeared`.
+    """
+
+    def __init__(self, delta: Dict):
+        self.version = delta["version"]
+        previous = delta.get("previous") or {}
+        # detector -> kind -> [(item, json)]; em changed, (item, json, anterior, json do id)
+        self.parts: Dict[str, Dict[str, List[Tuple]]] = {}
+        for name, changes in delta["changes"].items():
+            prev = previous.get(name, {})
+            self.parts[name] = {
+                "appeared": [(item, _encode_entry("appeared", item_id, item))
+                             for item_id, item in changes["appeared"]],
+                "changed": [(item, _encode_entry("changed", item_id, item), prev.get(item_id),
+                             _encode_entry("vanished", item_id, item))
+                            for item_id, item in changes["changed"]],
+                "vanished": [(item, _encode_entry("vanished", item_id, item))
+                             for item_id, item in changes["vanished"]],
+            }
+        self._unfiltered: Optional[str] = None
+
+    def message_for(self, flt: ResultFilter) -> Optional[str]:
+        if flt.is_empty:
+            if self._unfiltered is None:
+                self._unfiltered = self._build(None)
+            return self._unfiltered
+        return self._build(flt.matches)
+
+    def _build(self, accept) -> Optional[str]:
+        sections = []
+        total = 0
+        for name, kinds in self.parts.items():
+            if accept is None:
+                out = {kind: [entry[1] for entry in kinds[kind]] for kind in _KINDS}
+            else:
+                out = {kind: [frag for item, frag in kinds[kind] if accept(item)]
+                       for kind in ("appeared", "vanished")}
+                out["changed"] = []
+                for item, frag, prev, gone in kinds["changed"]:
+                    now_in = accept(item)
+                    # sem versão anterior: trata como se o cliente já tivesse o item
+                    was_in = accept(prev) if prev is not None else now_in
+                    if was_in and now_in:
+                        out["changed"].append(frag)
+                    elif now_in:
+                        out["appeared"].append(frag)
+                    elif was_in:
+                        out["vanished"].append(gone)
+
+            fields = []
+            for kind in _KINDS:
+                total += len(out[kind])
+                fields.append(f'"{kind}":[' + ",".join(out[kind]) + "]")
+            sections.append(f'"{name}":{{' + ",".join(fields) + "}")
+
+        if not total:
+            return None
+        return f'{{"type":"delta","version":{self.version},' + ",".join(sections) + "}"
+
+
+class _Client:
+    def __init__(self, ws: WebSocket, flt: ResultFilter, queue_size: int):
+        self.ws = ws
+        self.filter = flt
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.coalesced = 0
+
+    def offer(self, message: str, version: int):
+        """
+        Enfileira sem bloquear. Fila cheia (cliente lento) → descarta o
+        que estava pendente e deixa só um "resync" para a versão atual.
+        """
+        try:
+            self.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(json.dumps({"type": "resync", "version": version}))
+        self.coalesced += 1
+        WS_COALESCED.inc()
+
+
+class UpdateHub:
+    """Fan-out dos deltas de resultados para os clientes de /ws/updates."""
+
+    def __init__(self, results: ResultSet, queue_size: int = WS_QUEUE_SIZE):
+        self.results = results
+        self.queue_size = queue_size
+        self.clients: Set[_Client] = set()
+
+    def publish(self, delta: Optional[Dict]):
+        """Chamado no event loop após cada lote de ingest."""
+        if not delta or not self.clients:
+            return
+
+        encoded = _EncodedDelta(delta)
+        for client in list(self.clients):
+            message = encoded.message_for(client.filter)
+            if message is not None:
+                client.offer(message, encoded.version)
+
+    def _snapshot(self, flt: ResultFilter) -> str:
+        body = {"type": "snapshot", "version": self.results.version}
+        for name in self.results.names:
+            body[name] = [
+                {"id": item_id, "item": item}
+                for item_id, item in self.results.entries(name)
+                if flt.matches(item)
+            ]
+        return json.dumps(body, default=str)
+
+    async def serve(self, ws: WebSocket, flt: ResultFilter):
+        await ws.accept()
+
+        client = _Client(ws, flt, self.queue_size)
+        client.offer(self._snapshot(flt), self.results.version)
+        self.clients.add(client)
+        WS_CLIENTS.inc()
+
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            # mensagens do cliente: {"type": "subscribe", "league": ..., ...}
+            while True:
+                msg = await ws.receive_json()
+                if isinstance(msg, dict) and msg.get("type") == "subscribe":
+                    try:
+                        flt = ResultFilter.from_params(msg)
+                    except (TypeError, ValueError) as e:
+                        # filtro inválido: avisa e mantém o anterior
+                        client.offer(json.dumps({"type": "error", "error": f"filtro inválido: {e}"}),
+                                     self.results.version)
+                        continue
+                    client.filter = flt
+                    client.offer(self._snapshot(flt), self.results.version)
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            log.warning("ws receive error: %s", e)
+        finally:
+            sender.cancel()
+            self.clients.discard(client)
+            WS_CLIENTS.dec()
+
+    async def _send_loop(self, client: _Client):
+        try:
+            while True:
+                message = await client.queue.get()
+                await client.ws.send_text(message)
+                WS_MESSAGES.inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.info("ws send closed: %s", e)
@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils.dedupe import odds_key
+
+CHANGELOG_RETENTION = int(os.getenv("CHANGELOG_RETENTION", "500000"))
+
+
+class ChangeLog:
+    """
+    Log append-only de mudanças no store, com seq monotônico.
+
+    Cada entrada é {"seq", "op" ("upsert" | "remove"), "key", "odd"}.
+    Guarda as últimas `retention` entradas; um cursor mais antigo que
+    isso precisa de resync (dump completo de /odds).
+    """
+
+    def __init__(self, retention: int = CHANGELOG_RETENTION):
+        self.retention = max(1, retention)
+        self.seq = 0
+        self._entries: List[Dict] = []
+        self._base = 1  # seq de _entries[0]
+        self._lock = threading.Lock()
+
+    @property
+    def oldest_seq(self) -> int:
+        return self._base
+
+    def append(self, op: str, items: List[Tuple[str, Optional[Dict]]]) -> int:
+        """Registra (key, odd) com a operação `op`; retorna o último seq."""
+        with self._lock:
+            for key, odd in items:
+                self.seq += 1
+                self._entries.append({"seq": self.seq, "op": op, "key": key, "odd": odd})
+
+            # corta em blocos para amortizar o custo do del no início da lista
+            excess = len(self._entries) - self.retention
+            if excess > self.retention // 4:
+                del self._entries[:excess]
+                self._base += excess
+
+            return self.seq
+
+    def record(self, changed: List[Dict], removed: List[Tuple[str, Dict]]):
+        """Sink do ingest: upserts do lote + remoções por TTL."""
+        if changed:
+            self.append("upsert", [(odds_key(odd), odd) for odd in changed])
+        if removed:
+            self.append("remove", [(key, None) for key, _ in removed])
+
+    def since(self, cursor: int, limit: int = 1000) -> Optional[List[Dict]]:
+        """
+        Mudanças com seq > cursor (no máximo `limit`).
+        None se o cursor já saiu da janela de retenção.
+        """
+        with self._lock:
+            if cursor < self._base - 1:
+                return None
+            start = max(0, cursor + 1 - self._base)
+            return self._entries[start:start + limit]
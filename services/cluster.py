@@ -0,0 +1,447 @@
+"""
+Scraping distribuído: um coordenador (dentro da API) e N workers de
+scraping (processos ou máquinas separadas).
+
+    coordenador                         worker
+    ───────────                         ──────
+                  ◄── hello {worker}
+    assign {bookmakers} ──►
+    scrape ──►                          (ciclo imediato)
+                  ◄── batch {bookmaker, odds}   (uma casa por vez, assim que termina)
+                  ◄── ping                      (a cada CLUSTER_HEARTBEAT_SECONDS)
+
+Frames: 4 bytes big-endian com o tamanho + JSON utf-8. Endereço em
+CLUSTER_ADDRESS: "unix:/caminho.sock" ou "tcp:host:porta".
+
+Worker morto (EOF ou sem ping por 3 heartbeats) → as casas dele são
+redistribuídas entre os vivos. Casas sem dono são scrapeadas localmente
+pelo próprio coordenador.
+
+Os lotes não são ingeridos no loop de leitura da conexão: vão para uma
+fila (o lote mais novo de uma casa substitui o pendente) consumida por
+uma task só, então pings continuam sendo lidos enquanto o ingest espera.
+
+Com CLUSTER_SECRET o hello precisa trazer o mesmo segredo; sem ele, o
+coordenador só aceita TCP em loopback.
+
+Uso:
+    CLUSTER_MODE=coordinator uvicorn main:app
+    python -m services.cluster worker --name w1
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+import math
+import os
+import struct
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from services.scheduler import ResourceScheduler
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+CLUSTER_MODE = os.getenv("CLUSTER_MODE", "off").lower()  # off | coordinator
+CLUSTER_ADDRESS = os.getenv("CLUSTER_ADDRESS", "unix:data/cluster.sock")
+CLUSTER_HEARTBEAT = float(os.getenv("CLUSTER_HEARTBEAT_SECONDS", "5"))
+CLUSTER_MAX_FRAME = int(os.getenv("CLUSTER_MAX_FRAME_BYTES", str(256 * 1024 * 1024)))
+# segredo compartilhado do hello; obrigatório para ouvir TCP fora de loopback
+CLUSTER_SECRET = os.getenv("CLUSTER_SECRET", "")
+
+_LEN = struct.Struct(">I")
+
+
+# ==============================
+# PROTOCOLO
+# ==============================
+async def send_frame(writer: asyncio.StreamWriter, msg: Dict):
+    data = json.dumps(msg, default=str).encode()
+    writer.write(_LEN.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """Próxima mensagem, ou None se a conexão fechou."""
+    try:
+        head = await reader.readexactly(_LEN.size)
+        (size,) = _LEN.unpack(head)
+        if size > CLUSTER_MAX_FRAME:
+            raise ValueError(f"frame grande demais: {size} bytes")
+        return json.loads(await reader.readexactly(size))
+    except asyncio.IncompleteReadError:
+        return None
+
+
+def _parse_address(address: str):
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return "unix", rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"CLUSTER_ADDRESS inválido: {address}")
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ==============================
+# COORDENADOR
+# ==============================
+class _WorkerConn:
+    def __init__(self, worker_id: str, writer: asyncio.StreamWriter):
+        self.id = worker_id
+        self.writer = writer
+        self.assigned: Set[str] = set()
+        self.supports: Set[str] = set()  # casas que o worker sabe scrapear
+        self.last_seen = time.monotonic()
+        self.connected_at = time.time()
+        self.batches = 0
+        self.quotes = 0
+
+
+class ClusterCoordinator:
+    """
+    Aceita workers, distribui as casas entre eles e entrega cada lote
+    recebido para `on_batch(bookmaker, odds)` (ingest do processo da API).
+    """
+
+    def __init__(self, bookmakers: List[str],
+                 on_batch: Callable[[str, List[Dict]], Awaitable[None]],
+                 address: str = CLUSTER_ADDRESS, heartbeat: float = CLUSTER_HEARTBEAT,
+                 secret: str = CLUSTER_SECRET):
+        self.bookmakers = sorted(bookmakers)
+        self.on_batch = on_batch
+        self.address = address
+        self.heartbeat = heartbeat
+        self.secret = secret
+        self.workers: Dict[str, _WorkerConn] = {}
+        self.rebalances = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._ingester: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # casa -> (worker, odds) esperando o ingest; o lote mais novo substitui o pendente
+        self._pending: Dict[str, tuple] = {}
+        self._wake = asyncio.Event()
+
+    def assigned(self) -> Set[str]:
+        return {bk for w in self.workers.values() for bk in w.assigned}
+
+    def unassigned(self) -> Set[str]:
+        return set(self.bookmakers) - self.assigned()
+
+    async def start(self):
+        kind, where = _parse_address(self.address)
+        if kind == "unix":
+            os.makedirs(os.path.dirname(os.path.abspath(where)), exist_ok=True)
+            if os.path.exists(where):
+                os.unlink(where)
+            self._server = await asyncio.start_unix_server(self._handle, path=where)
+        else:
+            if not self.secret and not _is_loopback(where[0]):
+                raise ValueError(f"CLUSTER_ADDRESS fora de loopback ({where[0]}) exige CLUSTER_SECRET")
+            self._server = await asyncio.start_server(self._handle, *where)
+        self._reaper = asyncio.create_task(self._reap())
+        self._ingester = asyncio.create_task(self._ingest_loop())
+        log.info("cluster coordinator ouvindo", extra={"address": self.address})
+
+    async def stop(self):
+        for task in (self._reaper, self._ingester):
+            if task:
+                task.cancel()
+        if self._server:
+            self._server.close()
+        for w in list(self.workers.values()):
+            w.writer.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await read_frame(reader)
+        if not hello or hello.get("type") != "hello":
+            writer.close()
+            return
+        if self.secret and not hmac.compare_digest(str(hello.get("secret") or ""), self.secret):
+            self.rejected += 1
+            log.warning("worker recusado: segredo inválido", extra={"peer": str(writer.get_extra_info("peername"))})
+            writer.close()
+            return
+
+        worker_id = str(hello.get("worker") or uuid.uuid4().hex[:8])
+        if worker_id in self.workers:
+            worker_id = f"{worker_id}-{uuid.uuid4().hex[:4]}"
+        conn = _WorkerConn(worker_id, writer)
+        conn.supports = set(hello.get("bookmakers") or self.bookmakers)
+        self.workers[worker_id] = conn
+        log.info("worker conectado", extra={"worker": worker_id})
+        await self.rebalance()
+
+        try:
+            while True:
+                msg = await read_frame(reader)
+                if msg is None:
+                    break
+                conn.last_seen = time.monotonic()
+
+                if msg.get("type") == "batch":
+                    bookmaker = msg.get("bookmaker")
+                    # lote de uma casa que já foi reatribuída: descarta
+                    if bookmaker not in conn.assigned:
+                        continue
+                    odds = msg.get("odds") or []
+                    conn.batches += 1
+                    conn.quotes += len(odds)
+                    # ingest fora do loop de leitura: pode esperar o shedding
+                    # e o STORE_LOCK sem atrasar os pings deste worker
+                    if bookmaker in self._pending:
+                        self.coalesced += 1
+                    self._pending[bookmaker] = (worker_id, odds)
+                    self._wake.set()
+        except (ConnectionError, ValueError) as e:
+            log.warning("worker connection error: %s", e, extra={"worker": worker_id})
+        finally:
+            await self._drop(worker_id, "disconnect")
+
+    async def _ingest_loop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._pending:
+                bookmaker = next(iter(self._pending))
+                worker_id, odds = self._pending.pop(bookmaker)
+                try:
+                    await self.on_batch(bookmaker, odds)
+                except Exception as e:
+                    log.error("cluster ingest error: %s", e, extra={"worker": worker_id, "bookmaker": bookmaker})
+
+    async def _drop(self, worker_id: str, reason: str):
+        conn = self.workers.pop(worker_id, None)
+        if conn is None:
+            return
+        conn.writer.close()
+        log.warning("worker removido", extra={"worker": worker_id, "reason": reason, "bookmakers": sorted(conn.assigned)})
+        await self.rebalance()
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            limit = time.monotonic() - 3 * self.heartbeat
+            for worker_id, conn in list(self.workers.items()):
+                if conn.last_seen < limit:
+                    await self._drop(worker_id, "heartbeat")
+
+    async def rebalance(self):
+        """
+        Redistribui mantendo as atribuições atuais sempre que possível:
+        só move casas de workers mortos ou acima da cota.
+        """
+        async with self._lock:
+            live = list(self.workers.values())
+            if not live:
+                return
+
+            before = {w.id: set(w.assigned) for w in live}
+            cap = math.ceil(len(self.bookmakers) / len(live))
+
+            owned = set()
+            free = []
+            for w in live:
+                w.assigned &= set(self.bookmakers) & w.supports
+                while len(w.assigned) > cap:
+                    free.append(w.assigned.pop())
+                owned |= w.assigned
+            free += [bk for bk in self.bookmakers if bk not in owned and bk not in free]
+
+            for bk in sorted(free):
+                able = [w for w in live if bk in w.supports]
+                if able:
+                    target = min(able, key=lambda w: (len(w.assigned), w.id))
+                    target.assigned.add(bk)
+
+            self.rebalances += 1
+            for w in live:
+                if w.assigned != before[w.id]:
+                    try:
+                        await send_frame(w.writer, {"type": "assign", "bookmakers": sorted(w.assigned)})
+                        await send_frame(w.writer, {"type": "scrape"})
+                    except ConnectionError:
+                        pass  # o handler da conexão faz o _drop
+
+    async def request_scrape(self, bookmakers: Optional[Set[str]] = None):
+        """Pede um ciclo imediato aos workers (só das casas pedidas, se houver)."""
+        for w in list(self.workers.values()):
+            wanted = w.assigned if bookmakers is None else w.assigned & bookmakers
+            if not wanted:
+                continue
+            try:
+                await send_frame(w.writer, {"type": "scrape", "bookmakers": sorted(wanted)})
+            except ConnectionError:
+                pass
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "address": self.address,
+            "rebalances": self.rebalances,
+            "pending_batches": len(self._pending),
+            "coalesced_batches": self.coalesced,
+            "rejected": self.rejected,
+            "unassigned": sorted(self.unassigned()),
+            "workers": [
+                {
+                    "id": w.id,
+                    "bookmakers": sorted(w.assigned),
+                    "connected_at": w.connected_at,
+                    "last_seen_s": round(now - w.last_seen, 1),
+                    "batches": w.batches,
+                    "quotes": w.quotes,
+                }
+                for w in self.workers.values()
+            ],
+        }
+
+
+# ==============================
+# WORKER
+# ==============================
+class ClusterWorker:
+    """Processo de scraping: roda só as casas atribuídas e envia os lotes."""
+
+    def __init__(self, scrapers: Dict[str, object], address: str = CLUSTER_ADDRESS,
+                 name: Optional[str] = None, interval: float = 120, days_ahead: int = 3,
+                 heartbeat: float = CLUSTER_HEARTBEAT, secret: str = CLUSTER_SECRET):
+        self.scrapers = scrapers
+        self.address = address
+        self.secret = secret
+        self.name = name or f"{os.uname().nodename}-{os.getpid()}"
+        self.interval = interval
+        self.days_ahead = days_ahead
+        self.heartbeat = heartbeat
+        self.scheduler = ResourceScheduler()
+        self.assigned: Set[str] = set()
+        self._wake = asyncio.Event()
+        self._requested: Optional[Set[str]] = None  # None = todas as atribuídas
+
+    async def _connect(self):
+        kind, where = _parse_address(self.address)
+        if kind == "unix":
+            return await asyncio.open_unix_connection(where)
+        return await asyncio.open_connection(*where)
+
+    async def run_forever(self):
+        backoff = 1.0
+        while True:
+            try:
+                reader, writer = await self._connect()
+            except OSError as e:
+                log.warning("coordinator indisponível: %s", e, extra={"address": self.address})
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+
+            backoff = 1.0
+            try:
+                await self._session(reader, writer)
+            except (ConnectionError, ValueError) as e:
+                log.warning("sessão encerrada: %s", e)
+            finally:
+                writer.close()
+                self.assigned = set()
+            await asyncio.sleep(1)
+
+    async def _session(self, reader, writer):
+        await send_frame(writer, {"type": "hello", "worker": self.name, "bookmakers": sorted(self.scrapers),
+                                  "secret": self.secret})
+        tasks = [
+            asyncio.create_task(self._heartbeat(writer)),
+            asyncio.create_task(self._scrape_loop(writer)),
+        ]
+        try:
+            while True:
+                msg = await read_frame(reader)
+                if msg is None:
+                    return
+                if msg.get("type") == "assign":
+                    self.assigned = {bk for bk in msg.get("bookmakers", []) if bk in self.scrapers}
+                    log.info("atribuição", extra={"worker": self.name, "bookmakers": sorted(self.assigned)})
+                elif msg.get("type") == "scrape":
+                    wanted = msg.get("bookmakers")
+                    if wanted is None or (self._wake.is_set() and self._requested is None):
+                        self._requested = None
+                    else:
+                        self._requested = (self._requested or set()) | set(wanted)
+                    self._wake.set()
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def _heartbeat(self, writer):
+        while True:
+            await send_frame(writer, {"type": "ping"})
+            await asyncio.sleep(self.heartbeat)
+
+    async def _scrape_loop(self, writer):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            wanted = self.assigned if self._requested is None else self.assigned & self._requested
+            self._requested = None
+
+            await asyncio.gather(*(self._scrape_one(writer, bk) for bk in sorted(wanted)))
+
+    async def _scrape_one(self, writer, bookmaker: str):
+        scraper = self.scrapers[bookmaker]
+        try:
+            async with self.scheduler.slot(scraper):
+                odds = await asyncio.wait_for(scraper.fetch_upcoming(self.days_ahead), timeout=60)
+        except Exception as e:
+            log.error("scraper error: %s", e, extra={"bookmaker": bookmaker})
+            return
+        # a atribuição pode ter mudado durante o fetch
+        if bookmaker in self.assigned:
+            await send_frame(writer, {"type": "batch", "bookmaker": bookmaker, "odds": [o.dict() for o in odds]})
+
+
+def main():
+    from scrapers import load_scrapers
+    from utils.log import setup_logging
+
+    parser = argparse.ArgumentParser(description="Worker de scraping do BetScanner")
+    parser.add_argument("role", choices=["worker"])
+    parser.add_argument("--connect", default=CLUSTER_ADDRESS)
+    parser.add_argument("--name", default=None)
+    parser.add_argument("--interval", type=float, default=float(os.getenv("SCRAPE_INTERVAL_SECONDS", "120")))
+    parser.add_argument("--days-ahead", type=int, default=int(os.getenv("DEFAULT_DAYS_AHEAD", "3")))
+    args = parser.parse_args()
+
+    setup_logging()
+    worker = ClusterWorker(
+        {s.name: s for s in load_scrapers()},
+        address=args.connect,
+        name=args.name,
+        interval=args.interval,
+        days_ahead=args.days_ahead,
+    )
+    asyncio.run(worker.run_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from services.pipeline import ResultSet
+from utils.metrics import CONFIRM_OUTCOMES, CONFIRM_SECONDS
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+CONFIRM_ENABLED = os.getenv("CONFIRM_SUREBETS", "0") == "1"
+# casas sem endpoint por evento só são re-buscadas com isto ligado: o
+# "re-fetch" delas é o feed inteiro (e o token, nas casas com Playwright)
+CONFIRM_FULL_FEED = os.getenv("CONFIRM_FULL_FEED", "0") == "1"
+CONFIRM_TIMEOUT = float(os.getenv("CONFIRM_TIMEOUT_SECONDS", "10"))
+CONFIRM_MAX_EVENTS = int(os.getenv("CONFIRM_MAX_EVENTS", "50"))  # por rodada
+
+
+def _age(timestamp, now: float) -> Optional[float]:
+    try:
+        dt = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return round(now - dt.timestamp(), 1)
+
+
+def _leg_key(odd: Dict) -> Tuple:
+    return (odd.get("market"), odd.get("selection"), odd.get("bookmaker"))
+
+
+class SurebetConfirmer:
+    """
+    Caminho rápido depois do ingest: para cada surebet nova ou alterada,
+    re-busca só os eventos envolvidos, só nas casas envolvidas, com
+    deadline curto, e recalcula a surebet com os preços frescos.
+
+      confirmed  → item atualizado (odds/profit frescos)
+      dropped    → some do ResultSet (vanished no próximo delta)
+      unverified → alguma casa não respondeu no prazo; item mantido
+
+    Todos os itens tocados ganham `confirmation`, `confirmed_at` e
+    `quote_age_seconds` (maior idade entre as pernas).
+
+    Só re-busca casas que este processo scrapeia (`local()`; no cluster as
+    dos workers ficam de fora) e que têm endpoint por evento — ou qualquer
+    uma com `full_feed`. O re-fetch passa pelo `slot` do scheduler, como
+    um scrape do ciclo; a espera pela admissão conta no deadline.
+    """
+
+    name = "surebets"
+
+    def __init__(self, scrapers: Dict[str, object], min_profit_pct: float = 0.1,
+                 timeout: float = CONFIRM_TIMEOUT, max_events: int = CONFIRM_MAX_EVENTS,
+                 slot: Optional[Callable] = None, local: Optional[Callable[[], Optional[Set[str]]]] = None,
+                 full_feed: bool = CONFIRM_FULL_FEED):
+        self.scrapers = scrapers
+        self.min_profit_pct = min_profit_pct
+        self.timeout = timeout
+        self.max_events = max_events
+        self.slot = slot
+        self.local = local
+        self.full_feed = full_feed
+
+    def refetchable(self, bookmaker: str) -> bool:
+        scraper = self.scrapers.get(bookmaker)
+        if scraper is None:
+            return False
+        if self.local is not None:
+            scope = self.local()
+            if scope is not None and bookmaker not in scope:
+                return False
+        return self.full_feed or scraper.fetches_per_event()
+
+    async def _fetch(self, scraper, keys: set):
+        if self.slot is None:
+            return await scraper.fetch_events(keys)
+        async with self.slot(scraper):
+            return await scraper.fetch_events(keys)
+
+    def candidates(self, delta: Optional[Dict]) -> List[Tuple[str, Dict]]:
+        if not delta:
+            return []
+        changes = delta["changes"].get(self.name)
+        if not changes:
+            return []
+        items = changes["appeared"] + changes["changed"]
+        # maior lucro primeiro: se cortar, corta as piores
+        items.sort(key=lambda e: e[1].get("profit_pct", 0), reverse=True)
+        return items[: self.max_events]
+
+    async def _refetch(self, bookmaker: str, keys: set) -> Optional[Dict[Tuple, Dict]]:
+        if not self.refetchable(bookmaker):
+            return None
+        try:
+            odds = await asyncio.wait_for(self._fetch(self.scrapers[bookmaker], keys), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            log.info("confirm timeout", extra={"bookmaker": bookmaker})
+            return None
+        except Exception as e:
+            log.warning("confirm error: %s", e, extra={"bookmaker": bookmaker})
+            return None
+
+        fresh = {}
+        for o in odds:
+            o = o.dict()
+            fresh[(o["home_team"], o["away_team"], o["start_time"], o["league"]) + _leg_key(o)] = o
+        return fresh
+
+    async def confirm(self, candidates: List[Tuple[str, Dict]]) -> List[Tuple[Tuple, str, Dict, Optional[Dict]]]:
+        """Devolve (event_key, id, item original, item anotado | None = drop)."""
+        by_bookmaker: Dict[str, set] = {}
+        for _, item in candidates:
+            key = (item["home_team"], item["away_team"], item["start_time"], item["league"])
+            for leg in item["best_odds"]:
+                by_bookmaker.setdefault(leg["bookmaker"], set()).add(key)
+
+        names = list(by_bookmaker)
+        fetched = await asyncio.gather(*(self._refetch(b, by_bookmaker[b]) for b in names))
+        fresh = dict(zip(names, fetched))
+
+        now = time.time()
+        confirmed_at = datetime.utcnow().isoformat() + "Z"
+        outcomes = []
+
+        for item_id, item in candidates:
+            key = (item["home_team"], item["away_team"], item["start_time"], item["league"])
+            legs = []
+            status = "confirmed"
+
+            for leg in item["best_odds"]:
+                books = fresh[leg["bookmaker"]]
+                if books is None:
+                    status = "unverified"
+                    legs.append(dict(leg))
+                    continue
+                new = books.get(key + _leg_key(leg))
+                if new is None:  # a casa tirou a linha
+                    status = "dropped"
+                    break
+                legs.append(dict(new))
+
+            if status == "confirmed":
+                inv_sum = sum(1.0 / leg["odds"] for leg in legs)
+                profit_pct = (1.0 - inv_sum) * 100.0
+                if profit_pct < self.min_profit_pct:
+                    status = "dropped"
+
+            CONFIRM_OUTCOMES.labels(status).inc()
+            if status == "dropped":
+                outcomes.append((key, item_id, item, None))
+                continue
+
+            for leg in legs:
+                leg["age_seconds"] = _age(leg.get("timestamp"), now)
+            ages = [leg["age_seconds"] for leg in legs if leg["age_seconds"] is not None]
+
+            annotated = dict(item)
+            annotated["best_odds"] = legs
+            if status == "confirmed":
+                annotated["profit_pct"] = profit_pct
+            annotated["confirmation"] = status
+            annotated["confirmed_at"] = confirmed_at
+            annotated["quote_age_seconds"] = max(ages) if ages else None
+            outcomes.append((key, item_id, item, annotated))
+
+        return outcomes
+
+    def apply(self, results: ResultSet, outcomes) -> Optional[Dict]:
+        """
+        Aplica as confirmações no ResultSet (thread serial do ingest).
+        Ignora eventos que um ingest mais novo já recalculou.
+        """
+        touched = False
+        for key, item_id, original, annotated in outcomes:
+            current = results.event_items(self.name, key)
+            if current.get(item_id) is not original:
+                continue
+            items = dict(current)
+            if annotated is None:
+                items.pop(item_id)
+            else:
+                items[item_id] = annotated
+            results.set_event(self.name, key, items)
+            touched = True
+
+        if not touched:
+            return None
+        return results.publish()
+
+    async def run(self, delta: Optional[Dict], apply_fn) -> Dict:
+        """Rodada completa; `apply_fn(outcomes)` aplica no lane serial e publica."""
+        candidates = self.candidates(delta)
+        if not candidates:
+            return {"candidates": 0}
+
+        with CONFIRM_SECONDS.time():
+            outcomes = await self.confirm(candidates)
+            await apply_fn(outcomes)
+
+        summary = {"candidates": len(candidates)}
+        for *_, annotated in outcomes:
+            status = annotated["confirmation"] if annotated else "dropped"
+            summary[status] = summary.get(status, 0) + 1
+        return summary
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+FORCE_SCRAPE_COOLDOWN = float(os.getenv("FORCE_SCRAPE_COOLDOWN_SECONDS", "30"))
+
+Scope = Optional[FrozenSet[str]]  # None = todas as casas
+
+
+def _scope_list(scope: Scope):
+    return None if scope is None else sorted(scope)
+
+
+class _Cycle:
+    def __init__(self, scope: Scope, source: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.scope = scope
+        self.source = source
+        self.future = asyncio.get_running_loop().create_future()
+        self.waiters = 0
+
+    def covers(self, scope: Scope) -> bool:
+        return self.scope is None or (scope is not None and scope <= self.scope)
+
+    def merge(self, scope: Scope):
+        self.scope = None if self.scope is None or scope is None else self.scope | scope
+
+
+class CycleCoordinator:
+    """
+    Single-flight dos ciclos de scrape.
+
+    No máximo um ciclo rodando e um na fila. Um gatilho:
+      joined   → já há um ciclo rodando que cobre o escopo pedido
+      queued   → há um ciclo rodando com outro escopo; entra (ou se funde)
+                 no próximo, que começa assim que o atual terminar
+      started  → nada rodando, começa agora
+      rejected → um ciclo cobrindo o escopo terminou há menos de `cooldown`
+
+    Todos que entram no mesmo ciclo recebem o mesmo resultado.
+    """
+
+    def __init__(self, run: Callable[[Scope], Awaitable[Dict]], cooldown: float = FORCE_SCRAPE_COOLDOWN):
+        self._run = run
+        self.cooldown = cooldown
+        self.current: Optional[_Cycle] = None
+        self.pending: Optional[_Cycle] = None
+        self._finished: Dict[Scope, float] = {}
+        self.counts = {"started": 0, "joined": 0, "queued": 0, "rejected": 0}
+
+    def _last_finished(self, scope: Scope) -> float:
+        last = 0.0
+        for done_scope, ts in self._finished.items():
+            if done_scope is None or (scope is not None and scope <= done_scope):
+                last = max(last, ts)
+        return last
+
+    async def trigger(self, scope: Optional[Iterable[str]] = None, source: str = "force",
+                      respect_cooldown: bool = True, wait: bool = True) -> Dict:
+        scope = frozenset(scope) if scope else None
+
+        if respect_cooldown and self.cooldown > 0:
+            retry_after = self._last_finished(scope) + self.cooldown - time.time()
+            # já tem um ciclo para entrar? então não há custo extra: junta
+            joinable = self.current is not None and self.current.covers(scope)
+            if retry_after > 0 and not joinable:
+                self.counts["rejected"] += 1
+                return {"status": "rejected", "scope": _scope_list(scope), "retry_after": round(retry_after, 1)}
+
+        if self.current is not None and self.current.covers(scope):
+            cycle, status = self.current, "joined"
+        elif self.current is not None:
+            if self.pending is None:
+                self.pending = _Cycle(scope, source)
+            else:
+                self.pending.merge(scope)
+            cycle, status = self.pending, "queued"
+        else:
+            cycle, status = _Cycle(scope, source), "started"
+            self.current = cycle
+            asyncio.create_task(self._drive(cycle))
+
+        self.counts[status] += 1
+        out = {"status": status, "cycle_id": cycle.id, "scope": _scope_list(cycle.scope)}
+        if not wait:
+            return out
+
+        cycle.waiters += 1
+        start = time.perf_counter()
+        result = await asyncio.shield(cycle.future)
+        out["scope"] = _scope_list(cycle.scope)  # fila pode ter fundido escopos
+        out["waited_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        out.update(result)
+        return out
+
+    async def _drive(self, cycle: _Cycle):
+        while cycle is not None:
+            self.current = cycle
+            try:
+                result = await self._run(cycle.scope)
+            except Exception as e:
+                log.exception("cycle error: %s", e, extra={"cycle_id": cycle.id})
+                result = {"error": str(e)}
+
+            self._finished[cycle.scope] = time.time()
+            cycle.future.set_result(result)
+
+            cycle, self.pending = self.pending, None
+        self.current = None
+
+    def stats(self) -> Dict:
+        def describe(c: Optional[_Cycle]):
+            if c is None:
+                return None
+            return {"cycle_id": c.id, "scope": _scope_list(c.scope), "source": c.source, "waiters": c.waiters}
+
+        return {
+            "running": describe(self.current),
+            "queued": describe(self.pending),
+            "cooldown_seconds": self.cooldown,
+            "triggers": dict(self.counts),
+        }
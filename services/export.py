@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterable, Iterator
+
+from models.odds import Odds
+
+EXPORT_CHUNK_ROWS = 2000
+
+# mesma ordem do modelo Odds
+CSV_FIELDS = list(Odds.model_fields)
+
+
+def iter_ndjson(rows: Iterable[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Uma odd por linha, em blocos de `chunk_rows` linhas."""
+    buf = []
+    dumps = json.dumps
+    for odd in rows:
+        buf.append(dumps(odd, default=str, ensure_ascii=False))
+        if len(buf) >= chunk_rows:
+            yield ("\n".join(buf) + "\n").encode()
+            buf = []
+    if buf:
+        yield ("\n".join(buf) + "\n").encode()
+
+
+def iter_json_dump(head: Dict, rows: Iterable[Dict], field: str = "odds",
+                   chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Objeto JSON `{**head, field: [...], "count": n}` em blocos, sem montar
+    a lista inteira: `count` vai no fim porque só é conhecido depois.
+    """
+    dumps = json.dumps
+    opening = dumps(head, default=str, ensure_ascii=False)[:-1]
+    yield (opening + (", " if head else "") + dumps(field) + ": [").encode()
+
+    n = 0
+    buf = []
+    for odd in rows:
+        buf.append(dumps(odd, default=str, ensure_ascii=False))
+        if len(buf) >= chunk_rows:
+            yield (("," if n else "") + ",".join(buf)).encode()
+            n += len(buf)
+            buf = []
+    if buf:
+        yield (("," if n else "") + ",".join(buf)).encode()
+        n += len(buf)
+    yield f'], "count": {n}}}'.encode()
+
+
+def iter_csv(rows: Iterable[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """CSV com cabeçalho, em blocos de `chunk_rows` linhas."""
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+
+    n = 0
+    for odd in rows:
+        writer.writerow(odd)
+        n += 1
+        if n >= chunk_rows:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+            n = 0
+
+    tail = out.getvalue()
+    if tail:
+        yield tail.encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime um stream de blocos em gzip, sem materializar o todo."""
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = container gzip
+    for chunk in chunks:
+        data = comp.compress(chunk)
+        if data:
+            yield data
+    yield comp.flush()
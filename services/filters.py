@@ -0,0 +1,267 @@
+import base64
+import bisect
+import heapq
+import json
+import math
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from utils.normalize import start_time_epoch
+
+
+def item_facets(item: Dict) -> Tuple[Optional[str], Set[str], Set[str], float]:
+    """
+    (league, bookmakers, markets, profit) de um resultado de detector.
+
+    Surebets carregam as ofertas em `best_odds`; value bets são uma
+    oferta só. `profit` é profit_pct ou value_pct.
+    """
+    offers = item.get("best_odds")
+    if offers is not None:
+        bookmakers = {o.get("bookmaker") for o in offers}
+        markets = {o.get("market") for o in offers}
+    else:
+        bookmakers = {item.get("bookmaker")}
+        markets = {item.get("market")}
+
+    profit = item.get("profit_pct", item.get("value_pct", 0.0)) or 0.0
+    return item.get("league"), bookmakers, markets, float(profit)
+
+
+def as_set(value) -> Optional[Set[str]]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    values = {v.strip() for v in value if v and v.strip()}
+    return values or None
+
+
+class ResultFilter:
+    """Filtro por liga, casa, mercado e lucro mínimo (vazio = tudo)."""
+
+    def __init__(self, leagues: Iterable[str] = None, bookmakers: Iterable[str] = None,
+                 markets: Iterable[str] = None, min_profit: float = None):
+        self.leagues = as_set(leagues)
+        self.bookmakers = as_set(bookmakers)
+        self.markets = as_set(markets)
+        self.min_profit = float(min_profit) if min_profit not in (None, "") else None
+
+    @classmethod
+    def from_params(cls, params: Mapping) -> "ResultFilter":
+        return cls(
+            leagues=params.get("league"),
+            bookmakers=params.get("bookmaker"),
+            markets=params.get("market"),
+            min_profit=params.get("min_profit"),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.leagues or self.bookmakers or self.markets) and self.min_profit is None
+
+    def matches(self, item: Dict) -> bool:
+        if self.is_empty:
+            return True
+
+        league, bookmakers, markets, profit = item_facets(item)
+
+        if self.leagues and league not in self.leagues:
+            return False
+        if self.bookmakers and not (bookmakers & self.bookmakers):
+            return False
+        if self.markets and not (markets & self.markets):
+            return False
+        if self.min_profit is not None and profit < self.min_profit:
+            return False
+        return True
+
+
+# ==============================
+# ÍNDICE SECUNDÁRIO DOS RESULTADOS
+# ==============================
+SORTS = ("profit", "kickoff")
+
+
+def encode_cursor(position: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(position)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, item_id = json.loads(raw)
+        return float(key), str(item_id)
+    except (ValueError, TypeError):
+        raise ValueError("cursor inválido")
+
+
+def decode_bound(name: str, value: Optional[str]) -> Optional[float]:
+    """start_from/start_to → epoch. Presente mas ilegível é erro, não filtro ignorado."""
+    if value is None or value == "":
+        return None
+    epoch = start_time_epoch(value)
+    if epoch is None:
+        raise ValueError(f"{name} inválido: use ISO 8601 ou epoch")
+    return epoch
+
+
+class ResultIndex:
+    """
+    Índices secundários dos resultados publicados de um detector.
+
+    - sets por liga, casa e mercado: {valor: {id}}
+    - duas ordens mantidas ordenadas: (-profit, id) e (kickoff_epoch, id)
+
+    Sem filtro de faceta a consulta caminha direto na ordem pedida a
+    partir do cursor e para em `limit` (top-k = O(k)). Com faceta parte
+    do menor conjunto, intersecta e escolhe os k primeiros pela chave de
+    ordenação: custo proporcional ao resultado, não ao total de itens.
+
+    `update` aplica o delta de um publish (inserção/remoção ordenada por
+    bisect, O(delta · log n) fora o deslocamento da lista) em vez de
+    reconstruir tudo; o lock garante que uma consulta nunca vê um delta
+    aplicado pela metade.
+
+    O cursor é a chave da ordenação (sort_key, id) do último item
+    entregue, então continua válido entre versões.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Dict]]):
+        self._lock = threading.Lock()
+        self.items: Dict[str, Dict] = {}
+        self.by_league: Dict[str, Set[str]] = {}
+        self.by_bookmaker: Dict[str, Set[str]] = {}
+        self.by_market: Dict[str, Set[str]] = {}
+        self._facets: Dict[str, Tuple] = {}
+        self._keys: Dict[str, Dict[str, Tuple[float, str]]] = {sort: {} for sort in SORTS}
+
+        for item_id, item in entries:
+            self._add(item_id, item)
+        self._orders = {sort: sorted(keys.values()) for sort, keys in self._keys.items()}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _add(self, item_id: str, item: Dict):
+        league, bookmakers, markets, profit = item_facets(item)
+        self.items[item_id] = item
+        self._facets[item_id] = (league, bookmakers, markets)
+        self.by_league.setdefault(league, set()).add(item_id)
+        for b in bookmakers:
+            self.by_bookmaker.setdefault(b, set()).add(item_id)
+        for m in markets:
+            self.by_market.setdefault(m, set()).add(item_id)
+        kickoff = start_time_epoch(item.get("start_time"))
+        self._keys["profit"][item_id] = (-profit, item_id)
+        self._keys["kickoff"][item_id] = (kickoff if kickoff is not None else math.inf, item_id)
+
+    def _remove(self, item_id: str):
+        if self.items.pop(item_id, None) is None:
+            return
+        league, bookmakers, markets = self._facets.pop(item_id)
+        for index, values in ((self.by_league, (league,)), (self.by_bookmaker, bookmakers),
+                              (self.by_market, markets)):
+            for v in values:
+                ids = index.get(v)
+                if ids is not None:
+                    ids.discard(item_id)
+                    if not ids:
+                        del index[v]
+        for sort, keys in self._keys.items():
+            key = keys.pop(item_id)
+            order = self._orders[sort]
+            n = bisect.bisect_left(order, key)
+            if n < len(order) and order[n] == key:
+                del order[n]
+
+    def update(self, upserts: Iterable[Tuple[str, Dict]], removed: Iterable[str] = ()):
+        """Aplica um delta: remove os ids sumidos e (re)insere os novos/alterados."""
+        with self._lock:
+            for item_id in removed:
+                self._remove(item_id)
+            for item_id, item in upserts:
+                self._remove(item_id)
+                self._add(item_id, item)
+                for sort, keys in self._keys.items():
+                    bisect.insort(self._orders[sort], keys[item_id])
+
+    def _candidates(self, leagues, bookmakers, markets) -> Optional[Set[str]]:
+        facets = []
+        for values, index in ((leagues, self.by_league), (bookmakers, self.by_bookmaker),
+                              (markets, self.by_market)):
+            if values:
+                ids = set()
+                for v in values:
+                    ids |= index.get(v, set())
+                facets.append(ids)
+        if not facets:
+            return None
+        facets.sort(key=len)
+        out = set(facets[0])
+        for ids in facets[1:]:
+            out &= ids
+            if not out:
+                break
+        return out
+
+    def query(self, leagues: Iterable[str] = None, bookmakers: Iterable[str] = None,
+              markets: Iterable[str] = None, min_profit: Optional[float] = None,
+              start_from: Optional[float] = None, start_to: Optional[float] = None,
+              sort: str = "profit", limit: int = 100, cursor: Optional[Tuple] = None) -> Tuple[List[Dict], Optional[str]]:
+        """(itens, próximo cursor ou None)."""
+        if sort not in SORTS:
+            raise ValueError(f"sort deve ser um de {', '.join(SORTS)}")
+        with self._lock:
+            return self._query(as_set(leagues), as_set(bookmakers), as_set(markets), min_profit,
+                               start_from, start_to, sort, limit, cursor)
+
+    def _query(self, leagues, bookmakers, markets, min_profit, start_from, start_to,
+               sort, limit, cursor) -> Tuple[List[Dict], Optional[str]]:
+        order, keys = self._orders[sort], self._keys[sort]
+        first = bisect.bisect_right(order, cursor) if cursor else 0
+        kickoff = self._keys["kickoff"]
+
+        def keep(item_id: str) -> bool:
+            if min_profit is not None and -self._keys["profit"][item_id][0] < min_profit:
+                return False
+            k = kickoff[item_id][0]
+            if start_from is not None and k < start_from:
+                return False
+            if start_to is not None and k > start_to:
+                return False
+            return True
+
+        candidates = self._candidates(leagues, bookmakers, markets)
+        if candidates is None:
+            if sort == "kickoff" and start_from is not None:
+                first = max(first, bisect.bisect_left(order, (start_from, "")))
+            picked = []
+            # por índice a partir do cursor: O(k) em qualquer página
+            # (islice pularia `first` itens um a um)
+            for n in range(first, len(order)):
+                key, item_id = order[n]
+                # ordens monotônicas: dá para parar no primeiro fora da faixa
+                if sort == "profit" and min_profit is not None and -key < min_profit:
+                    break
+                if sort == "kickoff" and start_to is not None and key > start_to:
+                    break
+                if keep(item_id):
+                    picked.append(item_id)
+                    if len(picked) > limit:
+                        break
+        else:
+            # chave (sort_key, id) > cursor ⇔ posição depois do cursor na ordem
+            picked = heapq.nsmallest(
+                limit + 1,
+                (i for i in candidates if (cursor is None or keys[i] > cursor) and keep(i)),
+                key=keys.__getitem__,
+            )
+
+        next_cursor = None
+        if len(picked) > limit:
+            picked = picked[:limit]
+            next_cursor = encode_cursor(keys[picked[-1]])
+        return [self.items[i] for i in picked], next_cursor
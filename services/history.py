@@ -0,0 +1,174 @@
+import os
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.dedupe import odds_key
+
+
+# ==============================
+# CONFIG
+# ==============================
+HISTORY_DEPTH = int(os.getenv("HISTORY_DEPTH", "16"))  # pontos por cotação
+
+_KEY_FIELDS = ("home_team", "away_team", "league", "market", "selection", "bookmaker")
+
+
+class LineHistory:
+    """
+    Histórico de movimento de linha por odds_key.
+
+    Cada chave ganha um slot fixo com um ring buffer de `depth` pontos
+    (epoch, preço) dentro de arrays planos compartilhados — 12 bytes por
+    ponto, sem dict/tupla por ponto. Slots de chaves expiradas voltam
+    para uma free list, então a memória é ~ chaves_vivas × depth × 12 B.
+
+    Registra as odds CRUAS de cada lote (antes do dedupe keep="highest"),
+    e só quando o preço muda — revisitar a mesma odd não gasta ponto.
+    """
+
+    def __init__(self, depth: int = HISTORY_DEPTH):
+        self.depth = depth
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._free: List[int] = []
+
+        self._times = array("d")   # slot * depth + i
+        self._prices = array("f")
+        self._count = array("I")   # total de mudanças por slot (não só as retidas)
+
+        # "home|away" -> chaves, para consultar um evento sem varrer tudo
+        self._by_event: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _alloc(self, key: str) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+            self._count[slot] = 0
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._count.append(0)
+            self._times.extend([0.0] * self.depth)
+            self._prices.extend([0.0] * self.depth)
+        self._slots[key] = slot
+        home, away = key.split("|", 2)[:2]
+        self._by_event.setdefault(f"{home}|{away}", set()).add(key)
+        return slot
+
+    def observe(self, items: Iterable[Dict], now: Optional[float] = None):
+        """Observer do Ingestor: recebe o lote normalizado, antes do dedupe."""
+        now = now if now is not None else time.time()
+        depth = self.depth
+        slots, times, prices, count = self._slots, self._times, self._prices, self._count
+        for odd in items:
+            key = odds_key(odd)
+            price = float(odd.get("odds", 0))
+
+            slot = slots.get(key)
+            if slot is None:
+                slot = self._alloc(key)
+                n = 0
+            else:
+                n = count[slot]
+                # float32: compara com a mesma precisão que foi gravada
+                if n and abs(prices[slot * depth + (n - 1) % depth] - price) < 1e-4:
+                    continue
+
+            pos = slot * depth + n % depth
+            times[pos] = now
+            prices[pos] = price
+            count[slot] = n + 1
+
+    def forget(self, changed: List[Dict], removed: List[Tuple[str, Dict]]):
+        """Sink do Ingestor: libera o slot das odds expiradas do store."""
+        for key, _ in removed:
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                continue
+            self._keys[slot] = None
+            self._count[slot] = 0
+            self._free.append(slot)
+
+            home, away = key.split("|", 2)[:2]
+            keys = self._by_event.get(f"{home}|{away}")
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_event[f"{home}|{away}"]
+
+    def points(self, key: str) -> List[Tuple[float, float]]:
+        """Pontos retidos da chave, do mais antigo ao mais recente."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return []
+        n = self._count[slot]
+        base = slot * self.depth
+        out = []
+        for i in range(max(0, n - self.depth), n):
+            pos = base + i % self.depth
+            out.append((self._times[pos], round(self._prices[pos], 4)))
+        return out
+
+    def movement(self, key: str, now: Optional[float] = None) -> Optional[Dict]:
+        pts = self.points(key)
+        if not pts:
+            return None
+
+        now = now if now is not None else time.time()
+        (t0, p0), (t1, p1) = pts[0], pts[-1]
+        span_min = (t1 - t0) / 60.0
+
+        out = dict(zip(_KEY_FIELDS, key.split("|")))
+        out.update({
+            "price": p1,
+            "open_price": p0,
+            "change_pct": round((p1 / p0 - 1) * 100, 3) if p0 else None,
+            "changes": self._count[self._slots[key]] - 1,
+            # variação de preço por minuto dentro da janela retida
+            "velocity_per_min": round((p1 - p0) / span_min, 5) if span_min > 0 else 0.0,
+            "seconds_since_change": round(now - t1, 1),
+            "points": [{"t": t, "odds": p} for t, p in pts],
+        })
+        return out
+
+    def query(self, home: Optional[str] = None, away: Optional[str] = None,
+              league: Optional[str] = None, market: Optional[str] = None,
+              bookmaker: Optional[str] = None, selection: Optional[str] = None,
+              limit: int = 500) -> List[Dict]:
+        if home and away:
+            keys = list(self._by_event.get(f"{home}|{away}", ()))
+        else:
+            keys = list(self._slots)
+
+        wanted = dict(zip(_KEY_FIELDS, (home, away, league, market, selection, bookmaker)))
+        wanted = {i: v for i, v in enumerate(wanted.values()) if v}
+
+        now = time.time()
+        out = []
+        for key in keys:
+            parts = key.split("|")
+            if any(parts[i] != v for i, v in wanted.items()):
+                continue
+            mv = self.movement(key, now)
+            if mv is not None:
+                out.append(mv)
+                if len(out) >= limit:
+                    break
+        return out
+
+    def stats(self) -> Dict:
+        return {
+            "keys": len(self._slots),
+            "slots": len(self._keys),
+            "free_slots": len(self._free),
+            "depth": self.depth,
+            "bytes": (
+                self._times.itemsize * len(self._times)
+                + self._prices.itemsize * len(self._prices)
+                + self._count.itemsize * len(self._count)
+            ),
+        }
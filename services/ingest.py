@@ -0,0 +1,111 @@
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from models.odds import Odds
+from services.pipeline import DetectorPipeline
+from services.store import OddsStore
+from utils.metrics import DEDUPE_SECONDS, DETECT_EVENTS, DETECT_SECONDS
+from utils.profiler import span
+
+log = logging.getLogger(__name__)
+
+
+def collect_items(results: List) -> List[Dict]:
+    """
+    Achata o retorno dos scrapers (list[Odds] | list[dict] por casa)
+    numa única lista de dicts.
+    """
+    new_items = []
+
+    for res in results:
+        if isinstance(res, list):
+            for o in res:
+                if isinstance(o, Odds):
+                    new_items.append(o.dict())
+                elif isinstance(o, dict):
+                    new_items.append(o)
+
+    return new_items
+
+
+class Ingestor:
+    """
+    Estágio de ingest: normalização → dedupe/upsert → expiração por TTL
+    → detectores → sinks.
+
+    Tem estado, então `ingest` roda em COMPUTE.run_serial (nunca em
+    paralelo consigo mesmo). Sinks recebem (alteradas, removidas) de cada
+    lote — ex: change log — sem nova varredura do store. Observers recebem
+    o lote normalizado inteiro, antes do dedupe (ex: histórico de linha).
+    """
+
+    def __init__(self, store: OddsStore, pipeline: DetectorPipeline, keep="highest", ttl: float = 0):
+        self.store = store
+        self.pipeline = pipeline
+        self.keep = keep
+        self.ttl = ttl
+        self.sinks: List[Callable[[List[Dict], List[Tuple[str, Dict]]], None]] = []
+        self.observers: List[Callable[[List[Dict]], None]] = []
+
+    def add_sink(self, sink: Callable[[List[Dict], List[Tuple[str, Dict]]], None]):
+        self.sinks.append(sink)
+
+    def add_observer(self, observer: Callable[[List[Dict]], None]):
+        self.observers.append(observer)
+
+    def ingest(self, results: List) -> int:
+        with span("normalize"):
+            new_items = collect_items(results)
+
+        for observer in self.observers:
+            try:
+                observer(new_items)
+            except Exception as e:
+                log.error("ingest observer error: %s", e, extra={"observer": getattr(observer, "__qualname__", str(observer))})
+
+        with DEDUPE_SECONDS.time(), span("dedupe"):
+            added, changed = self.store.upsert_many(new_items, keep=self.keep)
+            removed = self.store.evict_stale(self.ttl) if self.ttl > 0 else []
+
+        with DETECT_SECONDS.time(), span("detect"):
+            touched = self.pipeline.process(changed, [odd for _, odd in removed])
+
+        DETECT_EVENTS.observe(touched)
+
+        for sink in self.sinks:
+            try:
+                sink(changed, removed)
+            except Exception as e:
+                log.error("ingest sink error: %s", e, extra={"sink": getattr(sink, "__qualname__", str(sink))})
+
+        return added
+
+    def restore(self, items: List[Dict], seen_at: List[float]) -> int:
+        """
+        Warm start: recarrega odds de um checkpoint com o instante em que
+        foram vistas, não o do boot, senão sobreviveriam até 2× o TTL.
+        Não passa pelos observers: não é um lote novo das casas (histórico
+        de linha, replay). As já expiradas ficam de fora.
+        """
+        if self.ttl > 0:
+            cutoff = self.store.clock() - self.ttl
+            fresh = [i for i, ts in enumerate(seen_at) if ts >= cutoff]
+            if len(fresh) < len(items):
+                items = [items[i] for i in fresh]
+                seen_at = [seen_at[i] for i in fresh]
+
+        with DEDUPE_SECONDS.time(), span("dedupe"):
+            added, changed = self.store.upsert_many(items, keep=self.keep, seen_at=seen_at)
+
+        with DETECT_SECONDS.time(), span("detect"):
+            touched = self.pipeline.process(changed, [])
+
+        DETECT_EVENTS.observe(touched)
+
+        for sink in self.sinks:
+            try:
+                sink(changed, [])
+            except Exception as e:
+                log.error("ingest sink error: %s", e, extra={"sink": getattr(sink, "__qualname__", str(sink))})
+
+        return added
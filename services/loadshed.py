@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+from utils.metrics import DEFERRED_SECONDS, LOAD_SHEDDING, LOOP_LAG_SECONDS, SHED_RESPONSES
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.1"))
+# lag acima disso liga o shedding; abaixo de RECOVER (por SHED_HOLD) desliga
+LOOP_LAG_SHED_MS = float(os.getenv("LOOP_LAG_SHED_MS", "100"))
+LOOP_LAG_RECOVER_MS = float(os.getenv("LOOP_LAG_RECOVER_MS", "30"))
+SHED_HOLD_SECONDS = float(os.getenv("SHED_HOLD_SECONDS", "2"))
+# quanto o ingest/confirmação/checkpoint esperam o loop acalmar antes de seguir mesmo assim
+INGEST_DEFER_MAX_SECONDS = float(os.getenv("INGEST_DEFER_MAX_SECONDS", "10"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+LATENCY_WINDOW = 200  # amostras por endpoint para p50/p95
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoadMonitor:
+    """
+    Lag do event loop + latência por endpoint + política de shedding.
+
+    Um timer dorme LOOP_LAG_INTERVAL e mede quanto acordou atrasado: é o
+    tempo que o loop ficou preso (parse no loop, GIL disputado pelo pool
+    de CPU, serialização grande). Lag acima de LOOP_LAG_SHED_MS liga o
+    shedding; ele só desliga depois de SHED_HOLD_SECONDS com lag abaixo
+    de LOOP_LAG_RECOVER_MS (histerese, para não oscilar).
+
+    Em shedding: endpoints com cache respondem a última resposta pronta,
+    mesmo de versão anterior, e o trabalho não interativo (ingest,
+    confirmação, checkpoint) espera o loop acalmar, até um teto.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.shedding = False
+        self.shed_since: Optional[float] = None
+        self._calm_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._latency: Dict[str, Deque[float]] = {}
+        self.counts = {"shed_episodes": 0, "stale_responses": 0, "deferred": 0}
+
+    # ------------------------------
+    # lag do loop
+    # ------------------------------
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.observe_lag(max(0.0, loop.time() - start - self.interval))
+
+    def observe_lag(self, lag: float):
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        LOOP_LAG_SECONDS.observe(lag)
+
+        now = time.monotonic()
+        lag_ms = lag * 1000
+        if lag_ms >= LOOP_LAG_SHED_MS:
+            self._calm_since = None
+            if not self.shedding:
+                self.shedding = True
+                self.shed_since = now
+                self.counts["shed_episodes"] += 1
+                LOAD_SHEDDING.set(1)
+                log.warning("event loop lento: shedding ligado", extra={"lag_ms": round(lag_ms, 1)})
+        elif self.shedding and lag_ms < LOOP_LAG_RECOVER_MS:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= SHED_HOLD_SECONDS:
+                log.info("shedding desligado", extra={"seconds": round(now - self.shed_since, 1)})
+                self.shedding = False
+                self.shed_since = None
+                LOAD_SHEDDING.set(0)
+
+    async def wait_calm(self, what: str, max_wait: float = INGEST_DEFER_MAX_SECONDS) -> float:
+        """Segura trabalho não interativo enquanto houver shedding (até max_wait)."""
+        if not self.shedding:
+            return 0.0
+        start = time.monotonic()
+        self.counts["deferred"] += 1
+        while self.shedding and time.monotonic() - start < max_wait:
+            await asyncio.sleep(self.interval)
+        waited = time.monotonic() - start
+        DEFERRED_SECONDS.labels(what).observe(waited)
+        return waited
+
+    # ------------------------------
+    # latência por endpoint
+    # ------------------------------
+    def observe_request(self, path: str, seconds: float):
+        window = self._latency.get(path)
+        if window is None:
+            window = self._latency[path] = deque(maxlen=LATENCY_WINDOW)
+        window.append(seconds)
+
+    def latency(self) -> Dict[str, Dict]:
+        out = {}
+        for path, window in self._latency.items():
+            values = list(window)
+            out[path] = {
+                "n": len(values),
+                "p50_ms": round(_percentile(values, 0.5) * 1000, 2),
+                "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+            }
+        return out
+
+    def stats(self) -> Dict:
+        return {
+            "lag_ms": round(self.lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "shedding": self.shedding,
+            "shedding_for": round(time.monotonic() - self.shed_since, 1) if self.shed_since else None,
+            "thresholds_ms": {"shed": LOOP_LAG_SHED_MS, "recover": LOOP_LAG_RECOVER_MS},
+            "counts": dict(self.counts),
+            "endpoints": self.latency(),
+        }
+
+
+class ResponseCache:
+    """
+    Última resposta serializada por (endpoint, parâmetros), com a versão
+    dos dados. Mesma versão → hit exato (pula consulta e serialização);
+    em shedding qualquer versão serve (stale). LRU limitado.
+    """
+
+    def __init__(self, monitor: LoadMonitor, size: int = RESPONSE_CACHE_SIZE):
+        self.monitor = monitor
+        self.size = size
+        self._items: "OrderedDict[Hashable, Tuple[Any, bytes]]" = OrderedDict()
+
+    def get(self, key: Hashable, version: Any) -> Tuple[Optional[bytes], str]:
+        cached = self._items.get(key)
+        if cached is None:
+            return None, "miss"
+        self._items.move_to_end(key)
+        cached_version, body = cached
+        if cached_version == version:
+            return body, "hit"
+        if self.monitor.shedding:
+            self.monitor.counts["stale_responses"] += 1
+            SHED_RESPONSES.labels(str(key[0])).inc()
+            return body, "stale"
+        return None, "miss"
+
+    def put(self, key: Hashable, version: Any, body: bytes):
+        self._items[key] = (version, body)
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
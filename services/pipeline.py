@@ -0,0 +1,198 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.filters import ResultIndex
+from utils.dedupe import odds_key
+
+log = logging.getLogger(__name__)
+
+
+def event_key(odd: Dict) -> Tuple:
+    """Chave de evento usada pelos detectores: (home, away, start_time, league)."""
+    return (odd.get("home_team"), odd.get("away_team"), odd.get("start_time"), odd.get("league"))
+
+
+class Detector:
+    """
+    Detector incremental: recebe todas as ofertas de UM evento alterado
+    e devolve os resultados daquele evento (lista vazia = nenhum).
+    """
+    name = "base"
+
+    def detect_event(self, key: Tuple, offers: List[Dict]) -> List[Dict]:
+        raise NotImplementedError
+
+    def item_id(self, item: Dict) -> str:
+        """Identidade estável de um resultado (para deltas appeared/changed/vanished)."""
+        raise NotImplementedError
+
+
+def _empty_changes() -> Dict[str, List]:
+    return {"appeared": [], "changed": [], "vanished": []}
+
+
+class ResultSet:
+    """
+    Resultados de todos os detectores, por evento, com versão.
+
+    A escrita acontece só no ingest (thread serial). Cada publish gera o
+    delta da versão (`last_delta`): por detector, (id, item) que
+    apareceram, mudaram ou sumiram, e em `previous` a versão anterior
+    dos que mudaram — e é só esse delta que é aplicado ao
+    estado publicado ({id: item} e ResultIndex de cada detector), sob
+    lock, então a leitura pelos endpoints nunca vê um estado parcial.
+
+    As listas de `get`/`entries` são montadas na primeira leitura depois
+    de uma mudança do detector e reaproveitadas até a próxima.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.updated_at: Optional[str] = None
+        self.last_delta: Optional[Dict] = None
+        self._by_event: Dict[str, Dict[Tuple, Dict[str, Dict]]] = {}
+        self._published: Dict[str, Dict[str, Dict]] = {}
+        self._views: Dict[str, Tuple[List[Tuple[str, Dict]], List[Dict]]] = {}
+        self._indexes: Dict[str, ResultIndex] = {}
+        self._pending: Dict[str, Dict[str, List]] = {}
+        self._previous: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str):
+        self._by_event.setdefault(name, {})
+        self._published.setdefault(name, {})
+        self._indexes.setdefault(name, ResultIndex(()))
+
+    def set_event(self, name: str, key: Tuple, items: Dict[str, Dict]):
+        """Substitui os resultados {id: item} de um evento e acumula o delta."""
+        per_event = self._by_event[name]
+        old = per_event.get(key, {})
+
+        if not old and not items:
+            return
+
+        changes = self._pending.setdefault(name, _empty_changes())
+        for item_id, item in items.items():
+            prev = old.get(item_id)
+            if prev is None:
+                changes["appeared"].append((item_id, item))
+            elif prev != item:
+                changes["changed"].append((item_id, item))
+                # versão que os consumidores viram antes (filtros do WS)
+                self._previous.setdefault(name, {}).setdefault(item_id, prev)
+        for item_id, prev in old.items():
+            if item_id not in items:
+                changes["vanished"].append((item_id, prev))
+
+        if items:
+            per_event[key] = items
+        else:
+            per_event.pop(key, None)
+
+    def event_items(self, name: str, key: Tuple) -> Dict[str, Dict]:
+        """{id: item} atuais de um evento (estado de trabalho, não o publicado)."""
+        return self._by_event.get(name, {}).get(key, {})
+
+    def publish(self) -> Dict:
+        with self._lock:
+            for name, changes in self._pending.items():
+                if not any(changes.values()):
+                    continue
+                vanished = [item_id for item_id, _ in changes["vanished"]]
+                upserts = changes["appeared"] + changes["changed"]
+
+                published = self._published.setdefault(name, {})
+                for item_id in vanished:
+                    published.pop(item_id, None)
+                published.update(upserts)
+                self._indexes.setdefault(name, ResultIndex(())).update(upserts, vanished)
+                self._views.pop(name, None)
+
+            self.version += 1
+            self.updated_at = datetime.utcnow().isoformat() + "Z"
+
+        self.last_delta = {"version": self.version, "changes": self._pending, "previous": self._previous}
+        self._pending = {}
+        self._previous = {}
+        return self.last_delta
+
+    def _view(self, name: str) -> Tuple[List[Tuple[str, Dict]], List[Dict]]:
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                entries = list(self._published.get(name, {}).items())
+                view = self._views[name] = (entries, [item for _, item in entries])
+            return view
+
+    def get(self, name: str) -> List[Dict]:
+        return self._view(name)[1]
+
+    def entries(self, name: str) -> List[Tuple[str, Dict]]:
+        """(id, item) da versão publicada."""
+        return self._view(name)[0]
+
+    def index(self, name: str) -> ResultIndex:
+        """Índices secundários da versão publicada."""
+        idx = self._indexes.get(name)
+        return idx if idx is not None else ResultIndex(())
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._by_event)
+
+
+class DetectorPipeline:
+    """
+    Estágio único de detecção acoplado ao ingest.
+
+    Mantém as ofertas agrupadas por evento; a cada lote só os eventos
+    tocados pelo delta são reavaliados, e todos os detectores
+    registrados compartilham essa mesma passada.
+    """
+
+    def __init__(self):
+        self.detectors: List[Detector] = []
+        self.results = ResultSet()
+        self._events: Dict[Tuple, Dict[str, Dict]] = {}
+
+    def register(self, detector: Detector) -> Detector:
+        self.detectors.append(detector)
+        self.results.register(detector.name)
+        return detector
+
+    def process(self, changed: Iterable[Dict], removed: Iterable[Dict] = ()) -> int:
+        """Aplica o delta do ingest (upserts + remoções) e reavalia os eventos afetados."""
+        touched = set()
+
+        for odd in changed:
+            key = event_key(odd)
+            self._events.setdefault(key, {})[odds_key(odd)] = odd
+            touched.add(key)
+
+        for odd in removed:
+            key = event_key(odd)
+            offers = self._events.get(key)
+            if offers is not None:
+                offers.pop(odds_key(odd), None)
+                if not offers:
+                    del self._events[key]
+            touched.add(key)
+
+        for key in touched:
+            offers = list(self._events.get(key, {}).values())
+            for det in self.detectors:
+                try:
+                    items = det.detect_event(key, offers)
+                except Exception as e:
+                    log.error("detector error: %s", e, extra={"detector": det.name})
+                    items = []
+                self.results.set_event(det.name, key, {det.item_id(i): i for i in items})
+
+        if touched:
+            self.results.publish()
+        else:
+            self.results.last_delta = None
+
+        return len(touched)
@@ -0,0 +1,298 @@
+"""
+Log de lotes de ingest + replay acelerado (backtest dos detectores).
+
+Gravação: com REPLAY_LOG_PATH, cada lote que entra no ingest (já
+achatado, antes do dedupe) vira um registro no log — o mesmo formato
+binário dos snapshots, com o instante do lote no cabeçalho do registro.
+
+Replay:
+
+    python -m services.replay data/ingest.log --speed 60
+    python -m services.replay --snapshots data/odds.snap data/shared/state.snap
+
+passa os lotes por um Ingestor novo (dedupe → TTL → detectores) o mais
+rápido possível ou a N× o tempo real, com relógio virtual (o TTL expira
+pelo tempo do log, não pelo relógio da máquina). O relatório traz
+throughput do ingest e, por detector, oportunidades encontradas e
+quanto tempo cada uma ficou aberta. `--detector módulo:Classe` troca os
+detectores para comparar algoritmos sobre a mesma entrada.
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import struct
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from services.ingest import Ingestor
+from services.pipeline import Detector, DetectorPipeline
+from services.snapshot import SnapshotReader, encode_snapshot
+from services.store import OddsStore
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+REPLAY_LOG_PATH = os.getenv("REPLAY_LOG_PATH", "")
+# ao passar disso o log atual vira <path>.1 (a geração anterior é descartada)
+REPLAY_LOG_MAX_MB = float(os.getenv("REPLAY_LOG_MAX_MB", "512"))
+
+MAGIC = b"BSRLOG01"
+# por registro: tamanho do snapshot (u64) + instante do lote (epoch f64)
+_RECORD = struct.Struct("<Qd")
+
+
+# ==============================
+# GRAVAÇÃO
+# ==============================
+class ReplayLog:
+    """
+    Observer do Ingestor: grava cada lote como um registro do log.
+
+    Roda no lane serial do ingest, então não precisa de lock; o arquivo
+    fica aberto e cada registro é escrito inteiro antes do flush.
+    """
+
+    def __init__(self, path: str, max_mb: float = REPLAY_LOG_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._file = None
+        self.records = 0
+        self.rows = 0
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def _rotate(self):
+        self._file.close()
+        os.replace(self.path, self.path + ".1")
+        self._open()
+        log.info("replay log rotacionado", extra={"path": self.path})
+
+    def record(self, items: List[Dict], now: Optional[float] = None):
+        if not items:
+            return
+        if self._file is None:
+            self._open()
+        elif self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+        data = encode_snapshot(items)
+        self._file.write(_RECORD.pack(len(data), time.time() if now is None else now))
+        self._file.write(data)
+        self._file.flush()
+        self.records += 1
+        self.rows += len(items)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict:
+        return {"path": self.path, "records": self.records, "rows": self.rows}
+
+
+# ==============================
+# LEITURA
+# ==============================
+def iter_log(path: str) -> Iterator[Tuple[float, List[Dict]]]:
+    """(instante, odds) de cada lote do log; registro truncado no fim é ignorado."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} não é um replay log BetScanner")
+        while True:
+            head = f.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return
+            size, ts = _RECORD.unpack(head)
+            data = f.read(size)
+            if len(data) < size:
+                log.warning("registro truncado no fim do log", extra={"path": path})
+                return
+            reader = SnapshotReader(data)
+            yield ts, list(reader.rows())
+
+
+def iter_snapshots(paths: Iterable[str]) -> Iterator[Tuple[float, List[Dict]]]:
+    """Checkpoints/snapshots existentes como lotes, na ordem em que foram criados."""
+    readers = [SnapshotReader.open(p) for p in paths]
+    try:
+        for reader in sorted(readers, key=lambda r: r.created_us):
+            yield reader.created_at, list(reader.rows())
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+# ==============================
+# REPLAY
+# ==============================
+class _Clock:
+    """Relógio virtual: o instante do lote sendo reproduzido."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _summary(values: List[float]) -> Dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+    return {
+        "n": len(ordered),
+        "mean_s": round(sum(ordered) / len(ordered), 1),
+        "p50_s": pick(0.5),
+        "p90_s": pick(0.9),
+        "max_s": round(ordered[-1], 1),
+    }
+
+
+class Replayer:
+    """
+    Reproduz lotes num Ingestor isolado (store, pipeline e relógio
+    próprios) e acompanha o ciclo de vida das oportunidades pelos
+    deltas de cada publish: `appeared` abre, `vanished` fecha.
+    """
+
+    def __init__(self, detectors: List[Detector], ttl: float = 0, keep: str = "highest"):
+        self.clock = _Clock()
+        self.store = OddsStore(clock=self.clock)
+        self.pipeline = DetectorPipeline()
+        for det in detectors:
+            self.pipeline.register(det)
+        self.ingestor = Ingestor(self.store, self.pipeline, keep=keep, ttl=ttl)
+
+        self.batches = 0
+        self.rows = 0
+        self.ingest_seconds = 0.0
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self._open: Dict[str, Dict[str, float]] = {det.name: {} for det in detectors}
+        self._lifetimes: Dict[str, List[float]] = {det.name: [] for det in detectors}
+        self._found: Dict[str, int] = {det.name: 0 for det in detectors}
+        self._changed: Dict[str, int] = {det.name: 0 for det in detectors}
+        self._peak: Dict[str, int] = {det.name: 0 for det in detectors}
+
+    def feed(self, ts: float, rows: List[Dict]):
+        self.clock.now = ts
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+
+        start = time.perf_counter()
+        self.ingestor.ingest([rows])
+        self.ingest_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.rows += len(rows)
+
+        delta = self.pipeline.results.last_delta
+        if delta:
+            self._track(ts, delta["changes"])
+
+    def _track(self, ts: float, changes: Dict[str, Dict[str, List]]):
+        for name, change in changes.items():
+            opened = self._open.setdefault(name, {})
+            for item_id, _ in change["appeared"]:
+                opened.setdefault(item_id, ts)
+                self._found[name] = self._found.get(name, 0) + 1
+            for item_id, _ in change["vanished"]:
+                since = opened.pop(item_id, None)
+                if since is not None:
+                    self._lifetimes.setdefault(name, []).append(ts - since)
+            self._changed[name] = self._changed.get(name, 0) + len(change["changed"])
+            self._peak[name] = max(self._peak.get(name, 0), len(opened))
+
+    def run(self, batches: Iterable[Tuple[float, List[Dict]]], speed: Optional[float] = None) -> Dict:
+        """`speed` None = o mais rápido possível; N = N× o intervalo original entre lotes."""
+        wall = time.perf_counter()
+        started: Optional[Tuple[float, float]] = None
+        for ts, rows in batches:
+            if speed:
+                if started is None:
+                    started = (ts, time.perf_counter())
+                wait = (ts - started[0]) / speed - (time.perf_counter() - started[1])
+                if wait > 0:
+                    time.sleep(wait)
+            self.feed(ts, rows)
+        return self.report(time.perf_counter() - wall)
+
+    def report(self, wall_seconds: float = 0.0) -> Dict:
+        span_s = (self.last_ts - self.first_ts) if self.batches else 0.0
+        detectors = {}
+        for name in self._found:
+            detectors[name] = {
+                "found": self._found[name],
+                "changed": self._changed.get(name, 0),
+                "open_at_end": len(self._open.get(name, {})),
+                "peak_open": self._peak.get(name, 0),
+                "lifetime": _summary(self._lifetimes.get(name, [])),
+            }
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "log_span_s": round(span_s, 1),
+            "wall_s": round(wall_seconds, 3),
+            "ingest_s": round(self.ingest_seconds, 3),
+            "rows_per_s": round(self.rows / self.ingest_seconds) if self.ingest_seconds else None,
+            "batches_per_s": round(self.batches / self.ingest_seconds, 1) if self.ingest_seconds else None,
+            "speedup": round(span_s / wall_seconds, 1) if wall_seconds and span_s else None,
+            "store_size": len(self.store),
+            "detectors": detectors,
+        }
+
+
+def load_detector(spec: str) -> Detector:
+    """`módulo:Classe` ou `módulo:Classe:json_kwargs` (ex: services.surebet:SurebetDetector)."""
+    module, _, rest = spec.partition(":")
+    cls_name, _, kwargs = rest.partition(":")
+    cls = getattr(importlib.import_module(module), cls_name)
+    return cls(**(json.loads(kwargs) if kwargs else {}))
+
+
+def default_detectors() -> List[Detector]:
+    # mesmos limiares do main
+    from services.surebet import SurebetDetector
+    from services.valuebet import ValuebetDetector
+
+    return [SurebetDetector(min_profit_pct=0.1), ValuebetDetector(threshold_pct=5)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de lotes de ingest do BetScanner")
+    parser.add_argument("log", nargs="?", default=REPLAY_LOG_PATH or None,
+                        help="replay log (padrão: REPLAY_LOG_PATH)")
+    parser.add_argument("--snapshots", nargs="+", default=None, help="checkpoints/snapshots como lotes")
+    parser.add_argument("--speed", type=float, default=None, help="N× o tempo real (padrão: sem espera)")
+    parser.add_argument("--ttl", type=float, default=float(os.getenv("ODDS_TTL_SECONDS", "900")),
+                        help="TTL das odds no tempo do log (0 = sem expiração)")
+    parser.add_argument("--detector", action="append", default=None,
+                        help="módulo:Classe[:json_kwargs], repetível (padrão: detectores do main)")
+    args = parser.parse_args()
+
+    if not args.log and not args.snapshots:
+        parser.error("informe o log (ou REPLAY_LOG_PATH) ou --snapshots")
+
+    detectors = [load_detector(d) for d in args.detector] if args.detector else default_detectors()
+    batches = iter_snapshots(args.snapshots) if args.snapshots else iter_log(args.log)
+
+    report = Replayer(detectors, ttl=args.ttl).run(batches, speed=args.speed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
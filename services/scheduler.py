@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from utils.metrics import SCHEDULER_WAIT_SECONDS, SCRAPER_RSS_DELTA_MB
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+# MB que os scrapers em andamento podem somar (custo estimado de cada um)
+SCRAPE_MEMORY_BUDGET_MB = float(os.getenv("SCRAPE_MEMORY_BUDGET_MB", "600"))
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "6"))
+# limite por classe de recurso, ex: "browser=1,heavy_json=2,light_json=4"
+SCRAPE_CLASS_LIMITS = os.getenv("SCRAPE_CLASS_LIMITS", "browser=2,heavy_json=2,light_json=4")
+SCRAPE_RSS_SAMPLE_SECONDS = float(os.getenv("SCRAPE_RSS_SAMPLE_SECONDS", "0.1"))
+
+# custo inicial (MB) por classe, até existir medição da casa
+DEFAULT_COSTS_MB = {"browser": 250.0, "heavy_json": 150.0, "light_json": 40.0}
+
+# peso da última medição na média móvel do custo
+COST_ALPHA = 0.3
+MIN_COST_MB = 5.0
+
+try:
+    _PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+except (AttributeError, ValueError, OSError):
+    _PAGE_MB = 4096 / (1024 * 1024)
+
+
+def parse_limits(value: str) -> Dict[str, int]:
+    limits = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        name, _, n = part.partition("=")
+        if name.strip() in DEFAULT_COSTS_MB:
+            limits[name.strip()] = max(1, int(n))
+    return limits
+
+
+# ==============================
+# RSS
+# ==============================
+def _children(pid: int) -> List[int]:
+    out = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                out.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return out
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def tree_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    RSS (MB) do processo + descendentes. Os Chromium do Playwright são
+    processos filhos, então entram na conta. None fora do Linux.
+    """
+    pid = pid or os.getpid()
+    if not os.path.exists(f"/proc/{pid}/statm"):
+        return None
+
+    total, stack = 0.0, [pid]
+    while stack:
+        p = stack.pop()
+        total += _rss_mb(p)
+        stack.extend(_children(p))
+    return total
+
+
+# ==============================
+# SCHEDULER
+# ==============================
+class _Slot:
+    def __init__(self, name: str, cls: str, cost: float, rss: Optional[float]):
+        self.name = name
+        self.cls = cls
+        self.cost = cost
+        self.start_rss = rss
+        self.peak_rss = rss
+
+
+class ResourceScheduler:
+    """
+    Admissão dos scrapers por orçamento de memória e concorrência.
+
+    Cada casa declara `resource_class` (browser | heavy_json | light_json).
+    Uma casa só começa se couber nos três limites: total em andamento,
+    limite da classe e soma dos custos ≤ orçamento de MB. O custo começa
+    no padrão da classe e vira a média móvel do delta de RSS medido
+    (pico durante a execução − RSS na entrada, árvore de processos).
+    Execuções sobrepostas: quem entrou depois de X tem a memória de X
+    embutida no RSS de entrada; quando X termina, esse RSS de entrada é
+    rebaixado pelo delta de X, para a saída de X não virar custo negativo
+    (subestimado) do vizinho. Crescimento de vizinhos durante a execução
+    ainda entra no pico — erro para cima, que só deixa a admissão mais
+    conservadora.
+
+    Uma casa mais cara que o orçamento inteiro roda sozinha (nunca trava).
+    """
+
+    def __init__(self, budget_mb: float = SCRAPE_MEMORY_BUDGET_MB,
+                 max_concurrency: int = SCRAPE_MAX_CONCURRENCY,
+                 class_limits: Optional[Dict[str, int]] = None,
+                 sample_seconds: float = SCRAPE_RSS_SAMPLE_SECONDS):
+        self.budget_mb = budget_mb
+        self.max_concurrency = max(1, max_concurrency)
+        self.class_limits = class_limits if class_limits is not None else parse_limits(SCRAPE_CLASS_LIMITS)
+        self.sample_seconds = sample_seconds
+
+        self.costs: Dict[str, float] = {}
+        self.last_delta: Dict[str, float] = {}
+        self.runs: Dict[str, int] = {}
+        self.running: List[_Slot] = []
+        self.waiting = 0
+        self.peak_rss: Optional[float] = None
+        self._cond: Optional[asyncio.Condition] = None
+        self._sampler: Optional[asyncio.Task] = None
+
+    def cost_of(self, name: str, cls: str) -> float:
+        return self.costs.get(name, DEFAULT_COSTS_MB.get(cls, DEFAULT_COSTS_MB["light_json"]))
+
+    @property
+    def reserved_mb(self) -> float:
+        return sum(s.cost for s in self.running)
+
+    def _fits(self, cls: str, cost: float) -> bool:
+        if not self.running:
+            return True
+        if len(self.running) >= self.max_concurrency:
+            return False
+        limit = self.class_limits.get(cls)
+        if limit is not None and sum(1 for s in self.running if s.cls == cls) >= limit:
+            return False
+        return self.reserved_mb + cost <= self.budget_mb
+
+    @asynccontextmanager
+    async def slot(self, scraper):
+        name = scraper.name
+        cls = getattr(scraper, "resource_class", "light_json")
+        cost = self.cost_of(name, cls)
+
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+
+        start = time.perf_counter()
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self._fits(cls, cost))
+            finally:
+                self.waiting -= 1
+            slot = _Slot(name, cls, cost, tree_rss_mb())
+            self.running.append(slot)
+        SCHEDULER_WAIT_SECONDS.labels(cls).observe(time.perf_counter() - start)
+        self._ensure_sampler()
+
+        try:
+            yield slot
+        finally:
+            self._sample()
+            delta = self._learn(slot)
+            async with self._cond:
+                self.running.remove(slot)
+                self._release(slot, delta)
+                self._cond.notify_all()
+
+    def _release(self, done: _Slot, delta: Optional[float]):
+        if delta is None:
+            return
+        for s in self.running:
+            if s.start_rss is not None and s.start_rss > done.start_rss:
+                # parte do crescimento de `done` que já estava na entrada de `s`
+                shift = min(delta, s.start_rss - done.start_rss)
+                s.start_rss -= shift
+
+    def _learn(self, slot: _Slot) -> Optional[float]:
+        if slot.start_rss is None:
+            return None
+        delta = max(0.0, slot.peak_rss - slot.start_rss)
+        SCRAPER_RSS_DELTA_MB.labels(slot.name).observe(delta)
+
+        prev = self.costs.get(slot.name)
+        cost = delta if prev is None else COST_ALPHA * delta + (1 - COST_ALPHA) * prev
+        self.costs[slot.name] = max(MIN_COST_MB, cost)
+        self.last_delta[slot.name] = round(delta, 1)
+        self.runs[slot.name] = self.runs.get(slot.name, 0) + 1
+        return delta
+
+    def _sample(self):
+        rss = tree_rss_mb()
+        if rss is None:
+            return
+        self.peak_rss = rss if self.peak_rss is None else max(self.peak_rss, rss)
+        for s in self.running:
+            s.peak_rss = max(s.peak_rss, rss)
+
+    def _ensure_sampler(self):
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.create_task(self._sample_loop())
+
+    async def _sample_loop(self):
+        # só roda enquanto houver scraper em andamento
+        while self.running:
+            self._sample()
+            await asyncio.sleep(self.sample_seconds)
+
+    def stats(self) -> Dict:
+        return {
+            "budget_mb": self.budget_mb,
+            "max_concurrency": self.max_concurrency,
+            "class_limits": self.class_limits,
+            "reserved_mb": round(self.reserved_mb, 1),
+            "running": [{"bookmaker": s.name, "class": s.cls, "cost_mb": round(s.cost, 1)} for s in self.running],
+            "waiting": self.waiting,
+            "rss_mb": round(tree_rss_mb() or 0.0, 1),
+            "peak_rss_mb": round(self.peak_rss, 1) if self.peak_rss is not None else None,
+            "costs_mb": {k: round(v, 1) for k, v in self.costs.items()},
+            "last_delta_mb": self.last_delta,
+            "runs": self.runs,
+        }
@@ -0,0 +1,220 @@
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from services.filters import ResultIndex
+from services.snapshot import SnapshotReader, write_snapshot
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+# single: cada processo scrapeia (comportamento original)
+# shared: um líder (file lock) scrapeia e publica; os demais só leem
+WORKER_MODE = os.getenv("WORKER_MODE", "single").lower()
+SHARED_DIR = os.getenv("SHARED_DIR", "data/shared")
+SHARED_POLL_SECONDS = float(os.getenv("SHARED_POLL_SECONDS", "0.25"))
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "5"))
+
+
+# ==============================
+# ELEIÇÃO
+# ==============================
+class LeaderLock:
+    """
+    flock exclusivo e não bloqueante num arquivo. O kernel solta o lock
+    quando o processo morre, então outro worker assume no próximo retry.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+# ==============================
+# PUBLICAÇÃO (LÍDER)
+# ==============================
+def publish_state(path: str, odds: List[Dict], results: Dict[str, List], version: int,
+                  ids: Optional[Dict[str, List[str]]] = None, seen: Optional[List[float]] = None) -> int:
+    """
+    Grava odds + resultados dos detectores (e os ids, para os leitores
+    montarem os mesmos índices) num snapshot versionado.
+    Troca atômica por rename: leitores com o arquivo antigo mapeado
+    continuam lendo a versão deles até reabrir.
+    """
+    extra = json.dumps({
+        "version": version,
+        "published_at": time.time(),
+        "results": results,
+        "ids": ids or {},
+    }, default=str).encode()
+    return write_snapshot(odds, path, extra=extra, seen=seen)
+
+
+# ==============================
+# LEITURA (WORKERS DE API)
+# ==============================
+class SharedResults:
+    """Mesma interface de leitura do ResultSet, sobre o snapshot publicado."""
+
+    def __init__(self, payload: Optional[Dict] = None):
+        payload = payload or {}
+        self.version = payload.get("version", 0)
+        self.published_at = payload.get("published_at")
+        self._results: Dict[str, List] = payload.get("results", {})
+        self._ids: Dict[str, List[str]] = payload.get("ids", {})
+        self._indexes: Dict[str, ResultIndex] = {}
+
+    def get(self, name: str) -> List[Dict]:
+        return self._results.get(name, [])
+
+    def index(self, name: str) -> ResultIndex:
+        # montado sob demanda: cada versão publicada é lida uma vez por worker
+        idx = self._indexes.get(name)
+        if idx is None:
+            items = self.get(name)
+            ids = self._ids.get(name) or [str(n) for n in range(len(items))]
+            idx = self._indexes[name] = ResultIndex(zip(ids, items))
+        return idx
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._results)
+
+
+class SharedView:
+    """
+    Store somente-leitura sobre o snapshot do líder, mapeado com mmap.
+
+    Filtros de `query` rodam direto nas colunas (códigos u32 do
+    dicionário e epoch f64) sem materializar nada; só as linhas que
+    passam viram dict. Uma troca de arquivo é detectada pelo inode.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader: Optional[SnapshotReader] = None
+        self._inode: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self.results = SharedResults()
+        self.reloads = 0
+
+    def refresh(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and now - self._checked < SHARED_POLL_SECONDS:
+            return False
+        self._checked = now
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        inode = (st.st_ino, st.st_mtime_ns)
+        if inode == self._inode:
+            return False
+
+        try:
+            reader = SnapshotReader.open(self.path)
+            payload = json.loads(bytes(reader.extra)) if len(reader.extra) else {}
+        except (OSError, ValueError) as e:
+            log.warning("shared snapshot ilegível: %s", e, extra={"path": self.path})
+            return False
+
+        # o reader antigo não é fechado: requests em andamento ainda podem
+        # estar iterando sobre ele; o mmap é liberado quando sair de uso
+        self._reader = reader
+        self._inode = inode
+        self.results = SharedResults(payload)
+        self.reloads += 1
+        return True
+
+    @property
+    def ready(self) -> bool:
+        return self._reader is not None
+
+    def __len__(self) -> int:
+        return len(self._reader) if self._reader else 0
+
+    def snapshot(self) -> List[Dict]:
+        return list(self._reader.rows()) if self._reader else []
+
+    def _codes(self, values: Optional[Iterable[str]]) -> Optional[set]:
+        if not values:
+            return None
+        wanted = set(values)
+        return {i for i, s in enumerate(self._reader.strings) if s in wanted}
+
+    def query(self, bookmakers: Optional[Iterable[str]] = None, leagues: Optional[Iterable[str]] = None,
+              markets: Optional[Iterable[str]] = None, start_from: Optional[float] = None,
+              start_to: Optional[float] = None) -> Iterator[Dict]:
+        reader = self._reader
+        if reader is None:
+            return iter(())
+
+        checks = []
+        for column, values in (("bookmaker", bookmakers), ("league", leagues), ("market", markets)):
+            codes = self._codes(values)
+            if codes is not None:
+                checks.append((reader.columns[column], codes))
+
+        start = reader.columns["start_epoch"]
+        windowed = start_from is not None or start_to is not None
+
+        def matches(i: int) -> bool:
+            for col, codes in checks:
+                if col[i] not in codes:
+                    return False
+            if windowed:
+                ts = start[i]
+                if ts != ts:  # NaN = sem horário
+                    return False
+                if start_from is not None and ts < start_from:
+                    return False
+                if start_to is not None and ts > start_to:
+                    return False
+            return True
+
+        if not checks and not windowed:
+            return reader.rows()
+        return (reader.row(i) for i in range(len(reader)) if matches(i))
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "ready": self.ready,
+            "odds": len(self),
+            "version": self.results.version,
+            "published_at": self.results.published_at,
+            "reloads": self.reloads,
+        }
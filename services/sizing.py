@@ -0,0 +1,155 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ==============================
+# CONFIG
+# ==============================
+# banca padrão das respostas (query string `bankroll` / `payout` substitui)
+SIZING_BANKROLL = float(os.getenv("SIZING_BANKROLL", "100"))
+# passo mínimo de stake por casa (ex: "default=1,pinnacle=0.01,betano=0.5")
+STAKE_ROUNDING = os.getenv("STAKE_ROUNDING", "default=1")
+# Kelly fracionário das value bets e teto por aposta (% da banca)
+KELLY_FRACTION = float(os.getenv("KELLY_FRACTION", "0.25"))
+KELLY_MAX_PCT = float(os.getenv("KELLY_MAX_PCT", "5"))
+
+
+def parse_rounding(value: str) -> Dict[str, float]:
+    steps = {}
+    for part in value.split(","):
+        if "=" not in part:
+            continue
+        name, _, step = part.partition("=")
+        try:
+            steps[name.strip()] = max(0.0, float(step))
+        except ValueError:
+            continue
+    return steps
+
+
+def _round_to(values: np.ndarray, steps: np.ndarray, mode: str) -> np.ndarray:
+    """Arredonda cada stake para o passo da casa (passo 0 = sem arredondar)."""
+    fn = np.floor if mode == "floor" else np.ceil
+    safe = np.where(steps > 0, steps, 1.0)
+    rounded = fn(np.round(values / safe, 9)) * safe
+    return np.where(steps > 0, rounded, values)
+
+
+def _clean(values: np.ndarray) -> list:
+    """np → JSON: 2 casas, nan/inf viram None."""
+    out = (np.round(values, 2) + 0.0).astype(object)  # + 0.0: sem -0.0 no JSON
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+
+class Sizer:
+    """
+    Stakes para surebets e Kelly para value bets, em lote.
+
+    As odds do lote viram uma matriz (itens × pernas, preenchida com inf
+    onde o item tem menos pernas); divisão, arredondamento e retornos
+    são operações NumPy sobre o lote inteiro. Os itens de entrada não
+    são alterados (são os mesmos objetos dos índices publicados): cada
+    saída é uma cópia rasa com a chave `sizing`.
+    """
+
+    def __init__(self, rounding: Optional[Dict[str, float]] = None,
+                 kelly_fraction: float = KELLY_FRACTION, kelly_max_pct: float = KELLY_MAX_PCT):
+        self.rounding = rounding if rounding is not None else parse_rounding(STAKE_ROUNDING)
+        self.default_step = self.rounding.get("default", 0.0)
+        self.kelly_fraction = kelly_fraction
+        self.kelly_max_pct = kelly_max_pct
+
+    def step(self, bookmaker: str) -> float:
+        return self.rounding.get(bookmaker, self.default_step)
+
+    # ------------------------------
+    # surebets
+    # ------------------------------
+    def surebets(self, items: List[Dict], bankroll: Optional[float] = None,
+                 payout: Optional[float] = None) -> List[Dict]:
+        """
+        Stakes por perna para um total (`bankroll`, arredonda para baixo:
+        nunca passa da banca) ou para um retorno alvo (`payout`, arredonda
+        para cima: nunca fica abaixo do alvo). Retorno garantido = menor
+        stake × odd entre as pernas, já com o arredondamento.
+        """
+        if not items:
+            return []
+        legs = max(len(it["best_odds"]) for it in items)
+        odds = np.full((len(items), legs), np.inf)
+        steps = np.zeros((len(items), legs))
+        for i, it in enumerate(items):
+            for j, leg in enumerate(it["best_odds"]):
+                odds[i, j] = leg["odds"]
+                steps[i, j] = self.step(leg.get("bookmaker"))
+
+        inv = 1.0 / odds
+        if payout is not None:
+            stakes = _round_to(payout * inv, steps, "ceil")
+        else:
+            total = bankroll if bankroll is not None else SIZING_BANKROLL
+            stakes = _round_to(total * inv / inv.sum(axis=1, keepdims=True), steps, "floor")
+
+        real = np.isfinite(odds)
+        spent = stakes.sum(axis=1, where=real)
+        returns = np.where(real, stakes * np.where(real, odds, 0.0), np.inf).min(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roi = np.where(spent > 0, (returns - spent) / spent * 100.0, np.nan)
+
+        stakes_out = _clean(stakes)
+        totals, rets, profits, rois = _clean(spent), _clean(returns), _clean(returns - spent), _clean(roi)
+        return [
+            {**it, "sizing": {
+                "stakes": stakes_out[i][:len(it["best_odds"])],
+                "total": totals[i],
+                "return": rets[i],
+                "profit": profits[i],
+                "roi_pct": rois[i],
+            }}
+            for i, it in enumerate(items)
+        ]
+
+    # ------------------------------
+    # value bets
+    # ------------------------------
+    def valuebets(self, items: List[Dict], bankroll: Optional[float] = None,
+                  fraction: Optional[float] = None) -> List[Dict]:
+        """
+        Kelly fracionário: a probabilidade justa vem do `value_pct`
+        (odd justa = odd / (1 + value_pct/100)), f* = p − (1 − p) / (odd − 1),
+        limitado a KELLY_MAX_PCT da banca e arredondado para baixo no
+        passo da casa.
+        """
+        if not items:
+            return []
+        total = bankroll if bankroll is not None else SIZING_BANKROLL
+        fraction = self.kelly_fraction if fraction is None else fraction
+
+        odds = np.fromiter((float(it["odds"]) for it in items), float, len(items))
+        value = np.fromiter((float(it.get("value_pct") or 0.0) for it in items), float, len(items))
+        steps = np.fromiter((self.step(it.get("bookmaker")) for it in items), float, len(items))
+
+        prob = np.clip((1.0 + value / 100.0) / odds, 0.0, 1.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kelly = np.where(odds > 1.0, prob - (1.0 - prob) / (odds - 1.0), 0.0)
+        sized = np.clip(kelly * fraction, 0.0, self.kelly_max_pct / 100.0)
+        stakes = _round_to(total * sized, steps, "floor")
+        expected = stakes * (prob * odds - 1.0)
+
+        kelly_pct, stake_pct = _clean(kelly * 100.0), _clean(sized * 100.0)
+        stakes_out, expected_out = _clean(stakes), _clean(expected)
+        return [
+            {**it, "sizing": {
+                "probability": round(float(prob[i]), 4),
+                "kelly_pct": kelly_pct[i],
+                "stake_pct": stake_pct[i],
+                "stake": stakes_out[i],
+                "expected_profit": expected_out[i],
+            }}
+            for i, it in enumerate(items)
+        ]
+
+
+SIZER = Sizer()
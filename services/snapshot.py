@@ -0,0 +1,261 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from utils.normalize import start_time_epoch
+
+
+# ==============================
+# FORMATO
+# ==============================
+# Little-endian, tudo alinhado em 8 bytes:
+#
+#   header   MAGIC, versão, nº de linhas, nº de strings, criado_em (µs),
+#            e (offset, tamanho) de cada seção abaixo
+#   strings  tabela de dicionário: offsets u32[n+1] + blob utf-8
+#   colunas  u32[n] por campo texto (índice na tabela; NULL = 0xFFFFFFFF)
+#            f64[n] odds | i64[n] timestamp (µs) | f64[n] start_time (epoch, NaN = sem)
+#   extra    (v2) bytes livres do chamador — ex: resultados em JSON
+#   seen     (v3) f64[n] quando o store viu cada odd (epoch); vazia = sem
+#
+# As colunas numéricas são lidas direto do mmap via memoryview.cast,
+# sem cópia; as strings são decodificadas uma vez por valor distinto.
+
+MAGIC = b"BSNAP\x00\x00\x01"
+FORMAT_VERSION = 3
+
+STR_COLUMNS = (
+    "event_id", "home_team", "away_team", "league", "sport",
+    "market", "selection", "bookmaker", "start_time",
+)
+NUM_COLUMNS = (("odds", "d"), ("timestamp_us", "q"), ("start_epoch", "d"))
+SECTIONS = ("str_offsets", "str_blob") + STR_COLUMNS + tuple(name for name, _ in NUM_COLUMNS) + ("extra", "seen")
+
+NULL = 0xFFFFFFFF
+_HEADERS = {
+    1: struct.Struct("<8sHHIIq" + "QQ" * (len(SECTIONS) - 2)),
+    2: struct.Struct("<8sHHIIq" + "QQ" * (len(SECTIONS) - 1)),
+    3: struct.Struct("<8sHHIIq" + "QQ" * len(SECTIONS)),
+}
+_HEADER = _HEADERS[FORMAT_VERSION]
+_PREFIX = struct.Struct("<8sH")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _pad(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def _ts_to_us(ts) -> int:
+    # timestamps gerados por datetime.utcnow().isoformat() + "Z"
+    try:
+        dt = datetime.fromisoformat(str(ts).rstrip("Z"))
+    except ValueError:
+        return -(2 ** 63)
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None) - dt.utcoffset()
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _us_to_ts(us: int) -> str:
+    if us == -(2 ** 63):
+        return ""
+    return (_EPOCH + timedelta(microseconds=us)).isoformat() + "Z"
+
+
+def _le(arr: array) -> bytes:
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+# ==============================
+# ESCRITA
+# ==============================
+def encode_snapshot(odds: Iterable[Dict], extra: bytes = b"", seen: Optional[Sequence[float]] = None) -> bytes:
+    """
+    Serializa odds (dicts no formato Odds) no formato binário. `seen`,
+    alinhado com `odds`, guarda quando cada uma foi vista (checkpoint).
+    """
+    strings: Dict[str, int] = {}
+    str_cols = {name: array("I") for name in STR_COLUMNS}
+    price = array("d")
+    ts_us = array("q")
+    start = array("d")
+    nan = float("nan")
+
+    def intern(value) -> int:
+        if value is None:
+            return NULL
+        value = str(value)
+        idx = strings.get(value)
+        if idx is None:
+            idx = strings[value] = len(strings)
+        return idx
+
+    n = 0
+    for odd in odds:
+        for name in STR_COLUMNS:
+            str_cols[name].append(intern(odd.get(name)))
+        price.append(float(odd.get("odds", 0.0)))
+        ts_us.append(_ts_to_us(odd.get("timestamp", "")))
+        epoch = start_time_epoch(odd.get("start_time"))
+        start.append(nan if epoch is None else epoch)
+        n += 1
+
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in strings:  # dict preserva a ordem de inserção = índice
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    payloads = [_le(offsets), bytes(blob)]
+    payloads += [_le(str_cols[name]) for name in STR_COLUMNS]
+    payloads += [_le(price), _le(ts_us), _le(start), bytes(extra)]
+    payloads.append(_le(array("d", seen)) if seen is not None else b"")
+
+    table = []
+    body = bytearray()
+    pos = _HEADER.size + _pad(_HEADER.size)
+    for data in payloads:
+        table += [pos, len(data)]
+        body += data + b"\x00" * _pad(len(data))
+        pos += len(data) + _pad(len(data))
+
+    created_us = int(time.time() * 1_000_000)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, n, len(strings), created_us, *table)
+    return header + b"\x00" * _pad(_HEADER.size) + bytes(body)
+
+
+def write_snapshot(odds: Iterable[Dict], path: str, extra: bytes = b"",
+                   seen: Optional[Sequence[float]] = None) -> int:
+    """Grava o snapshot de forma atômica (tmp + rename). Retorna bytes."""
+    data = encode_snapshot(odds, extra, seen)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+# ==============================
+# LEITURA
+# ==============================
+class SnapshotReader:
+    """
+    Leitor sobre bytes/mmap. As colunas numéricas (`odds`,
+    `timestamp_us`, `start_epoch`) e os índices de string são
+    memoryviews do buffer original — nenhuma cópia até `rows()`.
+    """
+
+    def __init__(self, buf, _mmap: Optional[mmap.mmap] = None, _file=None):
+        self._mmap = _mmap
+        self._file = _file
+        mv = memoryview(buf)
+        self._mv = mv
+
+        magic, version = _PREFIX.unpack_from(mv, 0)
+        if magic != MAGIC:
+            raise ValueError("arquivo não é um snapshot BetScanner")
+        if version not in _HEADERS:
+            raise ValueError(f"versão de snapshot não suportada: {version}")
+        if sys.byteorder != "little":
+            raise ValueError("leitura zero-copy requer little-endian")
+
+        fields = _HEADERS[version].unpack_from(mv, 0)
+        _, self.version, _, self.n_rows, self.n_strings, self.created_us = fields[:6]
+
+        table = fields[6:]
+        self._sections = {
+            name: mv[table[2 * i]:table[2 * i] + table[2 * i + 1]]
+            for i, name in enumerate(SECTIONS[: len(table) // 2])
+        }
+        # v1 não tem a seção extra
+        self.extra = self._sections.get("extra", mv[0:0])
+        # antes da v3 (ou gravado sem `seen`) só há o instante do arquivo
+        seen = self._sections.get("seen")
+        self.seen = seen.cast("d") if seen else None
+
+        self.columns = {name: self._sections[name].cast("I") for name in STR_COLUMNS}
+        for name, code in NUM_COLUMNS:
+            self.columns[name] = self._sections[name].cast(code)
+
+        self._strings: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: str) -> "SnapshotReader":
+        f = open(path, "rb")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, _mmap=mm, _file=f)
+
+    @property
+    def created_at(self) -> float:
+        return self.created_us / 1_000_000
+
+    @property
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            offsets = self._sections["str_offsets"].cast("I")
+            blob = self._sections["str_blob"]
+            self._strings = [
+                str(blob[offsets[i]:offsets[i + 1]], "utf-8") for i in range(self.n_strings)
+            ]
+        return self._strings
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def rows(self) -> Iterator[Dict]:
+        """Materializa cada linha como dict no formato Odds."""
+        strings = self.strings
+        cols = [(name, self.columns[name]) for name in STR_COLUMNS]
+        price = self.columns["odds"]
+        ts_us = self.columns["timestamp_us"]
+
+        for i in range(self.n_rows):
+            row = {}
+            for name, col in cols:
+                idx = col[i]
+                row[name] = None if idx == NULL else strings[idx]
+            row["odds"] = price[i]
+            row["timestamp"] = _us_to_ts(ts_us[i])
+            yield row
+
+    def row(self, i: int) -> Dict:
+        strings = self.strings
+        row = {}
+        for name in STR_COLUMNS:
+            idx = self.columns[name][i]
+            row[name] = None if idx == NULL else strings[idx]
+        row["odds"] = self.columns["odds"][i]
+        row["timestamp"] = _us_to_ts(self.columns["timestamp_us"][i])
+        return row
+
+    def close(self):
+        # libera as views antes de fechar o mmap
+        self.columns = {}
+        self._sections = {}
+        self.extra = None
+        self.seen = None
+        self._mv.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def load_snapshot(path: str) -> List[Dict]:
+    """Lê um checkpoint do disco e devolve as odds como dicts."""
+    reader = SnapshotReader.open(path)
+    try:
+        return list(reader.rows())
+    finally:
+        reader.close()
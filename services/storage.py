@@ -0,0 +1,235 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.dedupe import odds_key
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# CONFIG
+# ==============================
+STORE_BACKEND = os.getenv("STORE_BACKEND", "memory").lower()  # memory | sqlite
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/odds.db")
+STORE_FLUSH_SECONDS = float(os.getenv("STORE_FLUSH_SECONDS", "1"))
+STORE_FLUSH_MAX = int(os.getenv("STORE_FLUSH_MAX", "5000"))  # pendências que forçam flush
+
+FIELDS = (
+    "event_id", "home_team", "away_team", "league", "sport",
+    "market", "selection", "odds", "bookmaker", "timestamp", "start_time",
+)
+
+
+class StorageBackend:
+    """
+    Persistência por trás do OddsStore (que continua sendo o estado
+    quente em memória). `write` recebe o delta de cada lote de ingest;
+    `load` devolve as odds para o warm start e quando foram vistas.
+    """
+
+    name = "base"
+    persistent = False
+
+    def load(self, max_age: float = 0) -> Tuple[List[Dict], float]:
+        return [], 0.0
+
+    def write(self, upserts: Dict[str, Dict], deletes: List[str]):
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self) -> Dict:
+        return {"backend": self.name}
+
+
+class MemoryBackend(StorageBackend):
+    """Sem persistência: o store morre com o processo."""
+
+    name = "memory"
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite em modo WAL: leitores não bloqueiam o writer e cada lote vira
+    uma transação com executemany. Só a thread do write-behind escreve.
+    """
+
+    name = "sqlite"
+    persistent = True
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS odds (
+                key TEXT PRIMARY KEY,
+                {", ".join(f"{f} {'REAL' if f == 'odds' else 'TEXT'}" for f in FIELDS)},
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS odds_event ON odds (home_team, away_team, start_time);
+            CREATE INDEX IF NOT EXISTS odds_market ON odds (market);
+            CREATE INDEX IF NOT EXISTS odds_bookmaker ON odds (bookmaker);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value REAL);
+        """)
+
+        cols = ("key",) + FIELDS + ("updated_at",)
+        self._upsert_sql = (
+            f"INSERT OR REPLACE INTO odds ({', '.join(cols)}) "
+            f"VALUES ({', '.join('?' for _ in cols)})"
+        )
+        self.rows_written = 0
+        self.rows_deleted = 0
+
+    def load(self, max_age: float = 0) -> Tuple[List[Dict], float]:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'last_flush'").fetchone()
+        if row is None:
+            return [], 0.0
+        if max_age > 0 and time.time() - row[0] > max_age:
+            log.info("sqlite store expirado, ignorado", extra={"path": self.path})
+            return [], 0.0
+
+        # só linhas alteradas são regravadas, então `updated_at` não diz
+        # quando a casa ofereceu a odd pela última vez: o último flush é o
+        # instante mais recente em que o conjunto inteiro estava vivo
+        cur = self._conn.execute(f"SELECT {', '.join(FIELDS)} FROM odds")
+        return [dict(zip(FIELDS, r)) for r in cur], row[0]
+
+    def write(self, upserts: Dict[str, Dict], deletes: List[str]):
+        now = time.time()
+        rows = [
+            (key,) + tuple(odd.get(f) for f in FIELDS) + (now,)
+            for key, odd in upserts.items()
+        ]
+
+        with self._conn:  # uma transação por lote
+            self._conn.execute("BEGIN")
+            if deletes:
+                self._conn.executemany("DELETE FROM odds WHERE key = ?", [(k,) for k in deletes])
+            if rows:
+                self._conn.executemany(self._upsert_sql, rows)
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_flush', ?)", (now,))
+
+        self.rows_written += len(rows)
+        self.rows_deleted += len(deletes)
+
+    def close(self):
+        self._conn.close()
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "rows_written": self.rows_written,
+            "rows_deleted": self.rows_deleted,
+        }
+
+
+class WriteBehind:
+    """
+    Sink do Ingestor que só acumula o delta (coalescido por odds_key) e
+    deixa uma thread própria gravar no backend a cada `interval` segundos
+    ou ao passar de `max_pending` chaves. O ingest nunca espera por disco.
+    """
+
+    def __init__(self, backend: StorageBackend, interval: float = STORE_FLUSH_SECONDS,
+                 max_pending: int = STORE_FLUSH_MAX):
+        self.backend = backend
+        self.interval = interval
+        self.max_pending = max_pending
+
+        self._pending: Dict[str, Optional[Dict]] = {}  # None = delete
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.flushes = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+
+    def record(self, changed: List[Dict], removed: List[Tuple[str, Dict]]):
+        if not self.backend.persistent:
+            return
+        with self._lock:
+            for odd in changed:
+                self._pending[odds_key(odd)] = odd
+            for key, _ in removed:
+                self._pending[key] = None
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def discard(self):
+        """Descarta pendências (ex: odds que acabaram de vir do próprio backend)."""
+        with self._lock:
+            self._pending = {}
+
+    def start(self):
+        if not self.backend.persistent or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+        upserts = {k: v for k, v in pending.items() if v is not None}
+        deletes = [k for k, v in pending.items() if v is None]
+
+        start = time.perf_counter()
+        try:
+            self.backend.write(upserts, deletes)
+            self.flushes += 1
+        except Exception as e:
+            self.errors += 1
+            log.error("store flush error: %s", e, extra={"backend": self.backend.name})
+            # devolve o lote sem sobrescrever o que chegou depois
+            with self._lock:
+                for key, odd in pending.items():
+                    self._pending.setdefault(key, odd)
+        self.last_flush_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self.backend.close()
+
+    def stats(self) -> Dict:
+        out = self.backend.stats()
+        out.update({
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "last_flush_ms": self.last_flush_ms,
+        })
+        return out
+
+
+def make_backend(kind: str = STORE_BACKEND) -> StorageBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(SQLITE_PATH)
+    if kind != "memory":
+        raise ValueError(f"STORE_BACKEND desconhecido: {kind}")
+    return MemoryBackend()
@@ -0,0 +1,135 @@
+import time
+from collections import OrderedDict
+from itertools import repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from utils.dedupe import dedupe_upsert, odds_key
+from utils.normalize import start_time_epoch
+
+
+class OddsStore:
+    """
+    Store em memória indexado por odds_key.
+
+    Substitui a lista global: o upsert é O(lote) em vez de reconstruir o
+    índice inteiro a cada ciclo, e devolve o delta para os detectores.
+    `clock` marca quando cada odd foi vista (o replay usa tempo virtual).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._index: Dict[str, Dict] = {}
+        # última vez que a casa ofereceu a odd, em ordem de visita: a mais
+        # antiga fica na frente, então o TTL só olha as que já expiraram
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+        # índices secundários (a chave já contém casa e liga, então
+        # só mudam quando a chave entra ou sai do store)
+        self._by_bookmaker: Dict[str, Set[str]] = {}
+        self._by_league: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.snapshot())
+
+    def snapshot(self) -> List[Dict]:
+        """Cópia rasa dos itens atuais (segura para iterar fora do lock)."""
+        return list(self._index.values())
+
+    def snapshot_seen(self) -> Tuple[List[Dict], List[float]]:
+        """Itens atuais e quando cada um foi visto, do mais antigo ao mais novo (checkpoint)."""
+        index = self._index
+        items, stamps = [], []
+        for key, ts in self._seen.items():
+            odd = index.get(key)
+            if odd is not None:
+                items.append(odd)
+                stamps.append(ts)
+        return items, stamps
+
+    def upsert_many(self, items: List[Dict], keep="highest",
+                    seen_at: Optional[Sequence[float]] = None) -> Tuple[int, List[Dict]]:
+        """
+        `seen_at` (warm start) traz o instante original de cada item, em
+        ordem crescente; sem ele, todos são vistos agora (`clock`).
+        """
+        stamps = repeat(self.clock()) if seen_at is None else seen_at
+        seen = self._seen
+        index = self._index
+        for odd, now in zip(items, stamps):
+            key = odds_key(odd)
+            seen[key] = now
+            seen.move_to_end(key)
+            if key not in index:
+                self._by_bookmaker.setdefault(odd.get("bookmaker"), set()).add(key)
+                self._by_league.setdefault(odd.get("league"), set()).add(key)
+        return dedupe_upsert(index, items, keep=keep)
+
+    def _unindex(self, key: str, odd: Dict):
+        for idx, value in ((self._by_bookmaker, odd.get("bookmaker")), (self._by_league, odd.get("league"))):
+            keys = idx.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del idx[value]
+
+    def query(self, bookmakers: Optional[Iterable[str]] = None, leagues: Optional[Iterable[str]] = None,
+              markets: Optional[Iterable[str]] = None, start_from: Optional[float] = None,
+              start_to: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Itera as odds que passam nos filtros, partindo do menor índice
+        aplicável (casa/liga) em vez de varrer o store inteiro.
+        O conjunto de chaves é copiado no início (snapshot).
+        """
+        candidates: Optional[Set[str]] = None
+        for idx, wanted in ((self._by_bookmaker, bookmakers), (self._by_league, leagues)):
+            if wanted:
+                keys = set()
+                for value in wanted:
+                    keys.update(list(idx.get(value, ())))
+                candidates = keys if candidates is None else candidates & keys
+
+        keys = list(self._index) if candidates is None else list(candidates)
+        markets = set(markets) if markets else None
+        windowed = start_from is not None or start_to is not None
+
+        for key in keys:
+            odd = self._index.get(key)
+            if odd is None:
+                continue
+            if markets and odd.get("market") not in markets:
+                continue
+            if windowed:
+                ts = start_time_epoch(odd.get("start_time"))
+                if ts is None:
+                    continue
+                if start_from is not None and ts < start_from:
+                    continue
+                if start_to is not None and ts > start_to:
+                    continue
+            yield odd
+
+    def evict_stale(self, max_age: float) -> List[Tuple[str, Dict]]:
+        """
+        Remove odds não vistas há mais de `max_age` segundos.
+
+        O(expiradas): desempilha pela frente de `_seen` e para na primeira
+        ainda válida. Se o relógio voltar (ajuste de NTP), as odds vistas
+        depois ficam atrás de instantes maiores e só expiram junto com
+        eles — atraso, nunca remoção antes da hora.
+        """
+        cutoff = self.clock() - max_age
+        seen = self._seen
+        removed = []
+        while seen:
+            key, ts = next(iter(seen.items()))
+            if ts >= cutoff:
+                break
+            del seen[key]
+            odd = self._index.pop(key, None)
+            if odd is not None:
+                self._unindex(key, odd)
+                removed.append((key, odd))
+        return removed
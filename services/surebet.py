@@ -1,4 +1,34 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+from services.pipeline import Detector, event_key
+
+
+def surebet_for_event(key: Tuple, offers: List[Dict], min_profit_pct: float = 0.1) -> List[Dict]:
+    """
+    Calcula o melhor odd por selection (entre bookmakers) de um evento.
+    Se sum(1/odd_best) < 1 => surebet, profit_pct = (1 - sum_inv) * 100.
+    """
+    best = {}
+    for o in offers:
+        sel = o.get("selection")
+        if sel not in best or o.get("odds", 0) > best[sel]["odds"]:
+            best[sel] = o
+    if len(best) < 2:
+        return []
+    inv_sum = sum(1.0 / b["odds"] for b in best.values())
+    if inv_sum < 1.0:
+        profit_pct = (1.0 - inv_sum) * 100.0
+        if profit_pct >= min_profit_pct:
+            return [{
+                "home_team": key[0],
+                "away_team": key[1],
+                "start_time": key[2],
+                "league": key[3],
+                "profit_pct": profit_pct,
+                "best_odds": list(best.values())
+            }]
+    return []
+
 
 def detect_surebets(odds_list: List[Dict], min_profit_pct: float = 0.1) -> List[Dict]:
     """
@@ -8,28 +38,23 @@ def detect_surebets(odds_list: List[Dict], min_profit_pct: float = 0.1) -> List[
     """
     games = {}
     for o in odds_list:
-        key = (o.get("home_team"), o.get("away_team"), o.get("start_time"), o.get("league"))
-        games.setdefault(key, []).append(o)
+        games.setdefault(event_key(o), []).append(o)
 
     results = []
     for key, offers in games.items():
-        best = {}
-        for o in offers:
-            sel = o.get("selection")
-            if sel not in best or o.get("odds", 0) > best[sel]["odds"]:
-                best[sel] = o
-        if len(best) < 2:
-            continue
-        inv_sum = sum(1.0 / b["odds"] for b in best.values())
-        if inv_sum < 1.0:
-            profit_pct = (1.0 - inv_sum) * 100.0
-            if profit_pct >= min_profit_pct:
-                results.append({
-                    "home_team": key[0],
-                    "away_team": key[1],
-                    "start_time": key[2],
-                    "league": key[3],
-                    "profit_pct": profit_pct,
-                    "best_odds": list(best.values())
-                })
+        results.extend(surebet_for_event(key, offers, min_profit_pct))
     return results
+
+
+class SurebetDetector(Detector):
+    name = "surebets"
+
+    def __init__(self, min_profit_pct: float = 0.1):
+        self.min_profit_pct = min_profit_pct
+
+    def detect_event(self, key: Tuple, offers: List[Dict]) -> List[Dict]:
+        return surebet_for_event(key, offers, self.min_profit_pct)
+
+    def item_id(self, item: Dict) -> str:
+        # no máximo uma surebet por evento
+        return "|".join(str(item.get(k)) for k in ("home_team", "away_team", "start_time", "league"))
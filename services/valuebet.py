@@ -0,0 +1,44 @@
+from typing import List, Dict, Tuple
+
+from services.pipeline import Detector
+
+
+def detect_valuebets(odds_list: List[Dict], threshold_pct=5) -> List[Dict]:
+    results = []
+
+    for o in odds_list:
+        try:
+            prob = 1 / float(o["odds"])
+            fair = 1 / prob
+            diff_pct = ((o["odds"] - fair) / fair) * 100
+
+            if diff_pct >= threshold_pct:
+                results.append({
+                    "event": f"{o['home_team']} vs {o['away_team']}",
+                    "league": o.get("league"),
+                    "start_time": o.get("start_time"),
+                    "market": o["market"],
+                    "selection": o["selection"],
+                    "bookmaker": o["bookmaker"],
+                    "odds": o["odds"],
+                    "value_pct": round(diff_pct, 2),
+                })
+        except:
+            continue
+
+    return results
+
+
+class ValuebetDetector(Detector):
+    name = "valuebets"
+
+    def __init__(self, threshold_pct: float = 5):
+        self.threshold_pct = threshold_pct
+
+    def detect_event(self, key: Tuple, offers: List[Dict]) -> List[Dict]:
+        return detect_valuebets(offers, self.threshold_pct)
+
+    def item_id(self, item: Dict) -> str:
+        return "|".join(
+            str(item.get(k)) for k in ("event", "start_time", "league", "market", "selection", "bookmaker")
+        )
@@ -1,5 +1,4 @@
-from typing import List, Dict
-from datetime import datetime
+from typing import List, Dict, Tuple
 
 def odds_key(odd: Dict) -> str:
     """
@@ -21,17 +20,15 @@ def odds_key(odd: Dict) -> str:
     )
 
 
-def dedupe_add(store: List[Dict], new_items: List[Dict], keep="highest") -> int:
+def dedupe_upsert(index: Dict[str, Dict], new_items: List[Dict], keep="highest") -> Tuple[int, List[Dict]]:
     """
-    Remove duplicatas ao adicionar novas odds:
+    Aplica novas odds sobre um índice {odds_key: odd} já existente.
 
-    keep:
-      - 'highest': mantém a odd com maior preço
-      - 'latest': mantém a odd mais recente (timestamp)
+    Retorna (adicionadas, alteradas) — `alteradas` inclui as novas e as
+    que substituíram uma odd anterior, ou seja, o delta do lote.
     """
-
-    index = {odds_key(item): item for item in store}
     added = 0
+    changed = []
 
     for odd in new_items:
         key = odds_key(odd)
@@ -39,6 +36,7 @@ def dedupe_add(store: List[Dict], new_items: List[Dict], keep="highest") -> int:
         if key not in index:
             index[key] = odd
             added += 1
+            changed.append(odd)
             continue
 
         existing = index[key]
@@ -47,10 +45,27 @@ def dedupe_add(store: List[Dict], new_items: List[Dict], keep="highest") -> int:
         if keep == "highest":
             if float(odd.get("odds", 0)) > float(existing.get("odds", 0)):
                 index[key] = odd
+                changed.append(odd)
 
         elif keep == "latest":
             if odd.get("timestamp", "") > existing.get("timestamp", ""):
                 index[key] = odd
+                changed.append(odd)
+
+    return added, changed
+
+
+def dedupe_add(store: List[Dict], new_items: List[Dict], keep="highest") -> int:
+    """
+    Remove duplicatas ao adicionar novas odds:
+
+    keep:
+      - 'highest': mantém a odd com maior preço
+      - 'latest': mantém a odd mais recente (timestamp)
+    """
+
+    index = {odds_key(item): item for item in store}
+    added, _ = dedupe_upsert(index, new_items, keep=keep)
 
     # Atualiza store em memória
     store.clear()
@@ -0,0 +1,135 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+# ==============================
+# CONFIG
+# ==============================
+# "thread" compartilha memória com a API (sem cópia de dados);
+# "process" isola o GIL, mas os argumentos precisam ser picklable.
+COMPUTE_EXECUTOR = os.getenv("COMPUTE_EXECUTOR", "thread").lower()
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1))))
+COMPUTE_QUEUE_SIZE = int(os.getenv("COMPUTE_QUEUE_SIZE", "16"))
+
+
+class ComputeExecutor:
+    """
+    Pool de CPU para parse, ingest, dedupe e detecção.
+
+    Mantém o event loop livre para a API: todo trabalho pesado é
+    despachado para threads ou processos. No máximo
+    `workers + queue_size` jobs ficam dentro do pool; o restante
+    espera (sem bloquear o loop) até abrir uma vaga → backpressure.
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 4, queue_size: int = 16):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"COMPUTE_EXECUTOR inválido: {mode}")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+
+        self._pool: Optional[Executor] = None
+        self._serial: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+
+        # métricas
+        self.waiting = 0       # jobs aguardando vaga (backpressure)
+        self.in_pool = 0       # jobs submetidos ao pool (fila + executando)
+        self.max_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="compute"
+                )
+        return self._pool
+
+    def _get_serial(self) -> ThreadPoolExecutor:
+        if self._serial is None:
+            self._serial = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+        return self._serial
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs esperando para executar (fora do pool + fila interna)."""
+        return self.waiting + max(0, self.in_pool - self.workers)
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Executa fn(*args) no pool e aguarda o resultado."""
+        return await self._submit(self._get_pool, fn, *args)
+
+    async def run_serial(self, fn: Callable, *args: Any) -> Any:
+        """
+        Executa fn(*args) numa thread dedicada, um job por vez.
+
+        Para trabalho com estado (store, detectores): roda no mesmo
+        processo mesmo com COMPUTE_EXECUTOR=process, fora do event loop.
+        """
+        return await self._submit(self._get_serial, fn, *args)
+
+    async def _submit(self, get_pool: Callable[[], Executor], fn: Callable, *args: Any) -> Any:
+        self.waiting += 1
+        self.max_depth = max(self.max_depth, self.queue_depth)
+
+        async with self._slots:
+            self.waiting -= 1
+            self.in_pool += 1
+            self.submitted += 1
+
+            try:
+                loop = asyncio.get_running_loop()
+                pool = get_pool()
+                if isinstance(pool, ThreadPoolExecutor):
+                    # propaga contextvars (ex: trace do ciclo) para a thread
+                    ctx = contextvars.copy_context()
+                    result = await loop.run_in_executor(pool, ctx.run, fn, *args)
+                else:
+                    result = await loop.run_in_executor(pool, fn, *args)
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_pool -= 1
+                self.completed += 1
+
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_depth,
+            "running": min(self.in_pool, self.workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._serial is not None:
+            self._serial.shutdown(wait=False, cancel_futures=True)
+            self._serial = None
+
+
+COMPUTE = ComputeExecutor(COMPUTE_EXECUTOR, COMPUTE_WORKERS, COMPUTE_QUEUE_SIZE)
+
+
+async def run_compute(fn: Callable, *args: Any) -> Any:
+    """Atalho para COMPUTE.run — fn e args devem ser picklable no modo process."""
+    return await COMPUTE.run(fn, *args)
@@ -0,0 +1,183 @@
+import json
+from typing import Any, List, Sequence, Tuple
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+_NUM_CONT = ".eE+-"
+
+
+def _utf8_cut(data: bytes) -> int:
+    """Posição até onde `data` termina num caractere UTF-8 completo."""
+    for back in range(1, min(4, len(data)) + 1):
+        b = data[-back]
+        if b & 0xC0 == 0x80:  # byte de continuação
+            continue
+        if b & 0x80 == 0:
+            return len(data)
+        need = 2 if b & 0xE0 == 0xC0 else 3 if b & 0xF0 == 0xE0 else 4
+        return len(data) if back >= need else len(data) - back
+    return len(data)
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class EventArraySplitter:
+    """
+    Decodificação incremental de UM array de um documento JSON.
+
+    `path` é a sequência de chaves até o array (ex: ("data", "events")).
+    A cada `feed(chunk)` devolve os elementos do array que ficaram
+    completos; o resto do documento é descartado. O buffer guarda só o
+    elemento incompleto, então a memória fica limitada a um evento (mais
+    o chunk), não ao feed inteiro.
+
+    Cada elemento e cada valor pulado no envelope são decodificados com
+    `JSONDecoder.raw_decode` (C); só a navegação pelas chaves do envelope
+    é feita em Python. O estado é picklable para rodar no pool de
+    processos entre chunks.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path: Tuple[str, ...] = tuple(path)
+        self.found = False     # array alvo localizado
+        self.closed = False    # array alvo terminou (`]`)
+        self.missing = False   # envelope terminou sem o caminho pedido
+        self.events = 0
+        self._buf = ""
+        self._pos = 0
+        self._tail = b""
+        # progresso no envelope enquanto o array não foi localizado
+        self._depth = 0        # chaves de `path` já atravessadas
+        self._inside = False   # `{` do nível atual já consumido
+        self._retry = 0        # bytes pendentes para retentar um valor pulado
+
+    # ------------------------------
+    # navegação no envelope
+    # ------------------------------
+    def _skip_ws(self, pos: int) -> int:
+        buf = self._buf
+        while pos < len(buf) and buf[pos] in _WS:
+            pos += 1
+        if pos >= len(buf):
+            raise _NeedMore
+        return pos
+
+    def _value(self, pos: int, final: bool) -> Tuple[Any, int]:
+        try:
+            value, end = _DECODER.raw_decode(self._buf, pos)
+        except ValueError:
+            if final:
+                raise
+            raise _NeedMore
+        # número no fim do buffer pode continuar no próximo chunk; um corte
+        # no meio dele ("-1." / "2e") decodifica só o prefixo válido
+        if not final and (end >= len(self._buf) or self._buf[end] in _NUM_CONT):
+            raise _NeedMore
+        return value, end
+
+    def _locate(self, final: bool) -> bool:
+        """
+        Avança pelo envelope até o início do array alvo. O progresso
+        (posição, profundidade no caminho) fica salvo entre chamadas: cada
+        chunk retoma de onde o anterior parou, sem redecodificar o prefixo.
+        """
+        buf = self._buf
+        while True:
+            pos = self._skip_ws(self._pos)
+            ch = buf[pos]
+            if not self._inside:
+                if self._depth == 0 and ch != ("{" if self.path else "["):
+                    # corpo que não é o envelope JSON (ex: página HTML de 403/5xx)
+                    raise ValueError(f"json inválido: documento começa com {ch!r}")
+                if self._depth == len(self.path):
+                    if ch != "[":
+                        self.missing = True
+                        return False
+                    self._pos = pos + 1
+                    self.found = True
+                    return True
+                if ch != "{":
+                    self.missing = True
+                    return False
+                self._inside = True
+                self._pos = pos + 1
+                continue
+
+            if ch == "}":
+                self.missing = True
+                return False
+            if ch == ",":
+                self._pos = pos + 1
+                continue
+            name, pos = self._value(pos, final)
+            pos = self._skip_ws(pos)
+            if buf[pos] != ":":
+                raise ValueError(f"json inválido na posição {pos}")
+            pos = self._skip_ws(pos + 1)
+            if name == self.path[self._depth]:
+                self._depth += 1
+                self._inside = False
+                self._pos = pos
+                continue
+
+            # valor pulado ainda incompleto: só tenta de novo quando o que
+            # chegou depois dele dobrar, senão um valor grande no envelope
+            # seria redecodificado do início a cada chunk
+            pending = len(buf) - self._pos
+            if not final and pending < self._retry:
+                raise _NeedMore
+            try:
+                _, pos = self._value(pos, final)
+            except _NeedMore:
+                self._retry = 2 * pending
+                raise
+            self._retry = 0
+            self._pos = pos
+
+    # ------------------------------
+    # API
+    # ------------------------------
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        data = self._tail + chunk
+        cut = len(data) if final else _utf8_cut(data)
+        self._tail = data[cut:]
+        self._buf += data[:cut].decode("utf-8")
+
+        out: List[Any] = []
+        if self.closed or self.missing:
+            self._buf = ""
+            return out
+
+        try:
+            if not self.found and not self._locate(final):
+                self._buf = ""
+                return out
+
+            buf = self._buf
+            pos = self._pos
+            while True:
+                self._pos = pos
+                pos = self._skip_ws(pos)
+                ch = buf[pos]
+                if ch == "]":
+                    self.closed = True
+                    break
+                if ch == ",":
+                    pos += 1
+                    continue
+                value, pos = self._value(pos, final)
+                out.append(value)
+        except _NeedMore:
+            if final:
+                raise ValueError("json truncado")
+        finally:
+            # descarta o que já foi consumido
+            if self.closed:
+                self._buf, self._pos = "", 0
+            elif self.found or not self.missing:
+                self._buf, self._pos = self._buf[self._pos:], 0
+
+        self.events += len(out)
+        return out
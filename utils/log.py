@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+
+# ==============================
+# CONFIG
+# ==============================
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "10"))          # por chave / janela
+LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW_SECONDS", "10"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))     # 0 = descarta tudo acima do limite
+
+# atributos padrão do LogRecord — o resto vira campo no JSON
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro: ts, level, logger, msg + campos extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita registros por chave (logger + template da mensagem, ou
+    extra={"log_key": ...}) a `limit` por janela de `window` segundos.
+
+    Acima do limite, deixa passar 1 a cada `sample_every` (marcado com
+    `sampled=True`) e conta o resto. O primeiro registro da janela
+    seguinte carrega `suppressed=<n>` com o total descartado.
+
+    O estado é ordenado pelo início da janela: a cada registro as chaves
+    cuja janela já terminou saem da frente (O(expiradas)), então chaves
+    que param de logar não ficam na memória. Uma chave que volta depois
+    disso começa do zero — o que ela suprimiu segue em `total_suppressed`.
+    """
+
+    def __init__(self, limit: int = LOG_RATE_LIMIT, window: float = LOG_RATE_WINDOW,
+                 sample_every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.sample_every = sample_every
+        # chave -> [início_janela, emitidos, suprimidos], da janela mais antiga à mais nova
+        self._state: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0:
+            return True
+
+        key = (record.name, getattr(record, "log_key", record.msg))
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._state[key] = [now, 1, 0]
+                self._state.move_to_end(key)
+                self._prune(now)
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            state[1] += 1
+            if state[1] <= self.limit:
+                return True
+
+            over = state[1] - self.limit
+            if self.sample_every and over % self.sample_every == 0:
+                record.sampled = True
+                record.suppressed = state[2]
+                state[2] = 0
+                return True
+
+            state[2] += 1
+            self.total_suppressed += 1
+            return False
+
+    def _prune(self, now: float):
+        state = self._state
+        while state:
+            start = next(iter(state.values()))[0]
+            if now - start < self.window:
+                return
+            state.popitem(last=False)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloqueia: fila cheia → descarta e conta.
+    A formatação/IO acontece na thread do QueueListener.
+
+    Em processos filhos (pool de CPU em modo process) o listener não
+    existe; nesse caso escreve direto no stderr.
+    """
+
+    def __init__(self, q: queue.Queue, fallback: logging.Handler):
+        super().__init__(q)
+        self.dropped = 0
+        self._pid = os.getpid()
+        self._fallback = fallback
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # resolve a mensagem agora (args podem mudar), sem formatar o JSON
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord):
+        if os.getpid() != self._pid:
+            self._fallback.handle(record)
+            return
+        super().emit(record)
+
+
+_LISTENER: Optional[QueueListener] = None
+_HANDLER: Optional[NonBlockingQueueHandler] = None
+RATE_LIMITER = RateLimitFilter()
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """Instala o handler assíncrono no root logger (idempotente)."""
+    global _LISTENER, _HANDLER
+
+    if _HANDLER is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    _HANDLER = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE), fallback=stream)
+    _HANDLER.addFilter(RATE_LIMITER)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_HANDLER)
+
+    _LISTENER = QueueListener(_HANDLER.queue, stream, respect_handler_level=True)
+    _LISTENER.start()
+
+
+def shutdown_logging():
+    """Drena a fila e para o listener."""
+    global _LISTENER, _HANDLER
+
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
+    if _HANDLER is not None:
+        logging.getLogger().removeHandler(_HANDLER)
+        _HANDLER = None
+
+
+def log_stats() -> Dict:
+    return {
+        "suppressed": RATE_LIMITER.total_suppressed,
+        "dropped": _HANDLER.dropped if _HANDLER else 0,
+        "queued": _HANDLER.queue.qsize() if _HANDLER else 0,
+    }
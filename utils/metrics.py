@@ -0,0 +1,281 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# ==============================
+# Métricas no formato texto do Prometheus
+# ==============================
+# Implementação mínima (sem dependência externa): cada observação é um
+# lock + algumas somas, barato o bastante para ficar ligado em produção.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7)
+COUNT_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+_REGISTRY: List["_Metric"] = []
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str, quote: bool = True) -> str:
+    # formato texto: \\, \n e (só em valor de label) \" precisam de escape
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quote else value
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), _register: bool = True):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple, "_Metric"] = {}
+        self._lock = threading.Lock()
+        if _register:
+            _REGISTRY.append(self)
+
+    def labels(self, *values) -> "_Metric":
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _series(self) -> List[Tuple[Tuple, "_Metric"]]:
+        if self.labelnames:
+            return list(self._children.items())
+        return [((), self)]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.doc, quote=False)}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(child._render_values(self.name, self.labelnames, values))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), _register: bool = True):
+        super().__init__(name, doc, labelnames, _register)
+        self.value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.doc, _register=False)
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def set_function(self, fn: Callable[[], float]):
+        """Total mantido fora daqui (ex: contadores do cache), lido na hora do scrape."""
+        self._fn = fn
+
+    def _render_values(self, name, labelnames, values) -> List[str]:
+        value = self.value
+        if self._fn is not None:
+            try:
+                value = self._fn()
+            except Exception:
+                value = float("nan")
+        return [f"{name}{_labels(labelnames, values)} {_fmt(value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), _register: bool = True):
+        super().__init__(name, doc, labelnames, _register)
+        self.value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.doc, _register=False)
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set_function(self, fn: Callable[[], float]):
+        """Valor calculado na hora do scrape (ex: tamanho do store)."""
+        self._fn = fn
+
+    def _render_values(self, name, labelnames, values) -> List[str]:
+        value = self.value
+        if self._fn is not None:
+            try:
+                value = self._fn()
+            except Exception:
+                value = float("nan")
+        return [f"{name}{_labels(labelnames, values)} {_fmt(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, _register: bool = True):
+        super().__init__(name, doc, labelnames, _register)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self.sum = 0.0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.doc, buckets=self.buckets, _register=False)
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _render_values(self, name, labelnames, values) -> List[str]:
+        with self._lock:
+            counts = list(self.counts)
+            total_sum = self.sum
+
+        lines = []
+        acc = 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            acc += c
+            le = 'le="%s"' % _fmt(bound)
+            lines.append(f"{name}_bucket{_labels(labelnames, values, le)} {acc}")
+        lines.append(f"{name}_sum{_labels(labelnames, values)} {_fmt(total_sum)}")
+        lines.append(f"{name}_count{_labels(labelnames, values)} {acc}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==============================
+# MÉTRICAS DO SISTEMA
+# ==============================
+# Scrapers (por bookmaker)
+SCRAPER_FETCH_SECONDS = Histogram(
+    "betscanner_scraper_fetch_seconds", "Tempo de fetch_raw (token + request) por casa.", ["bookmaker"])
+SCRAPER_TOKEN_SECONDS = Histogram(
+    "betscanner_scraper_token_seconds", "Tempo para obter o token via Playwright.", ["bookmaker"])
+SCRAPER_PAYLOAD_BYTES = Histogram(
+    "betscanner_scraper_payload_bytes", "Tamanho do corpo da resposta.", ["bookmaker"], buckets=BYTES_BUCKETS)
+SCRAPER_DECODE_SECONDS = Histogram(
+    "betscanner_scraper_decode_seconds", "Tempo de json.loads do payload.", ["bookmaker"])
+SCRAPER_PARSE_SECONDS = Histogram(
+    "betscanner_scraper_parse_seconds", "Tempo do loop JSON -> Odds.", ["bookmaker"])
+SCRAPER_EVENTS = Histogram(
+    "betscanner_scraper_events_parsed", "Eventos com odds por execução.", ["bookmaker"], buckets=COUNT_BUCKETS)
+SCRAPER_QUOTES = Histogram(
+    "betscanner_scraper_quotes_parsed", "Odds geradas por execução.", ["bookmaker"], buckets=COUNT_BUCKETS)
+SCRAPER_ERRORS = Counter(
+    "betscanner_scraper_errors_total", "Falhas de scraper por tipo (timeout | error).", ["bookmaker", "kind"])
+
+# Ciclo / ingest
+CYCLE_SECONDS = Histogram("betscanner_cycle_seconds", "Duração total de run_scrapers.")
+DEDUPE_SECONDS = Histogram("betscanner_dedupe_seconds", "Tempo de upsert (dedupe) no store por lote.")
+DETECT_SECONDS = Histogram("betscanner_detect_seconds", "Tempo da passada de detectores por lote.")
+DETECT_EVENTS = Histogram(
+    "betscanner_detect_events_touched", "Eventos reavaliados por lote.", buckets=COUNT_BUCKETS)
+
+# Proxies
+PROXY_REQUESTS = Counter(
+    "betscanner_proxy_requests_total", "Requests por proxy e resultado (ok | http_429 | error | ...).",
+    ["bookmaker", "proxy", "outcome"])
+PROXY_QUARANTINES = Counter(
+    "betscanner_proxy_quarantines_total", "Proxies colocados em quarentena.", ["bookmaker", "proxy"])
+
+# Scheduler de recursos dos scrapers
+MEMORY_MB_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 400, 800, 1600)
+SCRAPER_RSS_DELTA_MB = Histogram(
+    "betscanner_scraper_rss_delta_mb", "Pico de RSS (árvore de processos) acima da entrada, por casa.",
+    ["bookmaker"], buckets=MEMORY_MB_BUCKETS)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "betscanner_scheduler_wait_seconds", "Espera por admissão no scheduler, por classe de recurso.",
+    ["resource_class"])
+SCHEDULER_RESERVED_MB = Gauge("betscanner_scheduler_reserved_mb", "Custo estimado dos scrapers em andamento.")
+
+# Event loop / load shedding
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+LOOP_LAG_SECONDS = Histogram(
+    "betscanner_loop_lag_seconds", "Atraso do timer de referência do event loop.", buckets=LAG_BUCKETS)
+LOAD_SHEDDING = Gauge("betscanner_load_shedding", "1 enquanto o shedding está ligado.")
+SHED_RESPONSES = Counter(
+    "betscanner_shed_responses_total", "Respostas servidas do cache (versão anterior) durante shedding.",
+    ["endpoint"])
+DEFERRED_SECONDS = Histogram(
+    "betscanner_deferred_seconds", "Espera de trabalho não interativo adiado pelo shedding.", ["task"])
+
+# Confirmação de surebets (re-fetch por evento)
+CONFIRM_SECONDS = Histogram("betscanner_confirm_seconds", "Duração de uma rodada de confirmação.")
+CONFIRM_OUTCOMES = Counter(
+    "betscanner_confirm_outcomes_total", "Surebets candidatas por resultado (confirmed | dropped | unverified).",
+    ["outcome"])
+
+# Estado
+STORE_SIZE = Gauge("betscanner_store_odds", "Odds no store.")
+SUREBET_COUNT = Gauge("betscanner_surebets", "Surebets publicadas.")
+VALUEBET_COUNT = Gauge("betscanner_valuebets", "Value bets publicadas.")
+NORMALIZE_CACHE_HITS = Counter("betscanner_normalize_cache_hits_total", "Acertos do cache de normalização.")
+NORMALIZE_CACHE_MISSES = Counter("betscanner_normalize_cache_misses_total", "Falhas do cache de normalização.")
+NORMALIZE_CACHE_HIT_RATIO = Gauge("betscanner_normalize_cache_hit_ratio", "hits / (hits + misses).")
+
+# Boot
+STARTUP_IMPORT_SECONDS = Gauge("betscanner_startup_import_seconds", "Tempo de import do main (inclui scrapers habilitados).")
+
+# Compute pool
+COMPUTE_QUEUE_DEPTH = Gauge("betscanner_compute_queue_depth", "Jobs aguardando no pool de CPU.")
+COMPUTE_RUNNING = Gauge("betscanner_compute_running", "Jobs executando no pool de CPU.")
+
+# Logging
+LOG_SUPPRESSED = Counter("betscanner_log_suppressed_total", "Registros descartados pelo rate limit.")
+LOG_DROPPED = Counter("betscanner_log_dropped_total", "Registros descartados com a fila de log cheia.")
+
+# WebSocket
+WS_CLIENTS = Gauge("betscanner_ws_clients", "Clientes conectados em /ws/updates.")
+WS_MESSAGES = Counter("betscanner_ws_messages_total", "Mensagens enviadas via WebSocket.")
+WS_COALESCED = Counter("betscanner_ws_coalesced_total", "Filas de clientes lentos colapsadas em resync.")
+
+# API
+HTTP_REQUEST_SECONDS = Histogram(
+    "betscanner_http_request_seconds", "Latência dos handlers HTTP.", ["method", "path", "status"])
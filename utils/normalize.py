@@ -1,5 +1,8 @@
 import unicodedata
 import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
 
 # FIXES que você já tinha
 TEAM_FIX = {
@@ -54,6 +57,11 @@ SELECTION_FIX = {
     "não": "no",
 }
 
+# Os nomes se repetem a cada ciclo (mesmos times/ligas/seleções), então
+# os clean_* são memoizados.
+NORMALIZE_CACHE_SIZE = 65536
+
+
 # ---------------------------
 # Normalização base
 # ---------------------------
@@ -77,6 +85,7 @@ def _clean(text: str) -> str:
 # ---------------------------
 # Times
 # ---------------------------
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def clean_team_name(name: str) -> str:
     key = _clean(name)
     return TEAM_FIX.get(key, key).title()
@@ -85,6 +94,7 @@ def clean_team_name(name: str) -> str:
 # ---------------------------
 # Ligas
 # ---------------------------
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def clean_league_name(name: str) -> str:
     key = _clean(name)
     return LEAGUE_FIX.get(key, key)
@@ -93,6 +103,7 @@ def clean_league_name(name: str) -> str:
 # ---------------------------
 # Mercados
 # ---------------------------
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def clean_market_name(name: str) -> str:
     key = _clean(name)
 
@@ -116,6 +127,7 @@ def clean_market_name(name: str) -> str:
 # ---------------------------
 # Seleções (a parte mais importante!)
 # ---------------------------
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def clean_selection_name(name: str) -> str:
     s = _clean(name)
 
@@ -134,3 +146,41 @@ def clean_selection_name(name: str) -> str:
         return hcp.group(2)
 
     return s
+
+
+# ---------------------------
+# Horário do evento
+# ---------------------------
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def start_time_epoch(value) -> Optional[float]:
+    """
+    start_time → epoch (segundos). Aceita ISO 8601 (Betano, Stake, ...)
+    e UNIX em s/ms (LineFeed da 1xBet/22Bet). None se não der para ler.
+    """
+    if value is None or value == "":
+        return None
+
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.timestamp()
+
+    value = float(value)
+    return value / 1000.0 if value > 1e11 else value
+
+
+def cache_stats() -> dict:
+    """Hits/misses somados dos caches de normalização."""
+    hits = misses = 0
+    for fn in (clean_team_name, clean_league_name, clean_market_name, clean_selection_name):
+        info = fn.cache_info()
+        hits += info.hits
+        misses += info.misses
+    return {"hits": hits, "misses": misses}
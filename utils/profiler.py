@@ -0,0 +1,301 @@
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+
+# ==============================
+# CONFIG
+# ==============================
+TRACE_HISTORY = int(os.getenv("TRACE_HISTORY", "20"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000.0
+
+
+# ==============================
+# TRACES DE CICLO
+# ==============================
+class CycleTrace:
+    """Spans (estágio, casa, início, duração) de um ciclo de run_scrapers."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.utcnow().isoformat() + "Z"
+        self._t0 = time.perf_counter()
+        self.total_ms: Optional[float] = None
+        self.spans: List[Dict] = []
+        self.meta: Dict = {}
+
+    def add(self, stage: str, start: float, duration: float, bookmaker: Optional[str] = None):
+        # list.append é atômico no CPython → seguro a partir das threads do pool
+        self.spans.append({
+            "stage": stage,
+            "bookmaker": bookmaker,
+            "start_ms": round((start - self._t0) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+        })
+
+    def finish(self):
+        self.total_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+
+    def summary(self) -> Dict:
+        by_stage: Dict[str, float] = {}
+        by_bookmaker: Dict[str, Dict[str, float]] = {}
+
+        for s in self.spans:
+            by_stage[s["stage"]] = round(by_stage.get(s["stage"], 0) + s["duration_ms"], 3)
+            if s["bookmaker"]:
+                bk = by_bookmaker.setdefault(s["bookmaker"], {})
+                bk[s["stage"]] = round(bk.get(s["stage"], 0) + s["duration_ms"], 3)
+
+        slowest = max(self.spans, key=lambda s: s["duration_ms"], default=None)
+        return {"by_stage": by_stage, "by_bookmaker": by_bookmaker, "slowest_span": slowest}
+
+    def to_dict(self, spans: bool = True) -> Dict:
+        out = {
+            "id": self.id,
+            "started_at": self.started_at,
+            "total_ms": self.total_ms,
+            "meta": self.meta,
+            "summary": self.summary(),
+        }
+        if spans:
+            out["spans"] = sorted(self.spans, key=lambda s: s["start_ms"])
+        return out
+
+
+TRACES: Deque[CycleTrace] = deque(maxlen=TRACE_HISTORY)
+_CURRENT: ContextVar[Optional[CycleTrace]] = ContextVar("cycle_trace", default=None)
+
+
+def start_trace() -> CycleTrace:
+    trace = CycleTrace()
+    _CURRENT.set(trace)
+    return trace
+
+
+def finish_trace(trace: CycleTrace):
+    trace.finish()
+    TRACES.append(trace)
+    _CURRENT.set(None)
+
+
+def current_trace() -> Optional[CycleTrace]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def span(stage: str, bookmaker: Optional[str] = None):
+    """Mede um estágio no trace do ciclo atual (no-op fora de um ciclo)."""
+    trace = _CURRENT.get()
+    if trace is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, start, time.perf_counter() - start, bookmaker)
+
+
+def add_span(stage: str, duration: float, bookmaker: Optional[str] = None, end: Optional[float] = None):
+    """Registra um span medido em outro lugar (ex: dentro de um worker)."""
+    trace = _CURRENT.get()
+    if trace is None:
+        return
+    end = end if end is not None else time.perf_counter()
+    trace.add(stage, end - duration, duration, bookmaker)
+
+
+def recent_traces(limit: int = TRACE_HISTORY, spans: bool = True) -> List[Dict]:
+    return [t.to_dict(spans=spans) for t in list(TRACES)[-limit:]][::-1]
+
+
+# ==============================
+# PROFILER SOB DEMANDA
+# ==============================
+# Folhas de pilha que significam "thread ociosa" (loop no select, worker
+# esperando job) — não entram nas amostras.
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    """
+    Amostra a pilha de TODAS as threads (event loop + pool de CPU) via
+    sys._current_frames() a cada `interval` segundos.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self._self_counts: Counter = Counter()
+        self._cum_counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                self.samples += 1
+                self._self_counts[self._label(frame)] += 1
+
+                seen = set()
+                while frame is not None:
+                    label = self._label(frame)
+                    if label not in seen:
+                        seen.add(label)
+                        self._cum_counts[label] += 1
+                    frame = frame.f_back
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def report(self, top: int) -> Dict:
+        total = max(1, self.samples)
+        return {
+            "mode": "sample",
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "top_self": [
+                {"function": f, "samples": n, "pct": round(n * 100.0 / total, 2)}
+                for f, n in self._self_counts.most_common(top)
+            ],
+            "top_cumulative": [
+                {"function": f, "samples": n, "pct": round(n * 100.0 / total, 2)}
+                for f, n in self._cum_counts.most_common(top)
+            ],
+        }
+
+
+class _CProfileRunner:
+    """cProfile clássico — só enxerga a thread do event loop."""
+
+    def __init__(self):
+        self._prof = cProfile.Profile()
+
+    def start(self):
+        self._prof.enable()
+
+    def stop(self):
+        self._prof.disable()
+
+    def report(self, top: int) -> Dict:
+        stats = pstats.Stats(self._prof)
+        rows = []
+        for (filename, line, fn), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                "function": f"{filename}:{line}({fn})",
+                "calls": nc,
+                "tottime_ms": round(tt * 1000, 3),
+                "cumtime_ms": round(ct * 1000, 3),
+            })
+        rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+        return {"mode": "cprofile", "top_cumulative": rows[:top]}
+
+
+class CycleProfiler:
+    """
+    Arma um profile para o PRÓXIMO ciclo de run_scrapers.
+    O profile para no fim do ciclo ou após `seconds`, o que vier antes.
+    """
+
+    def __init__(self):
+        self._armed: Optional[Dict] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._armed is not None
+
+    async def profile_next_cycle(self, seconds: float, mode: str = "sample",
+                                 top: int = 30, wait_timeout: float = 600) -> Dict:
+        if mode not in ("sample", "cprofile"):
+            raise ValueError("mode deve ser 'sample' ou 'cprofile'")
+
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self._armed = {
+                "seconds": seconds,
+                "mode": mode,
+                "top": top,
+                "future": loop.create_future(),
+                "runner": None,
+                "timer": None,
+            }
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(self._armed["future"]), timeout=wait_timeout + seconds
+                )
+            finally:
+                self._stop()
+
+    def cycle_started(self, trace: CycleTrace):
+        armed = self._armed
+        if armed is None or armed["runner"] is not None:
+            return
+
+        runner = SamplingProfiler() if armed["mode"] == "sample" else _CProfileRunner()
+        armed["runner"] = runner
+        armed["trace_id"] = trace.id
+        runner.start()
+
+        loop = asyncio.get_running_loop()
+        armed["timer"] = loop.call_later(armed["seconds"], self._stop)
+
+    def cycle_finished(self):
+        if self._armed is not None and self._armed["runner"] is not None:
+            self._stop()
+
+    def _stop(self):
+        armed = self._armed
+        if armed is None:
+            return
+        self._armed = None
+
+        if armed["timer"] is not None:
+            armed["timer"].cancel()
+
+        runner = armed["runner"]
+        if runner is None:
+            return
+
+        runner.stop()
+        result = runner.report(armed["top"])
+        result["trace_id"] = armed.get("trace_id")
+
+        if not armed["future"].done():
+            armed["future"].set_result(result)
+
+
+PROFILER = CycleProfiler()